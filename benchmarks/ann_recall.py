@@ -0,0 +1,89 @@
+"""Benchmark recall and latency of the RAG index types against exact search.
+
+Builds every index type over the same embeddings and reports its build time,
+search latency per query and recall@k, the fraction of the exact (flat) top-k
+results it finds.
+
+By default the embeddings are synthetic: clustered random unit vectors, which
+behave much like sentence embeddings for this purpose. Pass --embeddings with a
+.npy file (for example the embeddings.npy of a cached index under
+.doc_check_cache) to benchmark real data; queries are then perturbed corpus
+vectors.
+
+IVF-PQ candidates are re-scored with the exact embeddings, as during retrieval.
+
+Usage:
+    python benchmarks/ann_recall.py [--chunks N] [--dimension D] [--queries Q] [--top-k K]
+    python benchmarks/ann_recall.py --embeddings path/to/embeddings.npy
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from doc_check.ann import INDEX_TYPES, build_index, search
+
+
+def synthetic_embeddings(count, dimension, clusters, rng):
+    """Unit vectors scattered around random cluster centres."""
+    centres = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dimension)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def make_queries(embeddings, count, rng):
+    """Queries near corpus vectors, like questions about a passage."""
+    queries = embeddings[rng.integers(0, len(embeddings), count)] + 0.3 * rng.standard_normal((count, embeddings.shape[1])).astype(np.float32)
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def recall(results, expected):
+    """Mean fraction of each query's expected results that were found."""
+    return np.mean([len(set(found) & set(truth)) / len(truth) for found, truth in zip(results, expected)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=100_000, help="Number of synthetic chunks (default: 100000)")
+    parser.add_argument("--dimension", type=int, default=384, help="Embedding dimension (default: 384, as all-MiniLM-L6-v2)")
+    parser.add_argument("--clusters", type=int, default=1000, help="Clusters of the synthetic embeddings (default: 1000)")
+    parser.add_argument("--embeddings", help="Benchmark these embeddings (.npy) instead of synthetic ones")
+    parser.add_argument("--queries", type=int, default=1000, help="Number of queries (default: 1000)")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    options = parser.parse_args()
+
+    rng = np.random.default_rng(options.seed)
+    if options.embeddings:
+        embeddings = np.ascontiguousarray(np.load(options.embeddings), dtype=np.float32)
+        faiss.normalize_L2(embeddings)
+    else:
+        embeddings = synthetic_embeddings(options.chunks, options.dimension, options.clusters, rng)
+    queries = make_queries(embeddings, options.queries, rng)
+    print(f"{len(embeddings)} chunks, dimension {embeddings.shape[1]}, {len(queries)} queries, top-{options.top_k}")
+
+    expected = None
+    print(f"{'index':<10} {'build':>9} {'ms/query':>9} {'recall':>7}  params")
+    for index_type in INDEX_TYPES:
+        if index_type == "auto":
+            continue
+        start = time.perf_counter()
+        index, params = build_index(embeddings, index_type)
+        build_time = time.perf_counter() - start
+
+        # One query at a time, as retrieval for a single question would
+        start = time.perf_counter()
+        results = np.vstack([search(index, params, query[None, :], options.top_k, embeddings)[1] for query in queries])
+        latency = (time.perf_counter() - start) / len(queries) * 1000
+
+        if expected is None:
+            expected = results  # flat comes first and is exact
+        print(f"{index_type:<10} {build_time:>8.2f}s {latency:>9.3f} {recall(results, expected):>7.3f}  {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Benchmark the single pass markdown cleanup against the regex based one it replaced.
+
+Generates HTML API references like the ones produced by documentation tools,
+of increasing size, and times --summarize cleanup on each with both
+implementations. The previous implementation applied about sixty regex
+substitutions to the whole document and restored each code block with a
+replace over all of it, so its time grows much faster than the document; it
+is skipped above --legacy-max-mb.
+
+The outputs differ where the previous implementation had bugs: <pre><code>
+blocks came out wrapped in stray backticks, and tags starting like <b> or <i>
+(<body>, <br>, <img>...) were converted as bold or italic. The benchmark
+reports whether the outputs are otherwise the same.
+
+Usage:
+    python benchmarks/cleanup.py [--sizes 0.1,1,10] [--legacy-max-mb 3]
+"""
+
+import argparse
+import html
+import random
+import re
+import time
+
+from doc_check.cleanup import cleanup_document
+
+
+def api_reference(size_mb: float, seed: int = 0) -> str:
+    """An HTML API reference of about size_mb megabytes."""
+    rng = random.Random(seed)
+    words = "the a function returns value parameter list of string integer option config document check model request".split()
+
+    def sentence(length=12):
+        return " ".join(rng.choice(words) for _ in range(length)).capitalize() + "."
+
+    parts = [
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>API Reference</title>\n"
+        "<style>\nbody { font: 14px sans-serif; }\n</style>\n</head>\n<main>\n<h1>API Reference</h1>\n"
+    ]
+    size, i = 0, 0
+    while size < size_mb * 1024 * 1024:
+        entry = (
+            f"<!-- entry {i} -->\n<h2 id=\"f{i}\">function_{i}</h2>\n"
+            f"<p>{sentence()} See <a href=\"#f{max(i - 1, 0)}\">function_{max(i - 1, 0)}</a> "
+            f"and <code>param_{i}</code>. <strong>Note:</strong> {sentence(6)} &amp; <em>more</em>&hellip;</p>\n"
+            f"<h3>Parameters</h3>\n<table>\n<tr><th>Name</th><th>Type</th><th>Description</th></tr>\n"
+            f"<tr><td><code>name</code></td><td>str</td><td>{sentence(8)}</td></tr>\n"
+            f"<tr><td><code>count</code></td><td>int</td><td>{sentence(8)}</td></tr>\n</table>\n"
+            f"<h3>Example</h3>\n<p>Call it with `function_{i}(name)`:</p>\n"
+            f"<pre><code>result = function_{i}(name=\"x\", count={i})\nprint(result)</code></pre>\n"
+            f"<ul>\n<li>{sentence(5)}</li>\n<li>Returns <strong>{i}</strong></li>\n</ul>\n"
+        )
+        parts.append(entry)
+        size += len(entry)
+        i += 1
+    parts.append("</main>\n</html>\n")
+    return "".join(parts)
+
+
+def strip_code_fixes(text: str) -> str:
+    """Remove the stray backticks the previous implementation left inside converted <pre><code> blocks."""
+    return re.sub(r"```\n`(.*?)`\n```", lambda m: f"```\n{m.group(1)}\n```", text, flags=re.DOTALL)
+
+
+def legacy_cleanup(document_content: str) -> str:
+    """Clean up document by removing unnecessary HTML/markdown tags and converting HTML to markdown."""
+    import re
+
+    content = document_content
+
+    # First, extract and preserve code blocks to protect them from whitespace cleanup
+    code_blocks = []
+    inline_code = []
+
+    # Extract triple-backtick code blocks
+    def preserve_code_block(match):
+        code_blocks.append(match.group(0))
+        return f"__CODE_BLOCK_{len(code_blocks)-1}__"
+
+    content = re.sub(r'```.*?```', preserve_code_block, content, flags=re.DOTALL)
+
+    # Extract inline code (single backticks)
+    def preserve_inline_code(match):
+        inline_code.append(match.group(0))
+        return f"__INLINE_CODE_{len(inline_code)-1}__"
+
+    content = re.sub(r'`[^`\n]+`', preserve_inline_code, content)
+
+    # Remove HTML comments
+    content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
+
+    # Remove script and style tags completely (including content)
+    content = re.sub(r'<script[^>]*>.*?</script>', '', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.IGNORECASE | re.DOTALL)
+
+    # Remove meta tags, link tags, and other head elements
+    content = re.sub(r'<meta[^>]*/?>', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'<link[^>]*/?>', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'<title[^>]*>.*?</title>', '', content, flags=re.IGNORECASE | re.DOTALL)
+
+    # Convert common HTML elements to markdown
+    # Headers
+    content = re.sub(r'<h1[^>]*>(.*?)</h1>', r'# \1', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<h2[^>]*>(.*?)</h2>', r'## \1', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<h3[^>]*>(.*?)</h3>', r'### \1', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<h4[^>]*>(.*?)</h4>', r'#### \1', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<h5[^>]*>(.*?)</h5>', r'##### \1', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<h6[^>]*>(.*?)</h6>', r'###### \1', content, flags=re.IGNORECASE | re.DOTALL)
+
+    # Bold and italic
+    content = re.sub(r'<strong[^>]*>(.*?)</strong>', r'**\1**', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<b[^>]*>(.*?)</b>', r'**\1**', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<em[^>]*>(.*?)</em>', r'*\1*', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<i[^>]*>(.*?)</i>', r'*\1*', content, flags=re.IGNORECASE | re.DOTALL)
+
+    # Code blocks and inline code (HTML to markdown conversion)
+    content = re.sub(r'<code[^>]*>(.*?)</code>', r'`\1`', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<pre[^>]*><code[^>]*>(.*?)</code></pre>', r'```\n\1\n```', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<pre[^>]*>(.*?)</pre>', r'```\n\1\n```', content, flags=re.IGNORECASE | re.DOTALL)
+
+    # Links
+    content = re.sub(r'<a[^>]*href=["\']([^"\']*)["\'][^>]*>(.*?)</a>', r'[\2](\1)', content, flags=re.IGNORECASE | re.DOTALL)
+
+    # Images
+    content = re.sub(r'<img[^>]*alt=["\']([^"\']*)["\'][^>]*src=["\']([^"\']*)["\'][^>]*/?>', r'![\1](\2)', content, flags=re.IGNORECASE)
+    content = re.sub(r'<img[^>]*src=["\']([^"\']*)["\'][^>]*alt=["\']([^"\']*)["\'][^>]*/?>', r'![\2](\1)', content, flags=re.IGNORECASE)
+    content = re.sub(r'<img[^>]*src=["\']([^"\']*)["\'][^>]*/?>', r'![](\1)', content, flags=re.IGNORECASE)
+
+    # Tables (basic conversion)
+    content = re.sub(r'<table[^>]*>', '\n', content, flags=re.IGNORECASE)
+    content = re.sub(r'</table>', '\n', content, flags=re.IGNORECASE)
+    content = re.sub(r'<tr[^>]*>', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'</tr>', '\n', content, flags=re.IGNORECASE)
+    content = re.sub(r'<th[^>]*>(.*?)</th>', r'| \1 ', content, flags=re.IGNORECASE | re.DOTALL)
+    content = re.sub(r'<td[^>]*>(.*?)</td>', r'| \1 ', content, flags=re.IGNORECASE | re.DOTALL)
+
+    # Lists
+    content = re.sub(r'<ul[^>]*>', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'</ul>', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'<ol[^>]*>', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'</ol>', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'<li[^>]*>(.*?)</li>', r'- \1', content, flags=re.IGNORECASE | re.DOTALL)
+
+    # Paragraphs and line breaks
+    content = re.sub(r'<p[^>]*>', '', content, flags=re.IGNORECASE)
+    content = re.sub(r'</p>', '\n\n', content, flags=re.IGNORECASE)
+    content = re.sub(r'<br[^>]*/?>', '\n', content, flags=re.IGNORECASE)
+
+    # Remove all remaining HTML tags (aggressive cleanup)
+    content = re.sub(r'<[^>]+>', '', content)
+
+    # Decode HTML entities
+    content = html.unescape(content)
+
+    # Clean up excessive whitespace and empty lines (but avoid code block placeholders)
+    content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)  # Multiple empty lines to double
+    content = re.sub(r'[ \t]+\n', '\n', content)  # Trailing whitespace
+    content = re.sub(r'\n[ \t]+', '\n', content)  # Leading whitespace on lines
+    content = re.sub(r'[ \t]+', ' ', content)  # Multiple spaces/tabs to single space
+
+    # Clean up markdown formatting issues
+    content = re.sub(r'#{7,}', '######', content)  # Too many header levels
+    content = re.sub(r'\*{3,}', '**', content)  # Too many asterisks for bold
+    content = re.sub(r'_{3,}', '__', content)  # Too many underscores
+
+    # Remove excessive punctuation
+    content = re.sub(r'\.{4,}', '...', content)  # Multiple dots to ellipsis
+    content = re.sub(r'!{2,}', '!', content)  # Multiple exclamation marks
+    content = re.sub(r'\?{2,}', '?', content)  # Multiple question marks
+
+    # Clean up table formatting
+    content = re.sub(r'\|\s*\|', '|', content)  # Empty table cells
+    content = re.sub(r'\|\s*\n', '|\n', content)  # Trailing spaces in table rows
+
+    # Remove standalone punctuation lines
+    content = re.sub(r'\n[-=_*]{1,3}\n', '\n', content)
+
+    # Clean up list formatting
+    content = re.sub(r'\n-\s*\n', '\n', content)  # Empty list items
+    content = re.sub(r'^-\s*$', '', content, flags=re.MULTILINE)  # Empty list items at line start
+
+    # Restore code blocks and inline code with original formatting preserved
+    for i, code_block in enumerate(code_blocks):
+        content = content.replace(f"__CODE_BLOCK_{i}__", code_block)
+
+    for i, inline in enumerate(inline_code):
+        content = content.replace(f"__INLINE_CODE_{i}__", inline)
+
+    return content.strip()
+
+
+def timed(function, text):
+    start = time.perf_counter()
+    result = function(text)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="0.1,0.3,1,3,10", help="Document sizes in MB, comma-separated (default: 0.1,0.3,1,3,10)")
+    parser.add_argument("--legacy-max-mb", type=float, default=3, help="Largest document to clean up with the previous implementation (default: 3)")
+    options = parser.parse_args()
+
+    print(f"{'size':>8} {'single pass':>12} {'regex':>10} {'speedup':>8}  same output")
+    for size_mb in (float(size) for size in options.sizes.split(",")):
+        document = api_reference(size_mb)
+        result, seconds = timed(cleanup_document, document)
+        if size_mb > options.legacy_max_mb:
+            print(f"{size_mb:>6g}MB {seconds:>11.2f}s {'-':>10} {'-':>8}  -")
+            continue
+        legacy_result, legacy_seconds = timed(legacy_cleanup, document)
+        same = strip_code_fixes(legacy_result) == result
+        print(f"{size_mb:>6g}MB {seconds:>11.2f}s {legacy_seconds:>9.2f}s {legacy_seconds / seconds:>7.1f}x  {'yes' if same else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark the startup time of the doc-check CLI.
+
+Runs each subcommand in a fresh interpreter several times and reports its wall
+time, together with the heavy dependencies it imported. Commands that don't
+need them (help, validate) should import none of them.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--config CONFIG] [--max-seconds S]
+
+Exits with status 1 if a command imports a heavy module it shouldn't, or its
+median time exceeds --max-seconds, so it can run as a CI check.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that take long to import and are only needed by some runs
+HEAVY_MODULES = ["torch", "sentence_transformers", "faiss", "numpy", "openai", "anthropic", "httpx", "requests"]
+
+# Runs the CLI with the given arguments, then reports which heavy modules were imported
+RUNNER = """
+import json, sys
+from doc_check.cli import cli
+try:
+    cli(sys.argv[1:], prog_name="doc-check")
+except SystemExit:
+    pass
+print(json.dumps([name for name in {heavy!r} if name in sys.modules]), file=sys.stderr)
+"""
+
+
+def run_command(args, runs):
+    """Run the CLI with args in fresh interpreters, returning the wall times and heavy imports."""
+    code = RUNNER.format(heavy=HEAVY_MODULES)
+    times = []
+    imported = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-c", code, *args],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        times.append(time.perf_counter() - start)
+        imported = json.loads(process.stderr.strip().splitlines()[-1])
+    return times, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command (default: 5)")
+    parser.add_argument("--config", default="examples/basic-config.yaml", help="Configuration used by validate")
+    parser.add_argument("--max-seconds", type=float, help="Fail if a command's median time exceeds this")
+    options = parser.parse_args()
+
+    # Command, and the heavy modules it is allowed to import
+    commands = [
+        (["--help"], []),
+        (["check", "--help"], []),
+        (["validate", options.config], []),
+    ]
+
+    failed = False
+    print(f"{'command':<40} {'median':>8} {'min':>8}  heavy imports")
+    for args, allowed in commands:
+        times, imported = run_command(args, options.runs)
+        median = statistics.median(times)
+        unexpected = [name for name in imported if name not in allowed]
+        print(f"{' '.join(args):<40} {median:>7.3f}s {min(times):>7.3f}s  {', '.join(imported) or '-'}")
+        if unexpected or (options.max_seconds and median > options.max_seconds):
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
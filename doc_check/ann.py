@@ -0,0 +1,132 @@
+"""Nearest-neighbour index types for RAG retrieval.
+
+Small documents use an exact flat index. Large corpora use approximate
+indexes, which trade a little recall for much faster search:
+
+- hnsw: graph index, fast and accurate, keeps the full vectors in memory
+- ivf-flat: vectors partitioned into clusters, only the closest clusters are searched
+- ivf-pq: like ivf-flat, with vectors compressed by product quantization to a few bytes each;
+  its approximate scores are refined with the exact embeddings, read from the memory-mapped cache
+
+Indexes are built for inner product search over normalized embeddings (cosine
+similarity). Their parameters are returned alongside the index so they can be
+stored with it: search-time settings such as nprobe aren't saved by faiss.
+"""
+
+import math
+from typing import Tuple
+
+INDEX_TYPES = ("auto", "flat", "hnsw", "ivf-flat", "ivf-pq")
+
+# Chunk counts up to which "auto" picks an exact flat index, then HNSW; IVF-PQ above
+AUTO_FLAT_MAX_CHUNKS = 20_000
+AUTO_HNSW_MAX_CHUNKS = 200_000
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+
+# faiss wants at least this many training vectors per IVF cluster or PQ centroid
+MIN_POINTS_PER_CENTROID = 39
+
+PQ_BITS = 8
+PQ_DIMENSIONS_PER_CODE = 8
+
+# IVF-PQ fetches this many candidates per result, which are re-scored exactly
+PQ_RERANK_FACTOR = 8
+
+
+def select_index_type(chunk_count: int) -> str:
+    """Index type used by "auto" for a number of chunks."""
+    if chunk_count <= AUTO_FLAT_MAX_CHUNKS:
+        return "flat"
+    if chunk_count <= AUTO_HNSW_MAX_CHUNKS:
+        return "hnsw"
+    return "ivf-pq"
+
+
+def index_params(index_type: str, chunk_count: int, dimension: int) -> dict:
+    """Build and search parameters of an index type for a corpus size."""
+    if index_type == "auto":
+        index_type = select_index_type(chunk_count)
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {index_type}")
+
+    params = {"type": index_type}
+    if index_type == "hnsw":
+        params.update(m=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, ef_search=HNSW_EF_SEARCH)
+    elif index_type in ("ivf-flat", "ivf-pq"):
+        nlist = max(1, min(int(4 * math.sqrt(chunk_count)), chunk_count // MIN_POINTS_PER_CENTROID))
+        params.update(nlist=nlist, nprobe=min(nlist, max(8, nlist // 10)))
+        if index_type == "ivf-pq":
+            # Largest number of sub-quantizers that divides the dimension, about 8 dimensions each
+            params["pq_m"] = max(m for m in range(1, max(1, dimension // PQ_DIMENSIONS_PER_CODE) + 1) if dimension % m == 0)
+            # Fewer centroids per sub-quantizer when there are too few vectors to train 256
+            params["pq_bits"] = max(1, min(PQ_BITS, int(math.log2(max(2, chunk_count // MIN_POINTS_PER_CENTROID)))))
+    return params
+
+
+def build_index(embeddings, index_type: str = "auto") -> Tuple[object, dict]:
+    """Build and, if needed, train an index over normalized float32 embeddings.
+
+    Returns:
+        The index and its parameters, to be stored with it and passed to apply_search_params() after loading
+    """
+    import faiss
+
+    count, dimension = embeddings.shape
+    params = index_params(index_type, count, dimension)
+
+    if params["type"] == "flat":
+        index = faiss.IndexFlatIP(dimension)
+    elif params["type"] == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, params["m"], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params["ef_construction"]
+    else:
+        quantizer = faiss.IndexFlatIP(dimension)
+        if params["type"] == "ivf-flat":
+            index = faiss.IndexIVFFlat(quantizer, dimension, params["nlist"], faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dimension, params["nlist"], params["pq_m"], params["pq_bits"], faiss.METRIC_INNER_PRODUCT)
+        # The index keeps using the quantizer, which Python would otherwise free
+        index.own_fields = True
+        quantizer.this.disown()
+        index.train(embeddings)
+
+    index.add(embeddings)
+    apply_search_params(index, params)
+    return index, params
+
+
+def apply_search_params(index, params: dict) -> None:
+    """Set the search-time parameters of an index, which faiss doesn't store in the index file."""
+    import faiss
+
+    if params.get("type") == "hnsw":
+        index.hnsw.efSearch = params["ef_search"]
+    elif params.get("type") in ("ivf-flat", "ivf-pq"):
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+
+
+def search(index, params: dict, queries, top_k: int, embeddings=None):
+    """Search an index, re-scoring IVF-PQ candidates with the exact embeddings if given.
+
+    Returns:
+        (scores, indices) arrays of shape (len(queries), top_k), padded with -1 indices like faiss
+    """
+    import numpy as np
+
+    if params.get("type") != "ivf-pq" or embeddings is None:
+        return index.search(queries, top_k)
+
+    _, candidates = index.search(queries, top_k * PQ_RERANK_FACTOR)
+    scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+    indices = np.full((len(queries), top_k), -1, dtype=np.int64)
+    for row, (query, ids) in enumerate(zip(queries, candidates)):
+        # Sorted rows read the memory-mapped embeddings in file order
+        ids = np.sort(ids[ids >= 0])
+        exact = embeddings[ids] @ query
+        best = np.argsort(-exact)[:top_k]
+        scores[row, :len(best)] = exact[best]
+        indices[row, :len(best)] = ids[best]
+    return scores, indices
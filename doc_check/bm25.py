@@ -0,0 +1,145 @@
+"""BM25 keyword retrieval over document chunks.
+
+Dense embeddings match meaning but often miss exact identifiers, such as CLI
+flags, config keys and function names, which documentation questions ask about
+all the time. BM25 ranks chunks by the query terms they contain, and needs
+neither torch nor an embedding model: the index is a sparse term-by-chunk
+matrix of precomputed BM25 weights, so scoring a batch of queries is a single
+sparse matrix product.
+
+The index is stored as plain arrays that are memory-mapped when loaded, like
+the dense index.
+"""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+# Standard BM25 parameters: term frequency saturation and document length normalization
+K1 = 1.5
+B = 0.75
+
+# Identifiers such as --rag-top-k, rag_top_k or doc_check.core stay whole
+TOKEN_PATTERN = re.compile(r"\w+(?:[-.]\w+)*")
+SUBTOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms of a text.
+
+    Compound identifiers produce the whole identifier and its parts, so
+    "--rag-top-k" matches both the exact flag and chunks about "top k".
+    """
+    terms = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        terms.append(token)
+        parts = SUBTOKEN_PATTERN.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+class BM25Index:
+    """Sparse BM25 index of a list of chunk texts."""
+
+    def __init__(self, vocabulary: Dict[str, int], postings):
+        """
+        Args:
+            vocabulary: Row of each term in postings
+            postings: scipy CSR matrix of shape (terms, chunks) holding the BM25 weight of each term in each chunk
+        """
+        self.vocabulary = vocabulary
+        self.postings = postings
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = K1, b: float = B) -> "BM25Index":
+        """Index texts; chunk ids are their positions."""
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        term_ids: List[int] = []
+        counts: List[int] = []
+        for text in texts:
+            for term, count in Counter(tokenize(text)).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+            indptr.append(len(term_ids))
+
+        # Term frequencies, one row per chunk
+        frequencies = csr_matrix(
+            (np.array(counts, dtype=np.float32), np.array(term_ids, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(vocabulary))
+        )
+        chunk_count = frequencies.shape[0]
+        lengths = np.asarray(frequencies.sum(axis=1), dtype=np.float32).ravel()
+        document_frequencies = np.bincount(frequencies.indices, minlength=len(vocabulary))
+        idf = np.log1p((chunk_count - document_frequencies + 0.5) / (document_frequencies + 0.5)).astype(np.float32)
+
+        # Replace each frequency by its BM25 weight
+        length_norms = k1 * (1 - b + b * lengths / max(float(lengths.mean()) if chunk_count else 0.0, 1.0))
+        row_norms = np.repeat(length_norms, np.diff(frequencies.indptr))
+        tf = frequencies.data
+        frequencies.data = idf[frequencies.indices] * tf * (k1 + 1) / (tf + row_norms)
+
+        return cls(vocabulary, frequencies.T.tocsr())
+
+    def search(self, queries: List[str], top_k: int) -> List[List[int]]:
+        """Ids of the top_k highest scoring chunks of each query, best first.
+
+        Chunks sharing no term with a query are never returned, so a query may get fewer than top_k.
+        """
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        rows, columns = [], []
+        for row, query in enumerate(queries):
+            for term in set(tokenize(query)):
+                term_id = self.vocabulary.get(term)
+                if term_id is not None:
+                    rows.append(row)
+                    columns.append(term_id)
+        query_terms = csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+            shape=(len(queries), self.postings.shape[0])
+        )
+        # Only the chunks containing a query term get a score
+        scores = (query_terms @ self.postings).tocsr()
+
+        results = []
+        for row in range(len(queries)):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            chunk_ids, chunk_scores = scores.indices[start:end], scores.data[start:end]
+            # Best score first, ties in document order
+            order = np.lexsort((chunk_ids, -chunk_scores))[:top_k]
+            results.append(chunk_ids[order].tolist())
+        return results
+
+    def save(self, directory: Path) -> None:
+        """Write the index into a directory."""
+        import numpy as np
+
+        terms = sorted(self.vocabulary, key=self.vocabulary.__getitem__)
+        (directory / "bm25.json").write_text(json.dumps({"terms": terms, "chunks": self.postings.shape[1]}), encoding='utf-8')
+        np.save(directory / "bm25_data.npy", self.postings.data)
+        np.save(directory / "bm25_indices.npy", self.postings.indices)
+        np.save(directory / "bm25_indptr.npy", self.postings.indptr)
+
+    @classmethod
+    def load(cls, directory: Path) -> "BM25Index":
+        """Read an index written by save(), memory-mapping its arrays."""
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        metadata = json.loads((directory / "bm25.json").read_text(encoding='utf-8'))
+        terms = metadata["terms"]
+        indptr = np.load(directory / "bm25_indptr.npy", mmap_mode='r')
+        postings = csr_matrix(
+            (np.load(directory / "bm25_data.npy", mmap_mode='r'), np.load(directory / "bm25_indices.npy", mmap_mode='r'), indptr),
+            shape=(len(terms), metadata["chunks"]), copy=False
+        )
+        return cls({term: i for i, term in enumerate(terms)}, postings)
@@ -0,0 +1,228 @@
+"""Persistent on-disk caches shared between doc-check runs."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# Default size cap of each cache, in megabytes
+DEFAULT_CACHE_MAX_SIZE_MB = 500
+
+# Keys looked up per query by get_many, below SQLite's limit on query parameters
+LOOKUP_BATCH_SIZE = 500
+
+# When a cache grows over its cap, evict down to this fraction of it so that
+# eviction doesn't run again on every write
+EVICTION_TARGET_RATIO = 0.9
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory, following the XDG base directory spec."""
+    xdg_cache_home = os.getenv("XDG_CACHE_HOME")
+    base = Path(xdg_cache_home) if xdg_cache_home else Path.home() / ".cache"
+    return base / "doc-check"
+
+
+class SQLiteCache:
+    """Key/value cache stored in a single SQLite file with LRU eviction.
+
+    Entries are evicted, least recently used first, once the total size of the
+    stored values goes over max_size_mb. The cache is safe to use from several
+    threads, and SQLite's locking makes it safe to share between processes.
+    """
+
+    filename = "cache.sqlite3"
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_size_mb: float = DEFAULT_CACHE_MAX_SIZE_MB):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache file. Defaults to default_cache_dir().
+            max_size_mb: Maximum total size of the cached values in megabytes.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.cache_dir / self.filename
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored for key, or None, and mark it as recently used."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store a value and evict old entries if the cache grew over its size cap."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            self._conn.commit()
+            self._evict(self.max_size_bytes)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Return the values stored for the keys that have one, in a single transaction."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[i:i + LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                found.update(self._conn.execute(f"SELECT key, value FROM entries WHERE key IN ({placeholders})", batch))
+            now = time.time()
+            self._conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+            self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, bytes]) -> None:
+        """Store many values in a single transaction, then evict old entries if needed."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                [(key, value, len(value), now) for key, value in items.items()]
+            )
+            self._conn.commit()
+            self._evict(self.max_size_bytes)
+
+    def gc(self) -> int:
+        """Evict entries until the cache is within its size cap. Returns the number removed."""
+        with self._lock:
+            return self._evict(self.max_size_bytes)
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number removed."""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM entries").rowcount
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+            return removed
+
+    def stats(self) -> dict:
+        """Return the number of entries and their total size in bytes."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"path": str(self.path), "entries": entries, "size_bytes": size, "max_size_bytes": self.max_size_bytes}
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self, max_size_bytes: int) -> int:
+        """Drop least recently used entries when over max_size_bytes. Caller holds the lock."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= max_size_bytes:
+            return 0
+
+        to_free = total - int(max_size_bytes * EVICTION_TARGET_RATIO)
+        freed = 0
+        keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            keys.append((key,))
+            freed += size
+            if freed >= to_free:
+                break
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", keys)
+        self._conn.commit()
+        return len(keys)
+
+
+class ResponseCache(SQLiteCache):
+    """Content-addressed cache of LLM responses.
+
+    Responses are keyed on everything that determines them: provider, model,
+    system prompt, full prompt and temperature.
+    """
+
+    filename = "responses.sqlite3"
+
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: str, prompt, temperature: float) -> str:
+        """Build the cache key for a request. prompt may be a string or structured content."""
+        payload = json.dumps(
+            [provider, model, system_prompt, prompt, temperature],
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_response(self, key: str) -> Optional[str]:
+        """Return the cached response text for key, if any."""
+        value = self.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def put_response(self, key: str, response: str) -> None:
+        """Store the response text for key."""
+        self.put(key, response.encode("utf-8"))
+
+
+class EmbeddingCache(SQLiteCache):
+    """Content-addressed cache of chunk embeddings, shared by all documents.
+
+    Embeddings are keyed on the embedding model and the chunk text with its
+    whitespace normalized, so re-indexing an edited document only embeds the
+    chunks that actually changed.
+    """
+
+    filename = "embeddings.sqlite3"
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Build the cache key of a chunk's embedding."""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class SummaryCache(SQLiteCache):
+    """Content-addressed cache of document summaries.
+
+    Summaries are keyed on the hash of the document content, the summarization
+    level, the summarizer model and a version of the prompt, never on where the
+    document lives, so checkouts and CI workers sharing the cache directory
+    reuse each other's summaries.
+    """
+
+    filename = "summaries.sqlite3"
+
+    @staticmethod
+    def make_key(content_hash: str, level: str, model: str, prompt_version: str) -> str:
+        """Build the cache key of a summary."""
+        payload = json.dumps([content_hash, level, model, prompt_version], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_summary(self, key: str) -> Optional[str]:
+        """Return the cached summary for key, if any."""
+        value = self.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def put_summary(self, key: str, summary: str) -> None:
+        """Store the summary for key."""
+        self.put(key, summary.encode("utf-8"))
+
+
+# The persistent caches kept in the cache directory, by name
+CACHES = {"responses": ResponseCache, "embeddings": EmbeddingCache, "summaries": SummaryCache}
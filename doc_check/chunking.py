@@ -0,0 +1,289 @@
+"""Markdown-aware document chunking for RAG.
+
+The document is read once, line by line, into blocks: headings, fenced code
+blocks, tables and paragraphs. Blocks are grouped into chunks along the heading
+hierarchy: a section and its subsections share a chunk while they fit the token
+budget, and a section that is too large is split between blocks. Code blocks
+and tables are never split, even when larger than the budget; paragraphs are
+split between lines, or between words for a single very long line. A heading
+always stays with the block after it, even if that takes the chunk over budget.
+
+Chunks are sized in tokens of a token counter: by default words and punctuation
+marks, which approximate model tokens without loading a tokenizer. The RAG
+indexer counts the word pieces of the embedding model instead when it embeds the
+chunks, so that they fit its input.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+# Default chunk size of the markdown chunker, in tokens. The default embedding
+# model truncates its input at 256 word pieces, special tokens included.
+DEFAULT_CHUNK_TOKENS = 200
+
+# Function returning the number of tokens in a text
+TokenCounter = Callable[[str], int]
+
+# Separator between the headings of a heading path
+HEADING_PATH_SEPARATOR = " > "
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+HEADING_PATTERN = re.compile(r" {0,3}(#{1,6})[ \t]+(.*?)[ \t#]*$")
+FENCE_PATTERN = re.compile(r" {0,3}(`{3,}|~{3,})")
+TABLE_PATTERN = re.compile(r" {0,3}\|")
+
+
+class Block(NamedTuple):
+    """A markdown block: its span in the text, size in tokens and kind."""
+
+    start: int
+    end: int
+    tokens: int
+    kind: str  # "heading", "code", "table" or "paragraph"
+    # Token and line spans used to split paragraphs: (start, end, tokens) of each line
+    lines: Tuple[Tuple[int, int, int], ...] = ()
+
+
+class Section(NamedTuple):
+    """The blocks under a heading, up to the next heading."""
+
+    heading_path: Tuple[str, ...]
+    blocks: List[Block]
+
+    @property
+    def tokens(self) -> int:
+        return sum(block.tokens for block in self.blocks)
+
+
+def count_tokens(text: str) -> int:
+    """Approximate number of model tokens in text."""
+    return sum(1 for _ in TOKEN_PATTERN.finditer(text))
+
+
+def _lines(text: str):
+    """Yield (start, end, line) for each line of text, end excluding the newline."""
+    position = 0
+    for line in text.splitlines(keepends=True):
+        content = line.rstrip("\r\n")
+        yield position, position + len(content), content
+        position += len(line)
+
+
+def parse_sections(text: str, count: TokenCounter = count_tokens) -> List[Section]:
+    """Split a markdown text into sections of blocks, following its headings, sized with count."""
+    sections = [Section((), [])]
+    headings: List[Tuple[int, str]] = []
+    paragraph: List[Tuple[int, int, int]] = []
+    table: List[Tuple[int, int, int]] = []
+    fence: Optional[str] = None
+    fence_start = fence_tokens = 0
+
+    def close(lines, kind):
+        if lines:
+            sections[-1].blocks.append(Block(
+                lines[0][0], lines[-1][1], sum(line[2] for line in lines), kind,
+                tuple(lines) if kind == "paragraph" else ()
+            ))
+            lines.clear()
+
+    for start, end, line in _lines(text):
+        tokens = count(line)
+
+        if fence is not None:
+            fence_tokens += tokens
+            if line.strip().startswith(fence) and not line.strip().strip(fence[0]):
+                sections[-1].blocks.append(Block(fence_start, end, fence_tokens, "code"))
+                fence = None
+            continue
+
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            close(paragraph, "paragraph")
+            close(table, "table")
+            fence, fence_start, fence_tokens = fence_match.group(1), start, tokens
+            continue
+
+        heading_match = HEADING_PATTERN.match(line)
+        if heading_match:
+            close(paragraph, "paragraph")
+            close(table, "table")
+            level = len(heading_match.group(1))
+            headings = [h for h in headings if h[0] < level] + [(level, heading_match.group(2))]
+            sections.append(Section(tuple(title for _, title in headings), [Block(start, end, tokens, "heading")]))
+            continue
+
+        if not line.strip():
+            close(paragraph, "paragraph")
+            close(table, "table")
+        elif TABLE_PATTERN.match(line):
+            close(paragraph, "paragraph")
+            table.append((start, end, tokens))
+        else:
+            close(table, "table")
+            paragraph.append((start, end, tokens))
+
+    close(paragraph, "paragraph")
+    close(table, "table")
+    if fence is not None:
+        # Unterminated fence: the code block runs to the end of the document
+        sections[-1].blocks.append(Block(fence_start, len(text.rstrip()), fence_tokens, "code"))
+
+    return [section for section in sections if section.blocks]
+
+
+def enclosing_section(sections: List[Section], offset: int, max_tokens: int) -> Tuple[int, int]:
+    """Span of the largest section around an offset that fits a token budget.
+    
+    Starts from the section containing the offset, with its subsections, and
+    walks up the heading hierarchy while the enclosing section still fits. If
+    even the first one is too large, the section containing the offset is
+    returned on its own, whatever its size.
+    
+    Args:
+        sections: The sections of the text, from parse_sections()
+        offset: Position in the text
+        max_tokens: Token budget of the section
+    
+    Returns:
+        (start, end) of the section in the text
+    """
+    i = max(bisect_right([section.blocks[0].start for section in sections], offset) - 1, 0)
+    path = sections[i].heading_path
+    first, last = i, i + 1
+    for depth in range(len(path), 0, -1):
+        prefix = path[:depth]
+        start, end = i, i + 1
+        while start > 0 and sections[start - 1].heading_path[:depth] == prefix:
+            start -= 1
+        while end < len(sections) and sections[end].heading_path[:depth] == prefix:
+            end += 1
+        if sum(section.tokens for section in sections[start:end]) > max_tokens:
+            break
+        first, last = start, end
+    return sections[first].blocks[0].start, sections[last - 1].blocks[-1].end
+
+
+def _split_paragraph(text: str, block: Block, max_tokens: int, count: TokenCounter = count_tokens) -> List[Block]:
+    """Split an oversized paragraph between lines, and long lines between words."""
+    pieces = []
+    for start, end, tokens in block.lines:
+        if tokens <= max_tokens:
+            pieces.append(Block(start, end, tokens, "paragraph"))
+            continue
+        group: List[re.Match] = []
+        group_tokens = 0
+        for word in TOKEN_PATTERN.finditer(text, start, end):
+            word_tokens = count(word.group())
+            if group and group_tokens + word_tokens > max_tokens:
+                pieces.append(Block(group[0].start(), group[-1].end(), group_tokens, "paragraph"))
+                group, group_tokens = [], 0
+            group.append(word)
+            group_tokens += word_tokens
+        if group:
+            pieces.append(Block(group[0].start(), group[-1].end(), group_tokens, "paragraph"))
+
+    merged = []
+    for piece in pieces:
+        if merged and merged[-1].tokens + piece.tokens <= max_tokens:
+            last = merged[-1]
+            merged[-1] = Block(last.start, piece.end, last.tokens + piece.tokens, "paragraph")
+        else:
+            merged.append(piece)
+    return merged
+
+
+def markdown_chunks(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS, count: TokenCounter = count_tokens) -> List[Tuple[int, int, str]]:
+    """Chunk a markdown text along its structure.
+
+    Args:
+        text: The document text
+        max_tokens: Token budget of each chunk. Code blocks and tables larger than this form their own chunk.
+        count: Token counter sizing the chunks, such as the tokenizer of the embedding model
+
+    Returns:
+        (start, end, heading path) of each chunk, in document order
+    """
+    chunks = []
+    current: List[Block] = []
+    current_path: Tuple[str, ...] = ()
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append((current[0].start, current[-1].end, HEADING_PATH_SEPARATOR.join(current_path)))
+        current, current_tokens = [], 0
+
+    for section in parse_sections(text, count):
+        # A subsection joins the chunk of its parent section while the whole of it fits
+        nested = current_path and current and section.heading_path[:len(current_path)] == current_path
+        if not (nested and current_tokens + section.tokens <= max_tokens):
+            flush()
+            current_path = section.heading_path
+
+        for block in section.blocks:
+            pieces = [block]
+            if block.kind == "paragraph" and block.tokens > max_tokens:
+                pieces = _split_paragraph(text, block, max_tokens, count)
+            for piece in pieces:
+                # Keep a heading together with the first block after it
+                only_headings = all(b.kind == "heading" for b in current)
+                if current and current_tokens + piece.tokens > max_tokens and not only_headings:
+                    flush()
+                    current_path = section.heading_path
+                current.append(piece)
+                current_tokens += piece.tokens
+
+    flush()
+    return chunks
+
+
+def heading_parts(text: str, max_tokens: int) -> List[Tuple[int, int]]:
+    """Split a markdown text at its headings into parts that fit a token budget.
+
+    Parts start at the headings down to the shallowest depth at which every part
+    fits, so that editing a part doesn't move the boundaries of the others. A
+    section too large on its own is split between blocks, and its oversized
+    paragraphs between lines, like in markdown_chunks; code blocks and tables are
+    never split.
+
+    Args:
+        text: The document text
+        max_tokens: Token budget of each part
+
+    Returns:
+        (start, end) of each part, in document order. Together they cover the whole text.
+    """
+    sections = parse_sections(text)
+    if not sections:
+        return [(0, len(text))]
+
+    for depth in range(max(len(section.heading_path) for section in sections) + 1):
+        groups: List[List[Section]] = []
+        for section in sections:
+            if not groups or 0 < len(section.heading_path) <= depth:
+                groups.append([])
+            groups[-1].append(section)
+        if all(sum(section.tokens for section in group) <= max_tokens for group in groups):
+            break
+
+    starts = []
+    for group in groups:
+        starts.append(group[0].blocks[0].start)
+        tokens, only_headings = 0, True
+        for section in group:
+            for block in section.blocks:
+                pieces = [block]
+                if block.kind == "paragraph" and block.tokens > max_tokens:
+                    pieces = _split_paragraph(text, block, max_tokens)
+                for piece in pieces:
+                    # Keep a heading together with the first block after it
+                    if tokens and tokens + piece.tokens > max_tokens and not only_headings:
+                        starts.append(piece.start)
+                        tokens, only_headings = 0, True
+                    tokens += piece.tokens
+                    only_headings = only_headings and piece.kind == "heading"
+
+    starts[0] = 0
+    return list(zip(starts, starts[1:] + [len(text)]))
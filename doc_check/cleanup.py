@@ -0,0 +1,232 @@
+"""Conversion of HTML and untidy markdown to clean markdown, for --summarize cleanup.
+
+The document is scanned once, left to right, as a sequence of tokens: fenced
+code blocks, inline code, HTML comments, tags and the text between them. Each
+tag is converted to its markdown equivalent as it is met. Elements whose
+markdown form wraps their content (headings, emphasis, links, list items,
+table cells...) are converted only when they are closed later on, like the
+non-greedy patterns this replaces; otherwise the tag is dropped like any other.
+The content of script, style and title elements is dropped.
+
+Code is copied as it is: markdown code spans and fences, and <pre> elements,
+of which only the tags are dropped and the entities decoded. While the rest of
+the text has its whitespace and punctuation normalized, each piece of code
+stands in as a single sentinel character, and is put back with a single split.
+"""
+
+import html
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Tokens, in order of precedence: markdown code fences and inline code, HTML
+# comments, closing tags and other tags, with the element name of opening tags
+CODE_FENCE, INLINE_CODE, COMMENT, CLOSING_TAG, OPENING_TAG = range(1, 6)
+TOKEN_PATTERN = re.compile(
+    r"(```.*?```)"
+    r"|(`[^`\n]+`)"
+    r"|(<!--.*?-->)"
+    r"|</([a-zA-Z][a-zA-Z0-9]*)>"
+    r"|<(?:([a-zA-Z][a-zA-Z0-9]*)(?=[\s/>])[^>]*|[^>]+)>",
+    re.DOTALL
+)
+
+LINK_PATTERN = re.compile(r"""<a[^>]*href=["']([^"']*)["'][^>]*>""", re.IGNORECASE)
+# Images with alt text and source in either order, or a source only: (pattern, alt group, src group)
+IMAGE_PATTERNS = (
+    (re.compile(r"""<img[^>]*alt=["']([^"']*)["'][^>]*src=["']([^"']*)["'][^>]*/?>""", re.IGNORECASE), 1, 2),
+    (re.compile(r"""<img[^>]*src=["']([^"']*)["'][^>]*alt=["']([^"']*)["'][^>]*/?>""", re.IGNORECASE), 2, 1),
+    (re.compile(r"""<img[^>]*src=["']([^"']*)["'][^>]*/?>""", re.IGNORECASE), None, 1),
+)
+
+# Markdown around the content of elements converted when they are closed
+WRAPPING_ELEMENTS = {
+    "h1": ("# ", ""), "h2": ("## ", ""), "h3": ("### ", ""),
+    "h4": ("#### ", ""), "h5": ("##### ", ""), "h6": ("###### ", ""),
+    "strong": ("**", "**"), "b": ("**", "**"), "em": ("*", "*"), "i": ("*", "*"),
+    "code": ("`", "`"),
+    "th": ("| ", " "), "td": ("| ", " "),
+    "li": ("- ", ""),
+}
+
+# Markdown replacing single tags; other tags are dropped
+OPEN_TAGS = {"table": "\n", "br": "\n"}
+CLOSE_TAGS = {"table": "\n", "tr": "\n", "p": "\n\n"}
+
+# Elements dropped with their content
+SKIPPED_ELEMENTS = ("script", "style", "title")
+
+# Whitespace and punctuation normalization of the converted text, in order
+NORMALIZATIONS = [
+    (re.compile(pattern, flags), replacement) for pattern, replacement, flags in (
+        # Whitespace: at most one empty line, no trailing or leading spaces, single spaces
+        (r"\n\s*\n\s*\n+", "\n\n", 0),
+        (r"[ \t]+\n", "\n", 0),
+        (r"\n[ \t]+", "\n", 0),
+        (r"[ \t]+", " ", 0),
+        # Markdown formatting: too many header levels, asterisks or underscores
+        (r"#{7,}", "######", 0),
+        (r"\*{3,}", "**", 0),
+        (r"_{3,}", "__", 0),
+        # Repeated punctuation
+        (r"\.{4,}", "...", 0),
+        (r"!{2,}", "!", 0),
+        (r"\?{2,}", "?", 0),
+        # Empty table cells and trailing spaces in table rows
+        (r"\|\s*\|", "|", 0),
+        (r"\|\s*\n", "|\n", 0),
+        # Standalone punctuation lines and empty list items
+        (r"\n[-=_*]{1,3}\n", "\n", 0),
+        (r"\n-\s*\n", "\n", 0),
+        (r"^-\s*$", "", re.MULTILINE),
+    )
+]
+
+
+@lru_cache(maxsize=None)
+def _closing_tag(name: str) -> "re.Pattern":
+    """Pattern of the closing tag of an element."""
+    return re.compile(f"</{name}>", re.IGNORECASE)
+
+
+def _sentinel(text: str) -> str:
+    """A private use character that doesn't occur in text."""
+    return next(chr(c) for c in range(0xE000, 0xF900) if chr(c) not in text)
+
+
+class _Converter:
+    """Single pass HTML to markdown conversion of a document."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sentinel = _sentinel(text)
+        self.out: List[str] = []
+        self.code: List[str] = []
+        # Open wrapping elements and links waiting for their closing tag
+        self.open_elements: Dict[str, bool] = {}
+        self.link: Optional[str] = None
+        # Content of the <pre> element being read, if any
+        self.pre: Optional[List[str]] = None
+        # Position of the next closing tag of each element, -1 if there is none
+        self.next_close: Dict[str, int] = {}
+
+    def convert(self) -> str:
+        text = self.text
+        position = 0
+        for match in TOKEN_PATTERN.finditer(text):
+            start = match.start()
+            if start < position:
+                # Inside a dropped element
+                continue
+            if start > position:
+                self._text(text[position:start])
+            position = match.end()
+            kind = match.lastindex
+            if kind == CODE_FENCE or kind == INLINE_CODE:
+                self._code(match.group(kind))
+            elif kind == CLOSING_TAG:
+                self._closing_tag(match.group(kind).lower())
+            elif kind == OPENING_TAG:
+                position = self._opening_tag(match.group(kind).lower(), match.group(), position)
+            # Comments and other tags are dropped
+        if position < len(text):
+            self._text(text[position:])
+
+        if self.pre is not None:
+            # Unreachable unless the closing tag was inside code, keep what was read
+            self.out.append("".join(self.pre))
+        return self._normalize("".join(self.out))
+
+    def _text(self, text: str) -> None:
+        if "&" in text:
+            text = html.unescape(text)
+        (self.pre if self.pre is not None else self.out).append(text)
+
+    def _code(self, code: str) -> None:
+        if self.pre is not None:
+            self.pre.append(code)
+        else:
+            self.code.append(code)
+            self.out.append(self.sentinel)
+
+    def _is_closed(self, name: str, position: int) -> bool:
+        """Whether a closing tag of the element follows position."""
+        next_close = self.next_close.get(name)
+        if next_close is None or (0 <= next_close < position):
+            match = _closing_tag(name).search(self.text, position)
+            next_close = self.next_close[name] = match.start() if match else -1
+        return next_close >= position
+
+    def _opening_tag(self, name: str, tag: str, position: int) -> int:
+        """Convert the opening tag of an element, ending at position. Returns the position to continue from."""
+        if name in SKIPPED_ELEMENTS:
+            end = _closing_tag(name).search(self.text, position)
+            return end.end() if end else position
+
+        if self.pre is not None:
+            if name == "br":
+                self.pre.append("\n")
+        elif name == "pre":
+            if self._is_closed(name, position):
+                self.pre = ["```\n"]
+        elif name in WRAPPING_ELEMENTS:
+            if not self.open_elements.get(name) and self._is_closed(name, position):
+                self.open_elements[name] = True
+                self.out.append(WRAPPING_ELEMENTS[name][0])
+        elif name == "a":
+            link = LINK_PATTERN.fullmatch(tag)
+            if link and self.link is None and self._is_closed(name, position):
+                self.link = html.unescape(link.group(1))
+                self.out.append("[")
+        elif name == "img":
+            self.out.append(self._image(tag))
+        elif name in OPEN_TAGS:
+            self.out.append(OPEN_TAGS[name])
+        return position
+
+    def _closing_tag(self, name: str) -> None:
+        if self.pre is not None:
+            if name == "pre":
+                self.pre.append("\n```")
+                block, self.pre = "".join(self.pre), None
+                self._code(block)
+            return
+
+        if name in WRAPPING_ELEMENTS:
+            if self.open_elements.get(name):
+                self.open_elements[name] = False
+                self.out.append(WRAPPING_ELEMENTS[name][1])
+        elif name == "a":
+            if self.link is not None:
+                self.out.append(f"]({self.link})")
+                self.link = None
+        elif name in CLOSE_TAGS:
+            self.out.append(CLOSE_TAGS[name])
+
+    @staticmethod
+    def _image(tag: str) -> str:
+        for pattern, alt_group, src_group in IMAGE_PATTERNS:
+            image = pattern.fullmatch(tag)
+            if image:
+                alt = image.group(alt_group) if alt_group else ""
+                return html.unescape(f"![{alt}]({image.group(src_group)})")
+        return ""
+
+    def _normalize(self, text: str) -> str:
+        """Normalize whitespace and punctuation outside of code, then put the code back."""
+        for pattern, replacement in NORMALIZATIONS:
+            text = pattern.sub(replacement, text)
+        pieces = text.split(self.sentinel)
+        parts = [pieces[0]]
+        for code, piece in zip(self.code, pieces[1:]):
+            parts.append(code)
+            parts.append(piece)
+        return "".join(parts).strip()
+
+
+def cleanup_document(text: str) -> str:
+    """Convert HTML in a document to markdown and tidy up its formatting.
+
+    Code blocks and inline code are kept exactly as they are.
+    """
+    return _Converter(text).convert()
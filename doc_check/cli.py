@@ -10,8 +10,15 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 
-from .core import DocumentChecker, detect_provider_from_model
-from .models import DocCheckResult
+from .ann import INDEX_TYPES
+from .cache import CACHES, DEFAULT_CACHE_MAX_SIZE_MB, default_cache_dir
+from .chunking import DEFAULT_CHUNK_TOKENS
+from .context import DEFAULT_CONTEXT_TOKENS
+from .core import FALLBACK_STEPS, DocumentChecker, detect_provider_from_model, load_config
+from .http_cache import DEFAULT_HTTP_CACHE_TTL, HTTPCache
+from .models import DocCheckResult, RateLimit
+from .providers.retry import DEFAULT_MAX_RETRIES, DEFAULT_REQUEST_TIMEOUT
+from .rag import RETRIEVERS
 
 # Default models
 DEFAULT_OPENAI_MODEL = "gpt-4.1"
@@ -44,7 +51,30 @@ def cli():
 @click.option('--rag-chunk-size', type=int, default=512, help='Size of each document chunk for RAG indexing (default: 512)')
 @click.option('--rag-chunk-overlap', type=int, default=50, help='Overlap between chunks for RAG indexing (default: 50)')
 @click.option('--rag-top-k', type=int, default=5, help='Number of top relevant chunks to retrieve for each question (default: 5)')
-@click.option('--rag-fallback', is_flag=True, help='Retry with full document if RAG-based answer fails evaluation')
+@click.option('--rag-fallback', is_flag=True, help='Retry with more of the document if RAG-based answer fails evaluation')
+@click.option('--rag-fallback-steps', help=f'Comma-separated fallback steps, tried in order until one passes (default: {",".join(FALLBACK_STEPS)})')
+@click.option('--rag-chunker', type=click.Choice(['fixed', 'markdown']), help='How to chunk the document for RAG. fixed: overlapping character windows, markdown: follow headings and keep code blocks and tables whole (default: fixed)')
+@click.option('--rag-chunk-tokens', type=int, help=f'Size of each document chunk in tokens, markdown chunker: word pieces of the embedding model, which truncates its input at 256, or words and punctuation marks with the bm25 retriever (default: {DEFAULT_CHUNK_TOKENS})')
+@click.option('--rag-index', type=click.Choice(INDEX_TYPES), help='Nearest-neighbour index for RAG retrieval: exact flat search, or approximate hnsw, ivf-flat or ivf-pq for large corpora. auto picks one from the number of chunks (default: auto)')
+@click.option('--rag-retriever', type=click.Choice(RETRIEVERS), help='RAG retriever: dense embedding similarity, bm25 keyword matching (no embedding model download), or hybrid, fusing both (default: dense)')
+@click.option('--rag-context-tokens', type=int, help=f'Token budget of the RAG context of each question (default: {DEFAULT_CONTEXT_TOKENS})')
+@click.option('--rag-mmr', type=click.FloatRange(0, 1), help='Diversify the retrieved chunks with maximal marginal relevance, weighting relevance against novelty from 1 (relevance only) to 0; dense and hybrid retrievers (default: off)')
+@click.option('--concurrency', type=int, default=1, help='Number of questions to process in parallel (default: 1)')
+@click.option('--batch-size', type=int, default=1, help='Number of questions to answer in a single request, without RAG (default: 1, no batching)')
+@click.option('--evaluation-batch-size', type=int, default=1, help='Number of answers to evaluate in a single request (default: 1, no batching)')
+@click.option('--requests-per-minute', type=int, help='Maximum requests per minute to the main model (default: learned from the API)')
+@click.option('--tokens-per-minute', type=int, help='Maximum tokens per minute to the main model (default: learned from the API)')
+@click.option('--max-retries', type=int, help=f'Retries of an LLM request after a transient failure (default: {DEFAULT_MAX_RETRIES})')
+@click.option('--request-timeout', type=float, help=f'Timeout of each LLM request in seconds (default: {DEFAULT_REQUEST_TIMEOUT:g})')
+@click.option('--question-timeout', type=float, help='Time budget of each question in seconds (default: no limit)')
+@click.option('--deadline', type=float, help='Time budget of the whole run in seconds, unfinished questions fail (default: no limit)')
+@click.option('--prompt-cache', is_flag=True, help='Send the document as a cacheable prompt prefix so repeated questions reuse it (Anthropic)')
+@click.option('--cache/--no-cache', default=None, help='Reuse LLM responses from the persistent response cache for identical requests (default: off)')
+@click.option('--cache-dir', type=click.Path(path_type=Path), help='Directory for persistent caches (default: $XDG_CACHE_HOME/doc-check)')
+@click.option('--cache-max-size', type=int, help=f'Maximum size of each persistent cache (responses, embeddings, summaries) in MB (default: {DEFAULT_CACHE_MAX_SIZE_MB})')
+@click.option('--incremental', is_flag=True, help='Only re-check questions whose RAG chunks (or document) changed since the previous run, reuse the other results')
+@click.option('--http-cache-ttl', type=float, help=f'Seconds a document fetched from a URL is used before asking the server whether it changed (default: {DEFAULT_HTTP_CACHE_TTL})')
+@click.option('--offline', is_flag=True, help='Load URL documents from the HTTP cache only, without any request')
 def check(
     config_file: Path,
     api_key: Optional[str],
@@ -63,7 +93,30 @@ def check(
     rag_chunk_size: int,
     rag_chunk_overlap: int,
     rag_top_k: int,
-    rag_fallback: bool
+    rag_fallback: bool,
+    concurrency: int,
+    prompt_cache: bool,
+    cache: Optional[bool],
+    cache_dir: Optional[Path],
+    cache_max_size: Optional[int],
+    incremental: bool,
+    batch_size: int,
+    evaluation_batch_size: int,
+    requests_per_minute: Optional[int],
+    tokens_per_minute: Optional[int],
+    max_retries: Optional[int],
+    request_timeout: Optional[float],
+    question_timeout: Optional[float],
+    deadline: Optional[float],
+    rag_chunker: Optional[str],
+    rag_chunk_tokens: Optional[int],
+    rag_index: Optional[str],
+    rag_retriever: Optional[str],
+    rag_context_tokens: Optional[int],
+    rag_mmr: Optional[float],
+    rag_fallback_steps: Optional[str],
+    http_cache_ttl: Optional[float],
+    offline: bool
 ) -> None:
     """Check documentation using LLM-based Q&A evaluation.
     
@@ -73,8 +126,7 @@ def check(
     
     try:
         # Load configuration first to get defaults from config file
-        temp_checker = DocumentChecker()
-        config = temp_checker.load_config(config_file)
+        config = load_config(config_file)
         
         # Use config file values as defaults if command-line options weren't specified
         # Provider: use config value if CLI is default and config specifies one
@@ -117,6 +169,69 @@ def check(
         if not rag_fallback and config.rag_fallback:
             rag_fallback = config.rag_fallback
         
+        if rag_chunker is None:
+            rag_chunker = config.rag_chunker or "fixed"
+        
+        if rag_chunk_tokens is None:
+            rag_chunk_tokens = config.rag_chunk_tokens or DEFAULT_CHUNK_TOKENS
+        
+        if rag_index is None:
+            rag_index = config.rag_index or "auto"
+        if rag_retriever is None:
+            rag_retriever = config.rag_retriever or "dense"
+        if rag_context_tokens is None:
+            rag_context_tokens = config.rag_context_tokens or DEFAULT_CONTEXT_TOKENS
+        if rag_mmr is None:
+            rag_mmr = config.rag_mmr
+        if rag_fallback_steps is not None:
+            rag_fallback_steps = [step.strip() for step in rag_fallback_steps.split(",") if step.strip()]
+        else:
+            rag_fallback_steps = config.rag_fallback_steps
+        
+        # Concurrency: use config value if CLI used the default
+        if concurrency == 1 and config.concurrency:  # 1 is CLI default
+            concurrency = config.concurrency
+        
+        if batch_size == 1 and config.batch_size:  # 1 is CLI default
+            batch_size = config.batch_size
+        
+        if evaluation_batch_size == 1 and config.evaluation_batch_size:  # 1 is CLI default
+            evaluation_batch_size = config.evaluation_batch_size
+        
+        if not prompt_cache and config.prompt_cache:
+            prompt_cache = config.prompt_cache
+        
+        # Response cache: use config values if CLI didn't specify them
+        if cache is None:
+            cache = bool(config.cache)
+        
+        if cache_dir is None and config.cache_dir:
+            cache_dir = Path(config.cache_dir)
+        
+        if cache_max_size is None:
+            cache_max_size = config.cache_max_size_mb or DEFAULT_CACHE_MAX_SIZE_MB
+        
+        if not incremental and config.incremental:
+            incremental = config.incremental
+        
+        if http_cache_ttl is None:
+            http_cache_ttl = config.http_cache_ttl if config.http_cache_ttl is not None else DEFAULT_HTTP_CACHE_TTL
+        if not offline and config.offline:
+            offline = config.offline
+        
+        # Retries and time budgets: use config values if CLI didn't specify them
+        if max_retries is None:
+            max_retries = config.max_retries if config.max_retries is not None else DEFAULT_MAX_RETRIES
+        
+        if request_timeout is None:
+            request_timeout = config.request_timeout or DEFAULT_REQUEST_TIMEOUT
+        
+        if question_timeout is None and config.question_timeout:
+            question_timeout = config.question_timeout
+        
+        if deadline is None and config.deadline:
+            deadline = config.deadline
+        
         # Output settings: use config values if CLI didn't specify
         if output_format is None and config.output_format:
             output_format = config.output_format
@@ -145,6 +260,15 @@ def check(
         if summarize and summarizer_model is None:
             summarizer_model = DEFAULT_SUMMARIZER_MODEL
         
+        # Rate limits: per model from the config, CLI values apply to the main model
+        rate_limits = dict(config.rate_limits or {})
+        if requests_per_minute or tokens_per_minute:
+            limits = rate_limits.get(model) or RateLimit()
+            rate_limits[model] = RateLimit(
+                requests_per_minute=requests_per_minute or limits.requests_per_minute,
+                tokens_per_minute=tokens_per_minute or limits.tokens_per_minute
+            )
+        
         # Initialize checker
         checker = DocumentChecker(
             api_key=api_key, 
@@ -158,7 +282,29 @@ def check(
             rag_chunk_size=rag_chunk_size,
             rag_chunk_overlap=rag_chunk_overlap,
             rag_top_k=rag_top_k,
-            rag_fallback=rag_fallback
+            rag_fallback=rag_fallback,
+            concurrency=concurrency,
+            prompt_cache=prompt_cache,
+            cache=cache,
+            cache_dir=cache_dir,
+            cache_max_size_mb=cache_max_size,
+            incremental=incremental,
+            batch_size=batch_size,
+            evaluation_batch_size=evaluation_batch_size,
+            rate_limits=rate_limits,
+            max_retries=max_retries,
+            request_timeout=request_timeout,
+            question_timeout=question_timeout,
+            deadline=deadline,
+            rag_chunker=rag_chunker,
+            rag_chunk_tokens=rag_chunk_tokens,
+            rag_index=rag_index,
+            rag_retriever=rag_retriever,
+            rag_context_tokens=rag_context_tokens,
+            rag_mmr=rag_mmr,
+            rag_fallback_steps=rag_fallback_steps,
+            http_cache_ttl=http_cache_ttl,
+            offline=offline
         )
         
         # Run the check
@@ -273,11 +419,13 @@ def validate(config_file: Path) -> None:
     console = Console()
     
     try:
-        checker = DocumentChecker()
-        config = checker.load_config(config_file)
+        config = load_config(config_file)
         
         console.print(f"[green]✓ Configuration is valid[/green]")
-        console.print(f"Document: {config.file}")
+        if isinstance(config.file, list):
+            console.print(f"Documents: {', '.join(config.file)}")
+        else:
+            console.print(f"Document: {config.file}")
         console.print(f"Questions: {len(config.questions)}")
         
         for i, question in enumerate(config.questions, 1):
@@ -288,6 +436,86 @@ def validate(config_file: Path) -> None:
         sys.exit(1)
 
 
+@cli.group()
+def cache() -> None:
+    """Inspect and clean up the persistent caches."""
+    pass
+
+
+# The caches managed by the cache command: the SQLite caches and the HTTP cache of URL documents
+CACHE_CLASSES = {**CACHES, "http": HTTPCache}
+
+
+def _open_caches(cache_dir: Optional[Path], cache_max_size: int):
+    """Open the caches that exist in the cache directory, by name."""
+    cache_dir = cache_dir or default_cache_dir()
+    return {
+        name: cache_class(cache_dir, cache_max_size)
+        for name, cache_class in CACHE_CLASSES.items()
+        if (cache_dir / cache_class.filename).exists()
+    }
+
+
+def _format_size(size_bytes: int) -> str:
+    """Format a size in bytes as megabytes."""
+    return f"{size_bytes / (1024 * 1024):.1f} MB"
+
+
+cache_dir_option = click.option('--cache-dir', type=click.Path(path_type=Path), help='Directory for persistent caches (default: $XDG_CACHE_HOME/doc-check)')
+cache_max_size_option = click.option('--cache-max-size', type=int, default=DEFAULT_CACHE_MAX_SIZE_MB, help=f'Maximum size of each persistent cache in MB (default: {DEFAULT_CACHE_MAX_SIZE_MB})')
+
+
+@cache.command()
+@cache_dir_option
+@cache_max_size_option
+def stats(cache_dir: Optional[Path], cache_max_size: int) -> None:
+    """Show the number of entries and the size of each cache."""
+    console = Console()
+    caches = _open_caches(cache_dir, cache_max_size)
+    
+    table = Table(title=f"Caches in {cache_dir or default_cache_dir()}")
+    table.add_column("Cache", style="cyan")
+    table.add_column("Entries", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Max size", justify="right")
+    
+    for name in CACHE_CLASSES:
+        if name not in caches:
+            table.add_row(name, "0", _format_size(0), _format_size(cache_max_size * 1024 * 1024))
+            continue
+        cache_stats = caches[name].stats()
+        caches[name].close()
+        table.add_row(name, str(cache_stats["entries"]), _format_size(cache_stats["size_bytes"]), _format_size(cache_stats["max_size_bytes"]))
+    
+    console.print(table)
+
+
+@cache.command()
+@cache_dir_option
+@cache_max_size_option
+def gc(cache_dir: Optional[Path], cache_max_size: int) -> None:
+    """Evict least recently used entries from caches over their size cap."""
+    console = Console()
+    for name, opened in _open_caches(cache_dir, cache_max_size).items():
+        removed = opened.gc()
+        opened.close()
+        console.print(f"{name}: removed {removed} entries")
+
+
+@cache.command()
+@cache_dir_option
+@click.option('--yes', is_flag=True, help='Don\'t ask for confirmation')
+def clear(cache_dir: Optional[Path], yes: bool) -> None:
+    """Remove every entry from the caches."""
+    console = Console()
+    if not yes:
+        click.confirm(f"Clear all caches in {cache_dir or default_cache_dir()}?", abort=True)
+    for name, opened in _open_caches(cache_dir, DEFAULT_CACHE_MAX_SIZE_MB).items():
+        removed = opened.clear()
+        opened.close()
+        console.print(f"{name}: removed {removed} entries")
+
+
 # For backwards compatibility, make the main command the default
 @click.command()
 @click.argument('config_file', type=click.Path(exists=True, path_type=Path))
@@ -307,7 +535,30 @@ def validate(config_file: Path) -> None:
 @click.option('--rag-chunk-size', type=int, default=512, help='Size of each document chunk for RAG indexing (default: 512)')
 @click.option('--rag-chunk-overlap', type=int, default=50, help='Overlap between chunks for RAG indexing (default: 50)')
 @click.option('--rag-top-k', type=int, default=5, help='Number of top relevant chunks to retrieve for each question (default: 5)')
-@click.option('--rag-fallback', is_flag=True, help='Retry with full document if RAG-based answer fails evaluation')
+@click.option('--rag-fallback', is_flag=True, help='Retry with more of the document if RAG-based answer fails evaluation')
+@click.option('--rag-fallback-steps', help=f'Comma-separated fallback steps, tried in order until one passes (default: {",".join(FALLBACK_STEPS)})')
+@click.option('--rag-chunker', type=click.Choice(['fixed', 'markdown']), help='How to chunk the document for RAG. fixed: overlapping character windows, markdown: follow headings and keep code blocks and tables whole (default: fixed)')
+@click.option('--rag-chunk-tokens', type=int, help=f'Size of each document chunk in tokens, markdown chunker: word pieces of the embedding model, which truncates its input at 256, or words and punctuation marks with the bm25 retriever (default: {DEFAULT_CHUNK_TOKENS})')
+@click.option('--rag-index', type=click.Choice(INDEX_TYPES), help='Nearest-neighbour index for RAG retrieval: exact flat search, or approximate hnsw, ivf-flat or ivf-pq for large corpora. auto picks one from the number of chunks (default: auto)')
+@click.option('--rag-retriever', type=click.Choice(RETRIEVERS), help='RAG retriever: dense embedding similarity, bm25 keyword matching (no embedding model download), or hybrid, fusing both (default: dense)')
+@click.option('--rag-context-tokens', type=int, help=f'Token budget of the RAG context of each question (default: {DEFAULT_CONTEXT_TOKENS})')
+@click.option('--rag-mmr', type=click.FloatRange(0, 1), help='Diversify the retrieved chunks with maximal marginal relevance, weighting relevance against novelty from 1 (relevance only) to 0; dense and hybrid retrievers (default: off)')
+@click.option('--concurrency', type=int, default=1, help='Number of questions to process in parallel (default: 1)')
+@click.option('--batch-size', type=int, default=1, help='Number of questions to answer in a single request, without RAG (default: 1, no batching)')
+@click.option('--evaluation-batch-size', type=int, default=1, help='Number of answers to evaluate in a single request (default: 1, no batching)')
+@click.option('--requests-per-minute', type=int, help='Maximum requests per minute to the main model (default: learned from the API)')
+@click.option('--tokens-per-minute', type=int, help='Maximum tokens per minute to the main model (default: learned from the API)')
+@click.option('--max-retries', type=int, help=f'Retries of an LLM request after a transient failure (default: {DEFAULT_MAX_RETRIES})')
+@click.option('--request-timeout', type=float, help=f'Timeout of each LLM request in seconds (default: {DEFAULT_REQUEST_TIMEOUT:g})')
+@click.option('--question-timeout', type=float, help='Time budget of each question in seconds (default: no limit)')
+@click.option('--deadline', type=float, help='Time budget of the whole run in seconds, unfinished questions fail (default: no limit)')
+@click.option('--prompt-cache', is_flag=True, help='Send the document as a cacheable prompt prefix so repeated questions reuse it (Anthropic)')
+@click.option('--cache/--no-cache', default=None, help='Reuse LLM responses from the persistent response cache for identical requests (default: off)')
+@click.option('--cache-dir', type=click.Path(path_type=Path), help='Directory for persistent caches (default: $XDG_CACHE_HOME/doc-check)')
+@click.option('--cache-max-size', type=int, help=f'Maximum size of each persistent cache (responses, embeddings, summaries) in MB (default: {DEFAULT_CACHE_MAX_SIZE_MB})')
+@click.option('--incremental', is_flag=True, help='Only re-check questions whose RAG chunks (or document) changed since the previous run, reuse the other results')
+@click.option('--http-cache-ttl', type=float, help=f'Seconds a document fetched from a URL is used before asking the server whether it changed (default: {DEFAULT_HTTP_CACHE_TTL})')
+@click.option('--offline', is_flag=True, help='Load URL documents from the HTTP cache only, without any request')
 def main(
     config_file: Path,
     api_key: Optional[str],
@@ -326,14 +577,37 @@ def main(
     rag_chunk_size: int,
     rag_chunk_overlap: int,
     rag_top_k: int,
-    rag_fallback: bool
+    rag_fallback: bool,
+    concurrency: int,
+    prompt_cache: bool,
+    cache: Optional[bool],
+    cache_dir: Optional[Path],
+    cache_max_size: Optional[int],
+    incremental: bool,
+    batch_size: int,
+    evaluation_batch_size: int,
+    requests_per_minute: Optional[int],
+    tokens_per_minute: Optional[int],
+    max_retries: Optional[int],
+    request_timeout: Optional[float],
+    question_timeout: Optional[float],
+    deadline: Optional[float],
+    rag_chunker: Optional[str],
+    rag_chunk_tokens: Optional[int],
+    rag_index: Optional[str],
+    rag_retriever: Optional[str],
+    rag_context_tokens: Optional[int],
+    rag_mmr: Optional[float],
+    rag_fallback_steps: Optional[str],
+    http_cache_ttl: Optional[float],
+    offline: bool
 ) -> None:
     """Check documentation using LLM-based Q&A evaluation.
     
     CONFIG_FILE: Path to the doc-check.yaml configuration file.
     """
     # The main function now just delegates to check() which handles config loading
-    return check(config_file, api_key, model, provider, verbose, output, format, summarize, summarizer_model, verbose_dialog, debug, output_format, output_dir, use_rag, rag_chunk_size, rag_chunk_overlap, rag_top_k, rag_fallback)
+    return click.get_current_context().forward(check)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,161 @@
+"""Assembly of the RAG context sent with a question.
+
+Retrieval returns chunks ranked by relevance, which often overlap (the fixed
+chunker overlaps neighbours on purpose) or sit next to each other in the
+document. Packing them as-is repeats the shared text and cuts passages into
+pieces out of order. The packer takes chunks best first until a token budget is
+spent, counting text shared by several chunks once, then merges them back into
+contiguous spans of the document, in document order. Chunks of a corpus of
+several documents are grouped by document, each group labelled with its source.
+
+Tokens are counted with doc_check.chunking.count_tokens, which approximates the
+model's tokenizer.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from .chunking import TOKEN_PATTERN, count_tokens
+from .corpus import document_element
+
+# Token budget of a question's context: about the 4000 characters used before it was measured in tokens
+DEFAULT_CONTEXT_TOKENS = 1000
+
+# Smallest part of a chunk worth including when the rest doesn't fit the budget
+MIN_PARTIAL_TOKENS = 25
+
+# Candidates considered by MMR for each chunk it selects
+MMR_CANDIDATE_FACTOR = 4
+
+
+def _uncovered(spans: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    """Parts of [start, end) not covered by sorted, disjoint spans."""
+    pieces = []
+    for span_start, span_end in spans:
+        if span_end <= start or span_start >= end:
+            continue
+        if span_start > start:
+            pieces.append((start, span_start))
+        start = max(start, span_end)
+    if start < end:
+        pieces.append((start, end))
+    return pieces
+
+
+def _add_span(spans: List[Tuple[int, int]], start: int, end: int) -> None:
+    """Add [start, end) to sorted, disjoint spans, merging the ones it overlaps or touches."""
+    spans.append((start, end))
+    spans.sort()
+    merged = [spans[0]]
+    for span_start, span_end in spans[1:]:
+        if span_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], span_end))
+        else:
+            merged.append((span_start, span_end))
+    spans[:] = merged
+
+
+def _cut(text: str, pieces: List[Tuple[int, int]], max_tokens: int) -> int:
+    """Offset where the first max_tokens tokens of the uncovered pieces of a chunk end."""
+    cut, tokens = pieces[0][0], 0
+    for start, end in pieces:
+        for match in TOKEN_PATTERN.finditer(text, start, end):
+            if tokens == max_tokens:
+                return cut
+            tokens += 1
+            cut = match.end()
+    return cut
+
+
+def pack_context(chunks: Sequence, max_tokens: int = DEFAULT_CONTEXT_TOKENS) -> Tuple[str, List]:
+    """Pack ranked chunks into a context of at most max_tokens tokens.
+
+    Args:
+        chunks: Retrieved DocumentChunks, best first
+        max_tokens: Token budget of the context
+
+    Returns:
+        The context, with the selected chunks merged into contiguous spans in document
+        order and separated by blank lines, and the chunks it includes, best first
+    """
+    # Covered spans of each text (and document of a corpus) the chunks are views of, in order of first use
+    spans: Dict[Tuple[int, str], List[Tuple[int, int]]] = {}
+    texts: Dict[Tuple[int, str], str] = {}
+    cuts = set()
+    used = []
+    total = 0
+
+    for chunk in chunks:
+        text, key = chunk._text, (id(chunk._text), chunk.source)
+        covered = spans.setdefault(key, [])
+        texts[key] = text
+        pieces = _uncovered(covered, chunk._start, chunk._end)
+        tokens = sum(count_tokens(text[start:end]) for start, end in pieces)
+
+        if total + tokens <= max_tokens:
+            _add_span(covered, chunk._start, chunk._end)
+            used.append(chunk)
+            total += tokens
+            continue
+
+        # Fill the rest of the budget with the start of the chunk, if it's worth it
+        if max_tokens - total >= MIN_PARTIAL_TOKENS:
+            cut = _cut(text, pieces, max_tokens - total)
+            _add_span(covered, chunk._start, cut)
+            cuts.add((key, cut))
+            used.append(chunk)
+        break
+
+    parts = []
+    for key, covered in spans.items():
+        text, source = texts[key], key[1]
+        # Spans separated only by whitespace are one passage
+        passages = []
+        for start, end in covered:
+            if passages and not text[passages[-1][1]:start].strip():
+                passages[-1] = (passages[-1][0], end)
+            else:
+                passages.append((start, end))
+        passages = [text[start:end].strip() + ("..." if (key, end) in cuts else "") for start, end in passages]
+        passages = [passage for passage in passages if passage]
+        if source and passages:
+            parts.append(document_element(source, "\n\n".join(passages)))
+        else:
+            parts.extend(passages)
+
+    return "\n\n".join(parts), used
+
+
+def mmr(query, candidates, k: int, relevance_weight: float) -> List[int]:
+    """Select candidates by maximal marginal relevance.
+
+    Each pick maximizes relevance_weight * similarity to the query minus
+    (1 - relevance_weight) * the highest similarity to an already picked candidate.
+
+    Args:
+        query: Normalized query embedding
+        candidates: Normalized embeddings of the candidates, one row each, most relevant first
+        k: Number of candidates to select
+        relevance_weight: 1.0 ranks by relevance only, lower values favour diversity
+
+    Returns:
+        Positions of the selected candidates, in order of selection
+    """
+    import numpy as np
+
+    candidates = np.asarray(candidates, dtype=np.float32)
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+    selected: List[int] = []
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+
+    while len(selected) < min(k, len(candidates)):
+        penalty = np.where(np.isfinite(redundancy), redundancy, 0.0)
+        scores = relevance_weight * relevance - (1 - relevance_weight) * penalty
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+
+    return selected
@@ -1,12 +1,15 @@
 """Core functionality for document checking."""
 
 import os
-import re
+import asyncio
 import hashlib
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Literal
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Literal, Tuple, Union
 from urllib.parse import urlparse
-from urllib.request import urlopen
 from datetime import datetime
 
 import yaml
@@ -14,9 +17,19 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 
-from .models import DocCheckConfig, DocCheckResult, QuestionResult, ApiUsage
-from .providers import OpenAIProvider, AnthropicProvider, OllamaProvider
-from .rag import RAGIndexer
+from .cache import DEFAULT_CACHE_MAX_SIZE_MB, EmbeddingCache, ResponseCache, SummaryCache
+from .chunking import DEFAULT_CHUNK_TOKENS, count_tokens, heading_parts
+from .cleanup import cleanup_document
+from .context import DEFAULT_CONTEXT_TOKENS
+from .corpus import MAX_LOAD_WORKERS, combine_documents, expand_files
+from .http_cache import DEFAULT_HTTP_CACHE_TTL, HTTPCache, is_url
+from .incremental import IncrementalState
+from .models import DocCheckConfig, DocCheckResult, FallbackStep, Question, QuestionResult, ApiUsage, RateLimit
+from .providers import RateLimiter, get_rate_limiter
+from .providers.retry import (
+    DEFAULT_MAX_RETRIES, DEFAULT_REQUEST_TIMEOUT, DeadlineExceeded, RetryPolicy,
+    count_retries, deadline_scope, remaining_time,
+)
 
 # Summarization prompt templates
 SUMMARIZATION_PROMPTS = {
@@ -79,12 +92,45 @@ Document to clean up:
 Please return the cleaned up version of this document with improved formatting but identical content."""
 }
 
+# Prompt of the reduce pass merging the summaries of the sections of a large document
+MERGE_SUMMARIES_PROMPT = """The following are summaries of consecutive sections of one document, in document order.
+Please merge them into a single summary of the whole document. The merged summary should:
+1. Keep all the information, technical details, code examples and configuration details of the section summaries
+2. Follow the structure of the document, in the same order
+3. Remove repetition between sections, such as repeated introductions or definitions
+4. Not add anything that isn't in the section summaries
+
+Section summaries:
+{summaries}
+
+Please provide the merged summary of the document."""
+
 # Default models
 DEFAULT_OPENAI_MODEL = "gpt-4.1"
 DEFAULT_ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
 DEFAULT_OLLAMA_MODEL = "llama3.2"
 DEFAULT_SUMMARIZER_MODEL = "claude-sonnet-4-20250514"
 
+# Fallback steps after a failed RAG answer, from the cheapest to the most expensive:
+# more chunks, the document section around the best chunk, a summary, the full document
+FALLBACK_STEPS = ("top-k", "section", "summary", "full")
+FALLBACK_LABELS = {"top-k": "larger top-k", "section": "section", "summary": "summary", "full": "full document"}
+
+# Growth of the top-k and the context token budget at the top-k step, and of the budget at the section step
+FALLBACK_TOP_K_FACTOR = 4
+FALLBACK_SECTION_FACTOR = 8
+
+# Version of the cleanup "summary" in the summary cache, to bump when _cleanup_document output changes
+CLEANUP_VERSION = 2
+
+# Documents over this many tokens are summarized section by section, and the
+# section summaries merged in a reduce pass, so that no request overflows the
+# summarizer's context or output limit (8000 tokens for Anthropic)
+SUMMARY_SECTION_TOKENS = 8000
+
+# Summarization level of the summary fallback step
+FALLBACK_SUMMARY_LEVEL = "medium"
+
 
 
 def detect_provider_from_model(model: str) -> str:
@@ -118,10 +164,46 @@ def detect_provider_from_model(model: str) -> str:
     return 'openai'
 
 
+def load_config(config_path: Path) -> DocCheckConfig:
+    """Load and validate a configuration from a YAML file.
+    
+    Needs no provider or API key, so commands that only read the configuration
+    don't have to create a DocumentChecker.
+    """
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        
+        # Validate required fields
+        if not data:
+            raise ValueError("Configuration file is empty")
+        
+        if 'file' not in data:
+            raise ValueError("Configuration must specify 'file' field")
+            
+        if 'questions' not in data or not data['questions']:
+            raise ValueError("Configuration must specify at least one question")
+        
+        config = DocCheckConfig(**data)
+        
+        # Validate questions
+        for i, question in enumerate(config.questions):
+            if not question.name.strip():
+                raise ValueError(f"Question {i+1} must have a non-empty name")
+            if not question.question.strip():
+                raise ValueError(f"Question '{question.name}' must have a non-empty question")
+            if not question.answerEvaluation.strip():
+                raise ValueError(f"Question '{question.name}' must have non-empty answerEvaluation")
+        
+        return config
+    except Exception as e:
+        raise ValueError(f"Failed to load config from {config_path}: {e}")
+
+
 class DocumentChecker:
     """Main class for checking documents with LLM evaluation."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_OPENAI_MODEL, provider: Literal["openai", "anthropic", "ollama"] = "openai", summarize: Optional[str] = None, summarizer_model: Optional[str] = None, verbose_dialog: bool = False, debug: bool = False, use_rag: bool = False, rag_chunk_size: int = 512, rag_chunk_overlap: int = 50, rag_top_k: int = 5, rag_fallback: bool = False):
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_OPENAI_MODEL, provider: Literal["openai", "anthropic", "ollama"] = "openai", summarize: Optional[str] = None, summarizer_model: Optional[str] = None, verbose_dialog: bool = False, debug: bool = False, use_rag: bool = False, rag_chunk_size: int = 512, rag_chunk_overlap: int = 50, rag_top_k: int = 5, rag_fallback: bool = False, concurrency: int = 1, prompt_cache: bool = False, cache: bool = False, cache_dir: Optional[Path] = None, cache_max_size_mb: int = DEFAULT_CACHE_MAX_SIZE_MB, incremental: bool = False, batch_size: int = 1, evaluation_batch_size: int = 1, rate_limits: Optional[Dict[str, RateLimit]] = None, max_retries: int = DEFAULT_MAX_RETRIES, request_timeout: float = DEFAULT_REQUEST_TIMEOUT, question_timeout: Optional[float] = None, deadline: Optional[float] = None, rag_chunker: str = "fixed", rag_chunk_tokens: int = DEFAULT_CHUNK_TOKENS, rag_index: str = "auto", rag_retriever: str = "dense", rag_context_tokens: int = DEFAULT_CONTEXT_TOKENS, rag_mmr: Optional[float] = None, rag_fallback_steps: Optional[List[str]] = None, http_cache_ttl: float = DEFAULT_HTTP_CACHE_TTL, offline: bool = False):
         """Initialize the document checker.
         
         Args:
@@ -136,7 +218,30 @@ class DocumentChecker:
             rag_chunk_size: Size of each document chunk for RAG indexing.
             rag_chunk_overlap: Overlap between chunks for RAG indexing.
             rag_top_k: Number of top relevant chunks to retrieve for each question.
-            rag_fallback: Whether to retry with full document if RAG-based answer fails evaluation.
+            rag_fallback: Whether to retry with more of the document if RAG-based answer fails evaluation.
+            concurrency: Number of questions to process in parallel.
+            prompt_cache: Whether to send the document as a cacheable prompt prefix (Anthropic).
+            cache: Whether to reuse LLM responses from the persistent response cache.
+            cache_dir: Directory of the persistent caches. Defaults to the XDG cache directory.
+            cache_max_size_mb: Maximum size of each persistent cache (responses, embeddings, summaries) in megabytes.
+            incremental: Whether to reuse previous results of questions whose context did not change.
+            batch_size: Number of questions to answer in a single request (1 disables batching).
+            evaluation_batch_size: Number of answers to evaluate in a single request (1 disables batching).
+            rate_limits: Request and token budgets by model name. Limits not set are learned from the API.
+            max_retries: Retries of a request after a transient failure.
+            request_timeout: Timeout of each LLM request in seconds.
+            question_timeout: Time budget of each question in seconds, None for no limit.
+            deadline: Time budget of the whole run in seconds, None for no limit.
+            rag_chunker: How to chunk the document for RAG, "fixed" or "markdown".
+            rag_chunk_tokens: Size of each document chunk in tokens, with the markdown chunker.
+            rag_index: Nearest-neighbour index type for RAG retrieval, "auto" to pick one from the number of chunks.
+            rag_retriever: RAG retriever, "dense" (embeddings), "bm25" (keywords, no embedding model) or "hybrid".
+            rag_context_tokens: Token budget of the RAG context of each question.
+            rag_mmr: Relevance weight (0 to 1) of MMR diversification of the retrieved chunks, None to disable it.
+            rag_fallback_steps: Fallback steps tried in order after a failed RAG answer until one passes, see
+                FALLBACK_STEPS (default: all of them).
+            http_cache_ttl: Seconds a document fetched from a URL is used before asking the server whether it changed.
+            offline: Only load URL documents from the HTTP cache, never make a request.
         """
         self.provider = provider
         self.model = model
@@ -149,80 +254,122 @@ class DocumentChecker:
         self.rag_chunk_overlap = rag_chunk_overlap
         self.rag_top_k = rag_top_k
         self.rag_fallback = rag_fallback
+        self.rag_chunker = rag_chunker
+        self.rag_chunk_tokens = rag_chunk_tokens
+        self.rag_index = rag_index
+        self.rag_retriever = rag_retriever
+        self.rag_context_tokens = rag_context_tokens
+        self.rag_mmr = rag_mmr
+        self.rag_fallback_steps = list(rag_fallback_steps or FALLBACK_STEPS)
+        unknown = [step for step in self.rag_fallback_steps if step not in FALLBACK_STEPS]
+        if unknown:
+            raise ValueError(f"Unknown fallback steps: {', '.join(unknown)} (choose from {', '.join(FALLBACK_STEPS)})")
+        self.concurrency = max(1, concurrency)
+        self.prompt_cache = prompt_cache
+        self.incremental = incremental
+        self.batch_size = max(1, batch_size)
+        self.evaluation_batch_size = max(1, evaluation_batch_size)
+        self.rate_limits = rate_limits or {}
+        self.retry_policy = RetryPolicy(max_retries=max_retries, request_timeout=request_timeout)
+        self.question_timeout = question_timeout
+        self.deadline = deadline
+        # Deadline of the current run, as a time.monotonic() value
+        self._run_deadline = None
         self.console = Console()
         self.rag_indexer = None
+        # RAG contexts and their chunks retrieved ahead of the question loop, keyed by question text
+        self._precomputed_contexts = {}
+        # Document of the current run, and its summary for the summary fallback step, made on first use
+        self._doc_path = None
+        # (source, content) of each document of the current run, summarized if requested
+        self._documents = []
+        self._fallback_summary = None
+        self._fallback_summary_lock = threading.Lock()
+        
+        self.api_key = api_key
+        self.async_main_provider = None
+        self.cache_dir = cache_dir
+        self.cache_max_size_mb = cache_max_size_mb
+        self.response_cache = ResponseCache(cache_dir, cache_max_size_mb) if cache else None
+        self._summary_cache = None
+        self.http_cache_ttl = http_cache_ttl
+        self.offline = offline
+        self._http_cache = None
         
         # Initialize the main provider
         if provider == "anthropic":
             # Set default Claude model if using default OpenAI model
             if model == DEFAULT_OPENAI_MODEL:
                 self.model = DEFAULT_ANTHROPIC_MODEL
-            self.main_provider = AnthropicProvider(api_key=api_key, model=self.model)
         elif provider == "ollama":
             # Set default Ollama model if using default OpenAI model
             if model == DEFAULT_OPENAI_MODEL:
                 self.model = DEFAULT_OLLAMA_MODEL
-            self.main_provider = OllamaProvider(model=self.model)
-        else:
-            self.main_provider = OpenAIProvider(api_key=api_key, model=self.model)
+        self.main_provider = self._create_provider(provider, self.model, prompt_cache=prompt_cache)
         
         # Initialize the summarizer provider (may be different from main provider)
         summarizer_provider_type = detect_provider_from_model(self.summarizer_model)
-        if summarizer_provider_type == "anthropic":
-            self.summarizer_provider = AnthropicProvider(api_key=api_key, model=self.summarizer_model)
-        elif summarizer_provider_type == "ollama":
-            self.summarizer_provider = OllamaProvider(model=self.summarizer_model)
-        else:
-            self.summarizer_provider = OpenAIProvider(api_key=api_key, model=self.summarizer_model)
+        self.summarizer_provider = self._create_provider(summarizer_provider_type, self.summarizer_model)
         
         # Use the main provider's API usage for tracking
         self.api_usage = self.main_provider.api_usage
     
+    def _create_provider(self, provider_type: str, model: str, asynchronous: bool = False, prompt_cache: bool = False):
+        """Create a provider for the given provider type and model.
+        
+        Args:
+            provider_type: "openai", "anthropic" or "ollama". Unknown values use OpenAI.
+            model: Model to use with the provider.
+            asynchronous: Whether to create the asyncio variant of the provider.
+            prompt_cache: Whether to mark the document as a cacheable prefix (Anthropic only).
+        """
+        rate_limiter = self._rate_limiter(provider_type, model)
+        # Imported here so that only the SDK of the providers in use gets loaded
+        if provider_type == "anthropic":
+            from .providers.anthropic import AnthropicProvider, AsyncAnthropicProvider
+            provider_class = AsyncAnthropicProvider if asynchronous else AnthropicProvider
+            return provider_class(api_key=self.api_key, model=model, prompt_cache=prompt_cache, response_cache=self.response_cache, rate_limiter=rate_limiter, retry_policy=self.retry_policy)
+        if provider_type == "ollama":
+            from .providers.ollama import AsyncOllamaProvider, OllamaProvider
+            provider_class = AsyncOllamaProvider if asynchronous else OllamaProvider
+            return provider_class(model=model, response_cache=self.response_cache, rate_limiter=rate_limiter, retry_policy=self.retry_policy)
+        from .providers.openai import AsyncOpenAIProvider, OpenAIProvider
+        provider_class = AsyncOpenAIProvider if asynchronous else OpenAIProvider
+        return provider_class(api_key=self.api_key, model=model, response_cache=self.response_cache, rate_limiter=rate_limiter, retry_policy=self.retry_policy)
+    
+    def _rate_limiter(self, provider_type: str, model: str) -> RateLimiter:
+        """Rate limiter shared by every client of a provider and model, with its configured budgets."""
+        limits = self.rate_limits.get(model) or RateLimit()
+        return get_rate_limiter(provider_type, model, limits.requests_per_minute, limits.tokens_per_minute)
+    
     def load_config(self, config_path: Path) -> DocCheckConfig:
         """Load configuration from YAML file."""
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            # Validate required fields
-            if not data:
-                raise ValueError("Configuration file is empty")
-            
-            if 'file' not in data:
-                raise ValueError("Configuration must specify 'file' field")
-                
-            if 'questions' not in data or not data['questions']:
-                raise ValueError("Configuration must specify at least one question")
-            
-            config = DocCheckConfig(**data)
-            
-            # Validate questions
-            for i, question in enumerate(config.questions):
-                if not question.name.strip():
-                    raise ValueError(f"Question {i+1} must have a non-empty name")
-                if not question.question.strip():
-                    raise ValueError(f"Question '{question.name}' must have a non-empty question")
-                if not question.answerEvaluation.strip():
-                    raise ValueError(f"Question '{question.name}' must have non-empty answerEvaluation")
-            
-            return config
-        except Exception as e:
-            raise ValueError(f"Failed to load config from {config_path}: {e}")
+        return load_config(config_path)
+    
+    def _document_path(self, config_path: Path, file: str) -> Path:
+        """Resolve the document of a configuration relative to the configuration file.
+        
+        A URL document is named after the last part of its path, next to the
+        configuration file, so that its RAG index is cached there.
+        """
+        if is_url(file):
+            url = urlparse(file)
+            return config_path.parent / (Path(url.path).name or url.netloc)
+        return config_path.parent / file
     
     def load_document(self, doc_path: Path) -> str:
         """Load document content from file or URL."""
         doc_str = str(doc_path)
         
         # Check if it's a URL
-        if doc_str.startswith(('http://', 'https://')):
+        if is_url(doc_str):
             try:
-                with urlopen(doc_str) as response:
-                    content = response.read()
-                    # Try to decode as UTF-8, fallback to latin-1
-                    try:
-                        return content.decode('utf-8')
-                    except UnicodeDecodeError:
-                        return content.decode('latin-1')
+                content = self.http_cache.fetch(doc_str).read_bytes()
+                # Try to decode as UTF-8, fallback to latin-1
+                try:
+                    return content.decode('utf-8')
+                except UnicodeDecodeError:
+                    return content.decode('latin-1')
             except Exception as e:
                 raise ValueError(f"Failed to load document from URL {doc_str}: {e}")
         
@@ -241,12 +388,52 @@ class DocumentChecker:
         except Exception as e:
             raise ValueError(f"Failed to load document from {doc_path}: {e}")
     
-    def ask_question(self, document_content: str, question: str) -> str:
-        """Ask a question about the document using LLM."""
+    def load_documents(self, config_path: Path, files: Union[str, List[str]]) -> List[Tuple[str, str]]:
+        """Load the documents of a configuration, several at a time.
+        
+        Args:
+            config_path: The configuration file, which files are relative to
+            files: The file of the configuration: a file, URL or glob pattern, or a list of them
+        
+        Returns:
+            (source, content) of each document, in the order of the configuration
+        """
+        sources = expand_files(config_path.parent, files)
+        
+        def load(source: str) -> str:
+            return self.load_document(source if is_url(source) else config_path.parent / source)
+        
+        if len(sources) == 1:
+            return [(sources[0], load(sources[0]))]
+        # URL documents share the connections of the HTTP cache's client
+        with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(sources))) as executor:
+            contents = list(executor.map(load, sources))
+        self.console.print(f"[green]Loaded {len(sources)} documents[/green]")
+        return list(zip(sources, contents))
+    
+    @staticmethod
+    def _combined_content(documents: List[Tuple[str, str]]) -> str:
+        """Content of the documents of a run as one document."""
+        if len(documents) == 1:
+            return documents[0][1]
+        return combine_documents(documents)[0]
+    
+    def _corpus_path(self, config_path: Path, documents: List[Tuple[str, str]]) -> Path:
+        """Path naming the documents of a run: the document, or the configuration file for several."""
+        if len(documents) == 1:
+            return self._document_path(config_path, documents[0][0])
+        return config_path
+    
+    def _content_for_question(self, document_content: str, question: str) -> str:
+        """Select the content to send with a question (RAG context or full document)."""
         if self.use_rag and self.rag_indexer:
             # Use RAG to get relevant context
-            context = self.rag_indexer.get_context_for_question(question)
-            content_to_use = context
+            precomputed = self._precomputed_contexts.get(question)
+            if precomputed is None:
+                precomputed = self._precomputed_contexts[question] = self.rag_indexer.get_context_with_chunks(
+                    question, self.rag_context_tokens, self.rag_top_k, self.rag_mmr
+                )
+            content_to_use = precomputed[0]
         else:
             content_to_use = document_content
         
@@ -256,421 +443,1029 @@ class DocumentChecker:
             formatter = CLIFormatter(console=self.console)
             formatter.display_debug_prompt(question, content_to_use, "question")
         
+        return content_to_use
+    
+    def _show_debug_evaluation(self, question: str, answer: str, evaluation_criteria: str) -> None:
+        """Show the evaluation prompt in debug mode."""
+        if self.debug:
+            from .output.cli import CLIFormatter
+            formatter = CLIFormatter(console=self.console)
+            formatter.display_debug_evaluation(question, answer, evaluation_criteria)
+    
+    def _show_debug_response(self, provider, response_type: str) -> None:
+        """Show the raw provider response in debug mode."""
+        if self.debug and hasattr(provider, 'last_raw_response'):
+            from .output.cli import CLIFormatter
+            formatter = CLIFormatter(console=self.console)
+            formatter.display_debug_raw_response(provider.last_raw_response, response_type)
+    
+    def ask_question(self, document_content: str, question: str) -> str:
+        """Ask a question about the document using LLM."""
+        content_to_use = self._content_for_question(document_content, question)
+        
         answer = self.main_provider.ask(content_to_use, question)
         
         # Show raw response in debug mode
-        if self.debug and hasattr(self.main_provider, 'last_raw_response'):
-            from .output.cli import CLIFormatter
-            formatter = CLIFormatter(console=self.console)
-            formatter.display_debug_raw_response(self.main_provider.last_raw_response, "Question Response")
+        self._show_debug_response(self.main_provider, "Question Response")
         
         return answer
     
-    
     def evaluate_answer(self, question: str, answer: str, evaluation_criteria: str) -> tuple[bool, str]:
         """Evaluate an answer against criteria using LLM."""
         # Show debug information if requested
-        if self.debug:
-            from .output.cli import CLIFormatter
-            formatter = CLIFormatter(console=self.console)
-            formatter.display_debug_evaluation(question, answer, evaluation_criteria)
+        self._show_debug_evaluation(question, answer, evaluation_criteria)
         
         result = self.main_provider.evaluate(question, answer, evaluation_criteria)
         
         # Show raw response in debug mode
-        if self.debug and hasattr(self.main_provider, 'last_raw_response'):
-            from .output.cli import CLIFormatter
-            formatter = CLIFormatter(console=self.console)
-            formatter.display_debug_raw_response(self.main_provider.last_raw_response, "Evaluation Response")
+        self._show_debug_response(self.main_provider, "Evaluation Response")
         
         return result
     
+    async def ask_question_async(self, document_content: str, question: str) -> str:
+        """Ask a question about the document using the async provider."""
+        # Retrieval runs the embedding model, keep it off the event loop
+        content_to_use = await asyncio.to_thread(self._content_for_question, document_content, question)
+        
+        answer = await self.async_main_provider.ask(content_to_use, question)
+        
+        # Show raw response in debug mode
+        self._show_debug_response(self.async_main_provider, "Question Response")
+        
+        return answer
     
+    async def evaluate_answer_async(self, question: str, answer: str, evaluation_criteria: str) -> tuple[bool, str]:
+        """Evaluate an answer against criteria using the async provider."""
+        # Show debug information if requested
+        self._show_debug_evaluation(question, answer, evaluation_criteria)
+        
+        result = await self.async_main_provider.evaluate(question, answer, evaluation_criteria)
+        
+        # Show raw response in debug mode
+        self._show_debug_response(self.async_main_provider, "Evaluation Response")
+        
+        return result
     
     def _get_document_hash(self, content: str) -> str:
         """Calculate SHA1 hash of document content."""
         return hashlib.sha1(content.encode('utf-8')).hexdigest()
     
-    def _get_cache_filename(self, doc_path: Path, content_hash: str, level: str, model: str) -> Path:
-        """Generate cache filename for summarized document."""
-        # Clean model name for filename (replace problematic characters)
-        clean_model = re.sub(r'[^\w\-.]', '_', model)
-        cache_name = f"{doc_path.name}.{content_hash}.summary.{level}.{clean_model}"
-        return doc_path.parent / cache_name
+    @property
+    def http_cache(self) -> HTTPCache:
+        """The on-disk cache of URL documents, opened on first use."""
+        if self._http_cache is None:
+            self._http_cache = HTTPCache(self.cache_dir, self.cache_max_size_mb, self.http_cache_ttl, self.offline)
+        return self._http_cache
     
-    def _load_cached_summary(self, cache_path: Path) -> Optional[str]:
-        """Load cached summary if it exists."""
-        if cache_path.exists():
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-            except Exception:
-                # If we can't read the cache file, ignore it
-                pass
-        return None
-    
-    def _save_cached_summary(self, cache_path: Path, summary: str) -> None:
-        """Save summary to cache file."""
+    @property
+    def summary_cache(self) -> SummaryCache:
+        """The persistent summary cache, opened on first use."""
+        if self._summary_cache is None:
+            self._summary_cache = SummaryCache(self.cache_dir, self.cache_max_size_mb)
+        return self._summary_cache
+    
+    def _summary_cache_key(self, document_content: str, level: str) -> str:
+        """Cache key of the summary of a document at a level, with the summarizer model and prompt version."""
+        if level == "cleanup":
+            # Cleanup doesn't use a model; its version stands for the prompt's
+            model, prompt_version = "", f"cleanup-{CLEANUP_VERSION}"
+        else:
+            model = self.summarizer_model
+            template = SUMMARIZATION_PROMPTS.get(level, SUMMARIZATION_PROMPTS["medium"])
+            prompt_version = hashlib.sha1(template.encode('utf-8')).hexdigest()
+        return SummaryCache.make_key(self._get_document_hash(document_content), level, model, prompt_version)
+    
+    def _load_cached_summary(self, cache_key: str) -> Optional[str]:
+        """Load a cached summary if there is one."""
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                f.write(summary)
+            return self.summary_cache.get_summary(cache_key)
         except Exception:
-            # If we can't write the cache file, just continue without caching
+            # If we can't read the cache, ignore it
+            return None
+    
+    def _save_cached_summary(self, cache_key: str, summary: str) -> None:
+        """Save a summary to the cache."""
+        try:
+            self.summary_cache.put_summary(cache_key, summary)
+        except Exception:
+            # If we can't write the cache, just continue without caching
             pass
     
     def _cleanup_document(self, document_content: str) -> str:
         """Clean up document by removing unnecessary HTML/markdown tags and converting HTML to markdown."""
-        import re
-        
-        content = document_content
-        
-        # First, extract and preserve code blocks to protect them from whitespace cleanup
-        code_blocks = []
-        inline_code = []
-        
-        # Extract triple-backtick code blocks
-        def preserve_code_block(match):
-            code_blocks.append(match.group(0))
-            return f"__CODE_BLOCK_{len(code_blocks)-1}__"
-        
-        content = re.sub(r'```.*?```', preserve_code_block, content, flags=re.DOTALL)
-        
-        # Extract inline code (single backticks)
-        def preserve_inline_code(match):
-            inline_code.append(match.group(0))
-            return f"__INLINE_CODE_{len(inline_code)-1}__"
-        
-        content = re.sub(r'`[^`\n]+`', preserve_inline_code, content)
-        
-        # Remove HTML comments
-        content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
-        
-        # Remove script and style tags completely (including content)
-        content = re.sub(r'<script[^>]*>.*?</script>', '', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Remove meta tags, link tags, and other head elements
-        content = re.sub(r'<meta[^>]*/?>', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'<link[^>]*/?>', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'<title[^>]*>.*?</title>', '', content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Convert common HTML elements to markdown
-        # Headers
-        content = re.sub(r'<h1[^>]*>(.*?)</h1>', r'# \1', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<h2[^>]*>(.*?)</h2>', r'## \1', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<h3[^>]*>(.*?)</h3>', r'### \1', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<h4[^>]*>(.*?)</h4>', r'#### \1', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<h5[^>]*>(.*?)</h5>', r'##### \1', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<h6[^>]*>(.*?)</h6>', r'###### \1', content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Bold and italic
-        content = re.sub(r'<strong[^>]*>(.*?)</strong>', r'**\1**', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<b[^>]*>(.*?)</b>', r'**\1**', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<em[^>]*>(.*?)</em>', r'*\1*', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<i[^>]*>(.*?)</i>', r'*\1*', content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Code blocks and inline code (HTML to markdown conversion)
-        content = re.sub(r'<code[^>]*>(.*?)</code>', r'`\1`', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<pre[^>]*><code[^>]*>(.*?)</code></pre>', r'```\n\1\n```', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<pre[^>]*>(.*?)</pre>', r'```\n\1\n```', content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Links
-        content = re.sub(r'<a[^>]*href=["\']([^"\']*)["\'][^>]*>(.*?)</a>', r'[\2](\1)', content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Images
-        content = re.sub(r'<img[^>]*alt=["\']([^"\']*)["\'][^>]*src=["\']([^"\']*)["\'][^>]*/?>', r'![\1](\2)', content, flags=re.IGNORECASE)
-        content = re.sub(r'<img[^>]*src=["\']([^"\']*)["\'][^>]*alt=["\']([^"\']*)["\'][^>]*/?>', r'![\2](\1)', content, flags=re.IGNORECASE)
-        content = re.sub(r'<img[^>]*src=["\']([^"\']*)["\'][^>]*/?>', r'![](\1)', content, flags=re.IGNORECASE)
-        
-        # Tables (basic conversion)
-        content = re.sub(r'<table[^>]*>', '\n', content, flags=re.IGNORECASE)
-        content = re.sub(r'</table>', '\n', content, flags=re.IGNORECASE)
-        content = re.sub(r'<tr[^>]*>', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'</tr>', '\n', content, flags=re.IGNORECASE)
-        content = re.sub(r'<th[^>]*>(.*?)</th>', r'| \1 ', content, flags=re.IGNORECASE | re.DOTALL)
-        content = re.sub(r'<td[^>]*>(.*?)</td>', r'| \1 ', content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Lists
-        content = re.sub(r'<ul[^>]*>', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'</ul>', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'<ol[^>]*>', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'</ol>', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'<li[^>]*>(.*?)</li>', r'- \1', content, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Paragraphs and line breaks
-        content = re.sub(r'<p[^>]*>', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'</p>', '\n\n', content, flags=re.IGNORECASE)
-        content = re.sub(r'<br[^>]*/?>', '\n', content, flags=re.IGNORECASE)
-        
-        # Remove all remaining HTML tags (aggressive cleanup)
-        content = re.sub(r'<[^>]+>', '', content)
-        
-        # Decode HTML entities
-        import html
-        content = html.unescape(content)
-        
-        # Clean up excessive whitespace and empty lines (but avoid code block placeholders)
-        content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)  # Multiple empty lines to double
-        content = re.sub(r'[ \t]+\n', '\n', content)  # Trailing whitespace
-        content = re.sub(r'\n[ \t]+', '\n', content)  # Leading whitespace on lines
-        content = re.sub(r'[ \t]+', ' ', content)  # Multiple spaces/tabs to single space
-        
-        # Clean up markdown formatting issues
-        content = re.sub(r'#{7,}', '######', content)  # Too many header levels
-        content = re.sub(r'\*{3,}', '**', content)  # Too many asterisks for bold
-        content = re.sub(r'_{3,}', '__', content)  # Too many underscores
-        
-        # Remove excessive punctuation
-        content = re.sub(r'\.{4,}', '...', content)  # Multiple dots to ellipsis
-        content = re.sub(r'!{2,}', '!', content)  # Multiple exclamation marks
-        content = re.sub(r'\?{2,}', '?', content)  # Multiple question marks
-        
-        # Clean up table formatting
-        content = re.sub(r'\|\s*\|', '|', content)  # Empty table cells
-        content = re.sub(r'\|\s*\n', '|\n', content)  # Trailing spaces in table rows
-        
-        # Remove standalone punctuation lines
-        content = re.sub(r'\n[-=_*]{1,3}\n', '\n', content)
-        
-        # Clean up list formatting
-        content = re.sub(r'\n-\s*\n', '\n', content)  # Empty list items
-        content = re.sub(r'^-\s*$', '', content, flags=re.MULTILINE)  # Empty list items at line start
-        
-        # Restore code blocks and inline code with original formatting preserved
-        for i, code_block in enumerate(code_blocks):
-            content = content.replace(f"__CODE_BLOCK_{i}__", code_block)
-        
-        for i, inline in enumerate(inline_code):
-            content = content.replace(f"__INLINE_CODE_{i}__", inline)
-        
-        return content.strip()
-    
-    def summarize_document(self, document_content: str, doc_path: Path) -> str:
-        """Summarize the document content using the summarizer model."""
-        # Calculate hash of document content for caching
-        content_hash = self._get_document_hash(document_content)
-        cache_path = self._get_cache_filename(doc_path, content_hash, self.summarize, self.summarizer_model)
+        return cleanup_document(document_content)
+    
+    def _summarization_prompt(self, document_content: str, level: Optional[str] = None) -> str:
+        """Build the summarization prompt for a level (default: the configured one)."""
+        prompt_template = SUMMARIZATION_PROMPTS.get(level or self.summarize, SUMMARIZATION_PROMPTS["medium"])
+        return prompt_template.format(document_content=document_content)
+    
+    def _summary_sections(self, document_content: str) -> List[str]:
+        """Split a document at its headings into sections summarized separately, or keep it whole if it fits."""
+        if count_tokens(document_content) <= SUMMARY_SECTION_TOKENS:
+            return [document_content]
+        sections = [document_content[start:end] for start, end in heading_parts(document_content, SUMMARY_SECTION_TOKENS)]
+        return [section for section in sections if section.strip()]
+    
+    def _merge_summaries_prompt(self, summaries: List[str], level: str) -> Optional[str]:
+        """Build the reduce prompt merging section summaries, or None if they are better joined as they are.
+        
+        The minimal level keeps all of the content, and summaries too long for
+        a single request would only be truncated, so those are joined.
+        """
+        joined = "\n\n".join(summary.strip() for summary in summaries)
+        if level == "minimal" or count_tokens(joined) > SUMMARY_SECTION_TOKENS:
+            return None
+        return MERGE_SUMMARIES_PROMPT.format(summaries=joined)
+    
+    def _report_section_summaries(self, sections: List[str], cached: int) -> None:
+        """Announce a section by section summarization."""
+        self.console.print(f"[green]Summarizing {len(sections)} sections[/green] ({cached} cached)")
+    
+    def _map_reduce_summary(self, sections: List[str], level: str) -> str:
+        """Summarize sections in parallel, reusing cached section summaries, and merge the summaries."""
+        cache_keys = [self._summary_cache_key(section, level) for section in sections]
+        summaries = [self._load_cached_summary(cache_key) for cache_key in cache_keys]
+        missing = [i for i, summary in enumerate(summaries) if not summary]
+        self._report_section_summaries(sections, len(sections) - len(missing))
+        
+        def summarize(i: int) -> str:
+            summary = self.summarizer_provider.summarize(self._summarization_prompt(sections[i], level))
+            self._save_cached_summary(cache_keys[i], summary)
+            return summary
+        
+        concurrency = min(self.concurrency, len(missing))
+        if concurrency <= 1:
+            new_summaries = [summarize(i) for i in missing]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="doc-check") as executor:
+                new_summaries = list(executor.map(summarize, missing))
+        for i, summary in zip(missing, new_summaries):
+            summaries[i] = summary
+        
+        prompt = self._merge_summaries_prompt(summaries, level)
+        return self.summarizer_provider.summarize(prompt) if prompt else "\n\n".join(summaries)
+    
+    async def _map_reduce_summary_async(self, sections: List[str], level: str, summarizer_provider) -> str:
+        """Async variant of _map_reduce_summary, with at most `concurrency` sections in flight."""
+        cache_keys = [self._summary_cache_key(section, level) for section in sections]
+        summaries = [self._load_cached_summary(cache_key) for cache_key in cache_keys]
+        missing = [i for i, summary in enumerate(summaries) if not summary]
+        self._report_section_summaries(sections, len(sections) - len(missing))
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def summarize(i: int) -> str:
+            async with semaphore:
+                summary = await summarizer_provider.summarize(self._summarization_prompt(sections[i], level))
+            self._save_cached_summary(cache_keys[i], summary)
+            return summary
+        
+        new_summaries = await asyncio.gather(*(summarize(i) for i in missing))
+        for i, summary in zip(missing, new_summaries):
+            summaries[i] = summary
+        
+        prompt = self._merge_summaries_prompt(summaries, level)
+        return await summarizer_provider.summarize(prompt) if prompt else "\n\n".join(summaries)
+    
+    def _merge_summarizer_usage(self, summarizer_provider) -> None:
+        """Merge summarizer usage into main API usage tracking."""
+        self.api_usage.merge(summarizer_provider.api_usage)
+        
+        # Reset summarizer usage to avoid double counting
+        summarizer_provider.api_usage = type(summarizer_provider.api_usage)(
+            provider=summarizer_provider.api_usage.provider,
+            model=summarizer_provider.api_usage.model
+        )
+    
+    def summarize_document(self, document_content: str, doc_path: Path, level: Optional[str] = None) -> str:
+        """Summarize the document content using the summarizer model, at a level (default: the configured one)."""
+        level = level or self.summarize
+        cache_key = self._summary_cache_key(document_content, level)
         
         # Check for cached summary
-        cached_summary = self._load_cached_summary(cache_path)
+        cached_summary = self._load_cached_summary(cache_key)
         if cached_summary:
-            self.console.print(f"[green]Using cached summary[/green] ({cache_path.name})")
+            self.console.print(f"[green]Using cached summary[/green] ({doc_path.name}, {level})")
             return cached_summary
         
         # Handle cleanup mode without using LLM
-        if self.summarize == "cleanup":
+        if level == "cleanup":
             try:
                 summary = self._cleanup_document(document_content)
                 # Save summary to cache
-                self._save_cached_summary(cache_path, summary)
+                self._save_cached_summary(cache_key, summary)
                 return summary
             except Exception as e:
                 raise RuntimeError(f"Failed to clean up document: {e}")
         
-
-        # Get summarization prompt based on level
-        prompt_template = SUMMARIZATION_PROMPTS.get(self.summarize, SUMMARIZATION_PROMPTS["medium"])
-        prompt = prompt_template.format(document_content=document_content)
-
         try:
-            summary = self.summarizer_provider.summarize(prompt)
-            
-            # Merge summarizer usage into main API usage tracking
-            self.api_usage.input_tokens += self.summarizer_provider.api_usage.input_tokens
-            self.api_usage.output_tokens += self.summarizer_provider.api_usage.output_tokens
-            self.api_usage.total_tokens += self.summarizer_provider.api_usage.total_tokens
-            self.api_usage.api_calls += self.summarizer_provider.api_usage.api_calls
-            self.api_usage.estimated_cost += self.summarizer_provider.api_usage.estimated_cost
-            
-            # Reset summarizer usage to avoid double counting
-            self.summarizer_provider.api_usage = type(self.summarizer_provider.api_usage)(
-                provider=self.summarizer_provider.api_usage.provider,
-                model=self.summarizer_provider.api_usage.model
-            )
+            sections = self._summary_sections(document_content)
+            if len(sections) == 1:
+                summary = self.summarizer_provider.summarize(self._summarization_prompt(document_content, level))
+            else:
+                summary = self._map_reduce_summary(sections, level)
+            
+            self._merge_summarizer_usage(self.summarizer_provider)
             
             # Save summary to cache
-            self._save_cached_summary(cache_path, summary)
+            self._save_cached_summary(cache_key, summary)
             
             return summary
             
         except Exception as e:
             raise RuntimeError(f"Failed to summarize document: {e}")
     
-    def check_document(self, config_path: Path) -> DocCheckResult:
-        """Check a document according to the configuration."""
-        start_time = datetime.now()
+    async def summarize_document_async(self, document_content: str, doc_path: Path, summarizer_provider) -> str:
+        """Summarize the document content using an async summarizer provider."""
+        # Cached summaries and cleanup mode don't involve the LLM
+        cache_key = self._summary_cache_key(document_content, self.summarize)
+        if self.summarize == "cleanup" or self._load_cached_summary(cache_key):
+            return self.summarize_document(document_content, doc_path)
         
-        # Load configuration
-        config = self.load_config(config_path)
+        try:
+            sections = self._summary_sections(document_content)
+            if len(sections) == 1:
+                summary = await summarizer_provider.summarize(self._summarization_prompt(document_content))
+            else:
+                summary = await self._map_reduce_summary_async(sections, self.summarize, summarizer_provider)
+            
+            self._merge_summarizer_usage(summarizer_provider)
+            
+            # Save summary to cache
+            self._save_cached_summary(cache_key, summary)
+            
+            return summary
+            
+        except Exception as e:
+            raise RuntimeError(f"Failed to summarize document: {e}")
+    
+    def _show_asking(self, question_config: Question) -> None:
+        """Announce the question being asked."""
+        if self.verbose_dialog:
+            self.console.print(Panel(
+                question_config.question,
+                title=f"Asking: {question_config.name}",
+                border_style="cyan",
+                padding=(1, 2)
+            ))
+        else:
+            self.console.print(f"[cyan]Asking:[/cyan] {question_config.name}")
+    
+    def _show_answer(self, answer: str) -> None:
+        """Show the answer in verbose dialog mode."""
+        if self.verbose_dialog:
+            self.console.print(Panel(
+                answer,
+                title="Answer",
+                border_style="green",
+                padding=(1, 2)
+            ))
+    
+    def _show_evaluation(self, question_config: Question, evaluation_result: str) -> None:
+        """Announce or show the evaluation of an answer."""
+        if self.verbose_dialog:
+            self.console.print(Panel(
+                evaluation_result,
+                title=f"Evaluating: {question_config.name}",
+                border_style="yellow",
+                padding=(1, 2)
+            ))
+        else:
+            self.console.print(f"[yellow]Evaluating:[/yellow] {question_config.name}")
+    
+    def _show_fallback_answer(self, fallback_answer: str, label: str) -> None:
+        """Show the answer of a fallback step in verbose dialog mode."""
+        if self.verbose_dialog:
+            self.console.print(Panel(
+                fallback_answer,
+                title=f"Fallback Answer ({label.capitalize()})",
+                border_style="blue",
+                padding=(1, 2)
+            ))
+    
+    def _show_fallback_evaluation(self, question_config: Question, fallback_evaluation: str, fallback_passed: bool) -> None:
+        """Show the evaluation of the fallback answer and its outcome."""
+        if self.verbose_dialog:
+            self.console.print(Panel(
+                fallback_evaluation,
+                title=f"Fallback Evaluation: {question_config.name}",
+                border_style="blue",
+                padding=(1, 2)
+            ))
         
-        # Resolve document path relative to config file
-        doc_path = config_path.parent / config.file
-        document_content = self.load_document(doc_path)
+        if fallback_passed:
+            self.console.print(f"[green]Fallback succeeded![/green]")
+        else:
+            self.console.print(f"[red]Fallback also failed[/red]")
+    
+    def _finish_question(self, question_config: Question, answer: str, evaluation_result: str, passed: bool, fallback_steps: Optional[List[FallbackStep]] = None) -> QuestionResult:
+        """Build the result of a processed question and show it."""
+        result = QuestionResult(
+            name=question_config.name,
+            question=question_config.question,
+            answer=answer,
+            evaluation_result=evaluation_result,
+            passed=passed,
+            fallback_steps=fallback_steps or []
+        )
         
-        # Summarize document if requested
-        if self.summarize:
-            try:
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=self.console
-                ) as progress:
-                    summarize_task = progress.add_task(f"Summarizing document ({self.summarize} level)...", total=None)
-                    original_length = len(document_content)
-                    document_content = self.summarize_document(document_content, doc_path)
-                    
-                reduction_pct = ((original_length - len(document_content)) / original_length) * 100
-                self.console.print(f"[green]Document summarized successfully ({self.summarize} level)[/green] (Original: {original_length:,} chars → Summary: {len(document_content):,} chars, {reduction_pct:.1f}% reduction)")
-            except Exception as e:
-                self.console.print(f"[red]Error: {e}[/red]")
-                raise
+        # Show immediate result
+        status = "[green]✓ PASS[/green]" if passed else "[red]✗ FAIL[/red]"
+        self.console.print(f"[dim]Result:[/dim] {status} - {question_config.name}")
         
-        # Index document for RAG if requested
-        if self.use_rag:
+        return result
+    
+    def _fallback_content(self, step: str, question: str, document_content: str) -> Optional[str]:
+        """Content to send with a question at a fallback step, None if the step doesn't apply."""
+        if step == "full":
+            return document_content
+        
+        if step == "summary":
+            # With summarization on, the checked document is a summary already
+            if self.summarize or self._doc_path is None:
+                return None
+            with self._fallback_summary_lock:
+                if self._fallback_summary is None:
+                    try:
+                        self._fallback_summary = self.summarize_document(document_content, self._doc_path, FALLBACK_SUMMARY_LEVEL)
+                    except Exception as e:
+                        self.console.print(f"[yellow]Skipping the summary fallback step: {e}[/yellow]")
+                        self._fallback_summary = ""
+            return self._fallback_summary or None
+        
+        if step == "top-k":
+            context, _ = self.rag_indexer.get_context_with_chunks(
+                question,
+                self.rag_context_tokens * FALLBACK_TOP_K_FACTOR,
+                self.rag_top_k * FALLBACK_TOP_K_FACTOR,
+                self.rag_mmr
+            )
+            return context
+        
+        # The section around the best chunk retrieved for the question
+        precomputed = self._precomputed_contexts.get(question)
+        if not precomputed or not precomputed[1]:
+            return None
+        return self.rag_indexer.get_section_context(precomputed[1][0], self.rag_context_tokens * FALLBACK_SECTION_FACTOR)
+    
+    def _fallback_contents(self, question: str, document_content: str):
+        """Yield (step, content) for each configured fallback step that applies, skipping repeated contents."""
+        precomputed = self._precomputed_contexts.get(question)
+        tried = {precomputed[0]} if precomputed else set()
+        for step in self.rag_fallback_steps:
+            content = self._fallback_content(step, question, document_content)
+            if content is not None and content not in tried:
+                tried.add(content)
+                yield step, content
+    
+    def _fall_back(self, question_config: Question, document_content: str, answer: str, evaluation_result: str) -> tuple[str, str, bool, List[FallbackStep]]:
+        """Retry a failed RAG answer with each fallback step in turn, until one passes.
+        
+        Returns:
+            The answer, evaluation and outcome of the passing step (or the original
+            ones if none passed), and the steps tried
+        """
+        steps = []
+        for step, content in self._fallback_contents(question_config.question, document_content):
+            label = FALLBACK_LABELS[step]
+            self.console.print(f"[yellow]Answer failed, retrying with {label}...[/yellow]")
+            
+            fallback_answer = self.main_provider.ask(content, question_config.question)
+            self._show_fallback_answer(fallback_answer, label)
+            fallback_passed, fallback_evaluation = self.evaluate_answer(
+                question_config.question,
+                fallback_answer,
+                question_config.answerEvaluation
+            )
+            
+            # Prefix the evaluation result to indicate the content it used
+            fallback_evaluation = f"({label}) {fallback_evaluation}"
+            self._show_fallback_evaluation(question_config, fallback_evaluation, fallback_passed)
+            steps.append(FallbackStep(step=step, passed=fallback_passed, context_tokens=count_tokens(content)))
+            
+            if fallback_passed:
+                return fallback_answer, fallback_evaluation, True, steps
+        return answer, evaluation_result, False, steps
+    
+    async def _fall_back_async(self, question_config: Question, document_content: str, answer: str, evaluation_result: str) -> tuple[str, str, bool, List[FallbackStep]]:
+        """Async variant of _fall_back."""
+        steps = []
+        contents = self._fallback_contents(question_config.question, document_content)
+        while True:
+            # Retrieval and summarization are blocking, keep them off the event loop
+            step, content = await asyncio.to_thread(next, contents, (None, None))
+            if step is None:
+                break
+            label = FALLBACK_LABELS[step]
+            self.console.print(f"[yellow]Answer failed, retrying with {label}...[/yellow]")
+            
+            fallback_answer = await self.async_main_provider.ask(content, question_config.question)
+            self._show_fallback_answer(fallback_answer, label)
+            fallback_passed, fallback_evaluation = await self.evaluate_answer_async(
+                question_config.question,
+                fallback_answer,
+                question_config.answerEvaluation
+            )
+            
+            # Prefix the evaluation result to indicate the content it used
+            fallback_evaluation = f"({label}) {fallback_evaluation}"
+            self._show_fallback_evaluation(question_config, fallback_evaluation, fallback_passed)
+            steps.append(FallbackStep(step=step, passed=fallback_passed, context_tokens=count_tokens(content)))
+            
+            if fallback_passed:
+                return fallback_answer, fallback_evaluation, True, steps
+        return answer, evaluation_result, False, steps
+    
+    def _error_result(self, question_config: Question, error: Exception) -> QuestionResult:
+        """Build the result of a question that raised an error."""
+        self.console.print(f"[red]Error processing {question_config.name}: {error}[/red]")
+        return QuestionResult(
+            name=question_config.name,
+            question=question_config.question,
+            answer="",
+            evaluation_result="",
+            passed=False,
+            error=str(error)
+        )
+    
+    def _context_tokens(self, question: str) -> Optional[int]:
+        """Tokens of the RAG context sent with a question, None if it was sent without one."""
+        precomputed = self._precomputed_contexts.get(question)
+        return count_tokens(precomputed[0]) if precomputed is not None else None
+    
+    def _question_deadline(self) -> Optional[float]:
+        """Deadline of a question starting now: its time budget, within the run deadline."""
+        deadlines = [self._run_deadline]
+        if self.question_timeout:
+            deadlines.append(time.monotonic() + self.question_timeout)
+        deadlines = [d for d in deadlines if d is not None]
+        return min(deadlines) if deadlines else None
+    
+    def _process_question(self, question_config: Question, document_content: str, answer: Optional[str] = None, evaluation: Optional[tuple[bool, str]] = None) -> QuestionResult:
+        """Run the ask, evaluate and optional fallback chain for a single question.
+        
+        answer and evaluation are the question's answer and (passed, explanation)
+        evaluation from batched requests, if any. Requests stop being sent or retried
+        once the question's deadline passes, and the result records how many
+        requests were retried.
+        """
+        with deadline_scope(self._question_deadline()), count_retries() as retries:
+            result = self._question_chain(question_config, document_content, answer, evaluation)
+        result.retries = retries.count
+        result.context_tokens = self._context_tokens(question_config.question)
+        return result
+    
+    def _question_chain(self, question_config: Question, document_content: str, answer: Optional[str], evaluation: Optional[tuple[bool, str]]) -> QuestionResult:
+        """Ask, evaluate and fall back to the full document for a single question."""
+        try:
+            # Ask the question, unless it was already answered in a batch
+            self._show_asking(question_config)
+            if answer is None:
+                answer = self.ask_question(document_content, question_config.question)
+            self._show_answer(answer)
+            
+            # Evaluate the answer, unless it was already evaluated in a batch
+            if evaluation is None:
+                evaluation = self.evaluate_answer(
+                    question_config.question,
+                    answer,
+                    question_config.answerEvaluation
+                )
+            passed, evaluation_result = evaluation
+            self._show_evaluation(question_config, evaluation_result)
+            
+            # If RAG was used and the answer failed, retry with more of the document if fallback is enabled
+            fallback_steps = []
+            if self.use_rag and self.rag_fallback and not passed:
+                answer, evaluation_result, passed, fallback_steps = self._fall_back(
+                    question_config, document_content, answer, evaluation_result
+                )
+            
+            return self._finish_question(question_config, answer, evaluation_result, passed, fallback_steps)
+            
+        except Exception as e:
+            return self._error_result(question_config, e)
+    
+    async def _process_question_async(self, question_config: Question, document_content: str, answer: Optional[str] = None, evaluation: Optional[tuple[bool, str]] = None) -> QuestionResult:
+        """Async variant of the ask, evaluate and optional fallback chain for a single question.
+        
+        In-flight requests are cancelled when the question's deadline passes.
+        """
+        with deadline_scope(self._question_deadline()), count_retries() as retries:
             try:
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=self.console
-                ) as progress:
-                    index_task = progress.add_task("Indexing document for RAG...", total=None)
-                    self.rag_indexer = RAGIndexer(
-                        chunk_size=self.rag_chunk_size,
-                        chunk_overlap=self.rag_chunk_overlap
-                    )
-                    self.rag_indexer.index_document(document_content, doc_path)
-                    
-                self.console.print(f"[green]Document indexed successfully for RAG[/green] ({len(self.rag_indexer.chunks)} chunks created)")
-            except Exception as e:
-                self.console.print(f"[red]Error indexing document for RAG: {e}[/red]")
-                raise
+                result = await asyncio.wait_for(
+                    self._question_chain_async(question_config, document_content, answer, evaluation),
+                    timeout=remaining_time()
+                )
+            except asyncio.TimeoutError:
+                result = self._error_result(question_config, DeadlineExceeded("Deadline exceeded"))
+        result.retries = retries.count
+        result.context_tokens = self._context_tokens(question_config.question)
+        return result
+    
+    async def _question_chain_async(self, question_config: Question, document_content: str, answer: Optional[str], evaluation: Optional[tuple[bool, str]]) -> QuestionResult:
+        """Async variant of _question_chain."""
+        try:
+            # Ask the question, unless it was already answered in a batch
+            self._show_asking(question_config)
+            if answer is None:
+                answer = await self.ask_question_async(document_content, question_config.question)
+            self._show_answer(answer)
+            
+            # Evaluate the answer, unless it was already evaluated in a batch
+            if evaluation is None:
+                evaluation = await self.evaluate_answer_async(
+                    question_config.question,
+                    answer,
+                    question_config.answerEvaluation
+                )
+            passed, evaluation_result = evaluation
+            self._show_evaluation(question_config, evaluation_result)
+            
+            # If RAG was used and the answer failed, retry with more of the document if fallback is enabled
+            fallback_steps = []
+            if self.use_rag and self.rag_fallback and not passed:
+                answer, evaluation_result, passed, fallback_steps = await self._fall_back_async(
+                    question_config, document_content, answer, evaluation_result
+                )
+            
+            return self._finish_question(question_config, answer, evaluation_result, passed, fallback_steps)
+            
+        except Exception as e:
+            return self._error_result(question_config, e)
+    
+    def _question_batches(self, questions: List[Question], batch_size: int) -> List[List[Question]]:
+        """Split questions into groups to handle with one request each.
+        
+        Batched replies are keyed by question name, so names must be unique.
+        
+        Returns:
+            The batches, or an empty list if batching doesn't apply
+        """
+        if batch_size <= 1 or len(questions) < 2:
+            return []
+        if len({q.name for q in questions}) != len(questions):
+            self.console.print("[yellow]Question names are not unique, not batching requests[/yellow]")
+            return []
+        return [questions[i:i + batch_size] for i in range(0, len(questions), batch_size)]
+    
+    def _report_batch_answers(self, questions: List[Question], batches: List[List[Question]], answers: dict) -> None:
+        """Print how many questions were answered by batched requests."""
+        missing = len(questions) - len(answers)
+        message = f"[green]Answered {len(answers)}/{len(questions)} questions in {len(batches)} batched requests[/green]"
+        if missing:
+            message += f" ({missing} will be asked one by one)"
+        self.console.print(message)
+    
+    def _ask_batch(self, batch: List[Question], document_content: str) -> dict:
+        """Answer a batch of questions with one request, returning answers by question name."""
+        try:
+            with deadline_scope(self._run_deadline):
+                return self.main_provider.ask_many(document_content, {q.name: q.question for q in batch})
+        except Exception as e:
+            # The questions of a failed batch are simply asked one by one
+            self.console.print(f"[yellow]Batched request failed, asking its questions one by one: {e}[/yellow]")
+            return {}
+    
+    async def _ask_batch_async(self, batch: List[Question], document_content: str) -> dict:
+        """Async variant of _ask_batch."""
+        try:
+            return await self.async_main_provider.ask_many(document_content, {q.name: q.question for q in batch})
+        except Exception as e:
+            # The questions of a failed batch are simply asked one by one
+            self.console.print(f"[yellow]Batched request failed, asking its questions one by one: {e}[/yellow]")
+            return {}
+    
+    def _batch_answers(self, questions: List[Question], document_content: str) -> dict:
+        """Answer questions in batches of batch_size, on the worker pool if concurrency allows.
         
-        results = []
+        Returns:
+            Answers by question name. Questions missing from it (not batched, or not
+            answered in a well-formed way) are asked individually.
+        """
+        # Batching needs every question to be asked about the same content, with
+        # RAG each question has its own context
+        batches = [] if self.use_rag else self._question_batches(questions, self.batch_size)
+        if not batches:
+            return {}
         
-        with Progress(
+        answers = {}
+        with self._step_progress(f"Asking {len(questions)} questions in {len(batches)} batched requests..."):
+            concurrency = min(self.concurrency, len(batches))
+            if concurrency == 1:
+                batch_answers = [self._ask_batch(batch, document_content) for batch in batches]
+            else:
+                with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="doc-check") as executor:
+                    batch_answers = list(executor.map(lambda batch: self._ask_batch(batch, document_content), batches))
+        for batch_answer in batch_answers:
+            answers.update(batch_answer)
+        
+        self._report_batch_answers(questions, batches, answers)
+        return answers
+    
+    async def _batch_answers_async(self, questions: List[Question], document_content: str) -> dict:
+        """Async variant of _batch_answers, with at most `concurrency` batches in flight."""
+        batches = [] if self.use_rag else self._question_batches(questions, self.batch_size)
+        if not batches:
+            return {}
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def run(batch: List[Question]) -> dict:
+            async with semaphore:
+                return await self._ask_batch_async(batch, document_content)
+        
+        answers = {}
+        with self._step_progress(f"Asking {len(questions)} questions in {len(batches)} batched requests..."):
+            batch_answers = await asyncio.gather(*(run(batch) for batch in batches))
+        for batch_answer in batch_answers:
+            answers.update(batch_answer)
+        
+        self._report_batch_answers(questions, batches, answers)
+        return answers
+    
+    def _report_batch_evaluations(self, total: int, batches: List[List[Question]], evaluations: dict) -> None:
+        """Print how many answers were evaluated by batched requests."""
+        missing = total - len(evaluations)
+        message = f"[green]Evaluated {len(evaluations)}/{total} answers in {len(batches)} batched requests[/green]"
+        if missing:
+            message += f" ({missing} will be evaluated one by one)"
+        self.console.print(message)
+    
+    def _evaluation_items(self, batch: List[Question], answers: dict) -> dict:
+        """(question, answer, criteria) items of a batch, by question name."""
+        return {q.name: (q.question, answers[q.name], q.answerEvaluation) for q in batch}
+    
+    def _evaluate_batch(self, batch: List[Question], answers: dict) -> dict:
+        """Evaluate a batch of answers with one request, returning (passed, explanation) by question name."""
+        try:
+            with deadline_scope(self._run_deadline):
+                return self.main_provider.evaluate_many(self._evaluation_items(batch, answers))
+        except Exception as e:
+            # The answers of a failed batch are simply evaluated one by one
+            self.console.print(f"[yellow]Batched evaluation failed, evaluating its answers one by one: {e}[/yellow]")
+            return {}
+    
+    async def _evaluate_batch_async(self, batch: List[Question], answers: dict) -> dict:
+        """Async variant of _evaluate_batch."""
+        try:
+            return await self.async_main_provider.evaluate_many(self._evaluation_items(batch, answers))
+        except Exception as e:
+            # The answers of a failed batch are simply evaluated one by one
+            self.console.print(f"[yellow]Batched evaluation failed, evaluating its answers one by one: {e}[/yellow]")
+            return {}
+    
+    def _try_ask(self, question_config: Question, document_content: str) -> Optional[str]:
+        """Ask a question ahead of batched evaluation, None if it fails.
+        
+        A failed question is asked again, and its error reported, when it is processed.
+        """
+        try:
+            with deadline_scope(self._question_deadline()):
+                return self.ask_question(document_content, question_config.question)
+        except Exception:
+            return None
+    
+    async def _try_ask_async(self, question_config: Question, document_content: str) -> Optional[str]:
+        """Async variant of _try_ask."""
+        try:
+            with deadline_scope(self._question_deadline()):
+                return await self.ask_question_async(document_content, question_config.question)
+        except Exception:
+            return None
+    
+    def _batch_evaluations(self, questions: List[Question], document_content: str, answers: dict) -> tuple[dict, dict]:
+        """Evaluate answers in batches of evaluation_batch_size.
+        
+        All questions need an answer before they can be evaluated together, so the
+        ones not answered by batched asks are asked first, on the worker pool if
+        concurrency allows.
+        
+        Returns:
+            Tuple of the answers and the (passed, explanation) evaluations by question
+            name. Questions missing from them are asked or evaluated individually.
+        """
+        if not self._question_batches(questions, self.evaluation_batch_size):
+            return answers, {}
+        
+        answers = dict(answers)
+        remaining = [q for q in questions if q.name not in answers]
+        if remaining:
+            with self._step_progress(f"Asking {len(remaining)} questions..."):
+                new_answers = []
+                concurrency = min(self.concurrency, len(remaining))
+                if concurrency > 1 and self._warm_prompt_cache_first():
+                    # Let the first request write the cached document prefix first
+                    new_answers.append(self._try_ask(remaining[0], document_content))
+                with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="doc-check") as executor:
+                    new_answers.extend(executor.map(lambda q: self._try_ask(q, document_content), remaining[len(new_answers):]))
+            answers.update({q.name: answer for q, answer in zip(remaining, new_answers) if answer is not None})
+        
+        answered = [q for q in questions if q.name in answers]
+        batches = self._question_batches(answered, self.evaluation_batch_size)
+        if not batches:
+            return answers, {}
+        
+        evaluations = {}
+        with self._step_progress(f"Evaluating {len(answered)} answers in {len(batches)} batched requests..."):
+            concurrency = min(self.concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="doc-check") as executor:
+                batch_evaluations = list(executor.map(lambda batch: self._evaluate_batch(batch, answers), batches))
+        for batch_evaluation in batch_evaluations:
+            evaluations.update(batch_evaluation)
+        
+        self._report_batch_evaluations(len(answered), batches, evaluations)
+        return answers, evaluations
+    
+    async def _batch_evaluations_async(self, questions: List[Question], document_content: str, answers: dict) -> tuple[dict, dict]:
+        """Async variant of _batch_evaluations, with at most `concurrency` requests in flight."""
+        if not self._question_batches(questions, self.evaluation_batch_size):
+            return answers, {}
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def limited(coroutine):
+            async with semaphore:
+                return await coroutine
+        
+        answers = dict(answers)
+        remaining = [q for q in questions if q.name not in answers]
+        if remaining:
+            with self._step_progress(f"Asking {len(remaining)} questions..."):
+                new_answers = []
+                if self.concurrency > 1 and self._warm_prompt_cache_first():
+                    # Let the first request write the cached document prefix first
+                    new_answers.append(await self._try_ask_async(remaining[0], document_content))
+                new_answers.extend(await asyncio.gather(*(
+                    limited(self._try_ask_async(q, document_content)) for q in remaining[len(new_answers):]
+                )))
+            answers.update({q.name: answer for q, answer in zip(remaining, new_answers) if answer is not None})
+        
+        answered = [q for q in questions if q.name in answers]
+        batches = self._question_batches(answered, self.evaluation_batch_size)
+        if not batches:
+            return answers, {}
+        
+        evaluations = {}
+        with self._step_progress(f"Evaluating {len(answered)} answers in {len(batches)} batched requests..."):
+            batch_evaluations = await asyncio.gather(*(limited(self._evaluate_batch_async(batch, answers)) for batch in batches))
+        for batch_evaluation in batch_evaluations:
+            evaluations.update(batch_evaluation)
+        
+        self._report_batch_evaluations(len(answered), batches, evaluations)
+        return answers, evaluations
+    
+    def _warm_prompt_cache_first(self) -> bool:
+        """Whether the first question should run alone to populate the prompt cache.
+        
+        OpenAI caches prompt prefixes automatically, Anthropic only with prompt_cache.
+        Only useful when every question sends the same full document; with RAG each
+        question has its own context and there is no shared prefix to reuse.
+        """
+        return (self.prompt_cache or self.provider == "openai") and not self.use_rag
+    
+    def _question_progress(self) -> Progress:
+        """Progress bar used while processing questions."""
+        return Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
             TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
             TimeElapsedColumn(),
             console=self.console
-        ) as progress:
+        )
+    
+    def _run_questions(self, questions: List[Question], document_content: str) -> List[QuestionResult]:
+        """Process all questions, optionally on a bounded worker pool.
+        
+        Results are returned in the same order as the questions in the configuration,
+        regardless of the order in which they complete.
+        """
+        answers = self._batch_answers(questions, document_content)
+        answers, evaluations = self._batch_evaluations(questions, document_content, answers)
+        total = len(questions)
+        concurrency = max(1, min(self.concurrency, total))
+        results: List[Optional[QuestionResult]] = [None] * total
+        
+        with self._question_progress() as progress:
             
             main_task = progress.add_task(
-                f"Processing {len(config.questions)} questions",
-                total=len(config.questions)
+                f"Processing {total} questions",
+                total=total
             )
             
-            for i, question_config in enumerate(config.questions, 1):
-                progress.update(main_task, description=f"Question {i}/{len(config.questions)}: {question_config.name}")
+            if concurrency == 1:
+                for i, question_config in enumerate(questions, 1):
+                    progress.update(main_task, description=f"Question {i}/{total}: {question_config.name}")
+                    results[i - 1] = self._process_question(question_config, document_content, answers.get(question_config.name), evaluations.get(question_config.name))
+                    progress.update(main_task, advance=1)
+            else:
+                completed = 0
+                first = 0
+                if self._warm_prompt_cache_first():
+                    # Let the first request write the cached document prefix so the
+                    # concurrent ones that follow can read it
+                    progress.update(main_task, description=f"Question 1/{total}: {questions[0].name} (warming prompt cache)")
+                    results[0] = self._process_question(questions[0], document_content, answers.get(questions[0].name), evaluations.get(questions[0].name))
+                    completed = first = 1
+                    progress.update(main_task, advance=1)
                 
-                try:
-                    # Ask the question
-                    if self.verbose_dialog:
-                        self.console.print(Panel(
-                            question_config.question,
-                            title=f"Asking: {question_config.name}",
-                            border_style="cyan",
-                            padding=(1, 2)
-                        ))
-                    else:
-                        self.console.print(f"[cyan]Asking:[/cyan] {question_config.name}")
-                    
-                    answer = self.ask_question(document_content, question_config.question)
-                    
-                    if self.verbose_dialog:
-                        self.console.print(Panel(
-                            answer,
-                            title="Answer",
-                            border_style="green",
-                            padding=(1, 2)
-                        ))
-                    
-                    # Evaluate the answer
-                    passed, evaluation_result = self.evaluate_answer(
-                        question_config.question,
-                        answer,
-                        question_config.answerEvaluation
-                    )
-                    
-                    if self.verbose_dialog:
-                        self.console.print(Panel(
-                            evaluation_result,
-                            title=f"Evaluating: {question_config.name}",
-                            border_style="yellow",
-                            padding=(1, 2)
-                        ))
-                    else:
-                        self.console.print(f"[yellow]Evaluating:[/yellow] {question_config.name}")
-                    
-                    # If RAG was used and the answer failed, try with full document if fallback is enabled
-                    if self.use_rag and self.rag_fallback and not passed:
-                        self.console.print(f"[yellow]RAG answer failed, retrying with full document...[/yellow]")
-                        
-                        # Ask the question again with full document
-                        fallback_answer = self.main_provider.ask(document_content, question_config.question)
-                        
-                        if self.verbose_dialog:
-                            self.console.print(Panel(
-                                fallback_answer,
-                                title="Fallback Answer (Full Document)",
-                                border_style="blue",
-                                padding=(1, 2)
-                            ))
-                        
-                        # Evaluate the fallback answer with "(full document)" prefix
-                        fallback_passed, fallback_evaluation = self.evaluate_answer(
-                            question_config.question,
-                            fallback_answer,
-                            question_config.answerEvaluation
+                with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="doc-check") as executor:
+                    futures = {
+                        executor.submit(self._process_question, question_config, document_content, answers.get(question_config.name), evaluations.get(question_config.name)): i
+                        for i, question_config in enumerate(questions)
+                        if i >= first
+                    }
+                    for future in as_completed(futures):
+                        index = futures[future]
+                        results[index] = future.result()
+                        completed += 1
+                        progress.update(
+                            main_task,
+                            advance=1,
+                            description=f"Question {completed}/{total} done ({concurrency} workers)"
                         )
-                        
-                        # Prefix the evaluation result to indicate it used the full document
-                        fallback_evaluation = f"(full document) {fallback_evaluation}"
-                        
-                        if self.verbose_dialog:
-                            self.console.print(Panel(
-                                fallback_evaluation,
-                                title=f"Fallback Evaluation: {question_config.name}",
-                                border_style="blue",
-                                padding=(1, 2)
-                            ))
-                        
-                        # Use the fallback result if it passed, otherwise keep the original
-                        if fallback_passed:
-                            answer = fallback_answer
-                            evaluation_result = fallback_evaluation
-                            passed = fallback_passed
-                            self.console.print(f"[green]Fallback succeeded![/green]")
-                        else:
-                            self.console.print(f"[red]Fallback also failed[/red]")
-                    
-                    result = QuestionResult(
-                        name=question_config.name,
-                        question=question_config.question,
-                        answer=answer,
-                        evaluation_result=evaluation_result,
-                        passed=passed
-                    )
-                    
-                    # Show immediate result
-                    status = "[green]✓ PASS[/green]" if passed else "[red]✗ FAIL[/red]"
-                    self.console.print(f"[dim]Result:[/dim] {status} - {question_config.name}")
-                    
-                except Exception as e:
-                    self.console.print(f"[red]Error processing {question_config.name}: {e}[/red]")
-                    result = QuestionResult(
-                        name=question_config.name,
-                        question=question_config.question,
-                        answer="",
-                        evaluation_result="",
-                        passed=False,
-                        error=str(e)
-                    )
-                
-                results.append(result)
+        
+        return results
+    
+    async def _run_questions_async(self, questions: List[Question], document_content: str) -> List[QuestionResult]:
+        """Process all questions as asyncio tasks with at most `concurrency` in flight.
+        
+        Results are returned in the same order as the questions in the configuration.
+        """
+        answers = await self._batch_answers_async(questions, document_content)
+        answers, evaluations = await self._batch_evaluations_async(questions, document_content, answers)
+        total = len(questions)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        with self._question_progress() as progress:
+            
+            main_task = progress.add_task(
+                f"Processing {total} questions",
+                total=total
+            )
+            
+            async def run(question_config: Question) -> QuestionResult:
+                async with semaphore:
+                    result = await self._process_question_async(question_config, document_content, answers.get(question_config.name), evaluations.get(question_config.name))
                 progress.update(main_task, advance=1)
+                return result
+            
+            results = []
+            # No questions to warm the cache with when every result was reused (incremental mode)
+            if questions and self.concurrency > 1 and self._warm_prompt_cache_first():
+                # Let the first request write the cached document prefix first
+                results.append(await run(questions[0]))
+                questions = questions[1:]
+            
+            results.extend(await asyncio.gather(*(run(question_config) for question_config in questions)))
+            return results
+    
+    @contextmanager
+    def _step_progress(self, description: str, error_prefix: str = "Error"):
+        """Show a spinner while a preparation step runs and report its errors."""
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=self.console
+            ) as progress:
+                progress.add_task(description, total=None)
+                yield
+        except Exception as e:
+            self.console.print(f"[red]{error_prefix}: {e}[/red]")
+            raise
+    
+    def _report_summarization(self, original_length: int, document_content: str) -> None:
+        """Print the size reduction achieved by summarization."""
+        reduction_pct = ((original_length - len(document_content)) / original_length) * 100
+        self.console.print(f"[green]Document summarized successfully ({self.summarize} level)[/green] (Original: {original_length:,} chars → Summary: {len(document_content):,} chars, {reduction_pct:.1f}% reduction)")
+    
+    def _warm_up_embedding_model(self) -> None:
+        """Start loading the RAG embedding model in the background, overlapping document loading and summarization."""
+        if self.rag_retriever == "bm25":
+            # Keyword retrieval needs no embedding model
+            return
+        from .rag import warm_up_embedding_model
+        warm_up_embedding_model()
+    
+    def _index_document(self, document_content: str, doc_path: Path) -> None:
+        """Index the document for RAG retrieval, or the documents of the run as one corpus if there are several."""
+        # Imported here: the dense RAG dependencies (torch, faiss) take seconds to load
+        from .rag import RAGIndexer
+        
+        with self._step_progress("Indexing document for RAG...", "Error indexing document for RAG"):
+            # BM25 retrieval embeds nothing, don't open the embedding cache for it
+            embedding_cache = EmbeddingCache(self.cache_dir, self.cache_max_size_mb) if self.rag_retriever != "bm25" else None
+            self.rag_indexer = RAGIndexer(
+                chunk_size=self.rag_chunk_size,
+                chunk_overlap=self.rag_chunk_overlap,
+                embedding_cache=embedding_cache,
+                chunker=self.rag_chunker,
+                chunk_tokens=self.rag_chunk_tokens,
+                index_type=self.rag_index,
+                retriever=self.rag_retriever
+            )
+            if len(self._documents) > 1:
+                self.rag_indexer.index_documents(self._documents, doc_path)
+            else:
+                self.rag_indexer.index_document(document_content, doc_path)
+        
+        documents = f" from {len(self._documents)} documents" if len(self._documents) > 1 else ""
+        self.console.print(f"[green]Document indexed successfully for RAG[/green] ({len(self.rag_indexer.chunks)} chunks created{documents})")
+    
+    def _precompute_contexts(self, questions: List[Question]) -> None:
+        """Retrieve the RAG context of every question with one batched embedding and search."""
+        texts = list(dict.fromkeys(q.question for q in questions))
+        with self._step_progress(f"Retrieving context for {len(texts)} question(s)...", "Error retrieving RAG context"):
+            contexts = self.rag_indexer.get_contexts_with_chunks(texts, self.rag_context_tokens, self.rag_top_k, self.rag_mmr)
+        self._precomputed_contexts = dict(zip(texts, contexts))
+    
+    def _incremental_state_path(self, config_path: Path) -> Path:
+        """Location of the incremental state of a configuration file."""
+        return config_path.parent / ".doc_check_cache" / f"{config_path.name}.incremental.json"
+    
+    def _question_fingerprint(self, question_config: Question) -> str:
+        """Fingerprint of a question and the settings that influence its result."""
+        return IncrementalState.fingerprint(
+            question=question_config.question,
+            answer_evaluation=question_config.answerEvaluation,
+            provider=self.provider,
+            model=self.model,
+            summarize=self.summarize,
+            summarizer_model=self.summarizer_model if self.summarize else None,
+            use_rag=self.use_rag,
+            rag_fallback=self.rag_fallback,
+            rag_fallback_steps=self.rag_fallback_steps if self.rag_fallback else None
+        )
+    
+    def _depends_on_full_document(self, result: QuestionResult) -> bool:
+        """Whether a result may have been produced from the full document rather than its RAG chunks."""
+        if not self.use_rag:
+            return True
+        # A failed RAG answer triggers the fallback steps, which are recorded on the
+        # result (and marked in the evaluation of results from before they were)
+        return self.rag_fallback and (
+            not result.passed or bool(result.fallback_steps) or result.evaluation_result.startswith("(full document)")
+        )
+    
+    def _reuse_unchanged_results(self, questions: List[Question], document_content: str, state: IncrementalState) -> tuple[Dict[str, QuestionResult], Dict[str, List[str]]]:
+        """Find questions whose inputs are unchanged since the previous run.
         
+        With RAG the context of every question is retrieved up front (and kept for
+        the question loop), and a question depends on the hashes of the chunks in
+        that context. Without RAG it depends on the whole document.
+        
+        Returns:
+            Tuple of the reusable results and the chunk hashes of every question, by name
+        """
+        document_hash = self._get_document_hash(document_content)
+        reused = {}
+        dependencies = {}
+        
+        for question_config in questions:
+            chunk_hashes = []
+            if self.use_rag and self.rag_indexer:
+                _, chunks = self._precomputed_contexts[question_config.question]
+                chunk_hashes = [chunk.content_hash for chunk in chunks]
+            dependencies[question_config.name] = chunk_hashes
+            
+            result = state.reusable_result(
+                question_config.name,
+                self._question_fingerprint(question_config),
+                chunk_hashes,
+                document_hash
+            )
+            if result is not None:
+                reused[question_config.name] = result
+        
+        if reused:
+            self.console.print(f"[green]Reusing {len(reused)} unchanged result(s) from the previous run[/green] ({len(questions) - len(reused)} to check)")
+        
+        return reused, dependencies
+    
+    def _update_incremental_state(self, state: IncrementalState, questions: List[Question], dependencies: Dict[str, List[str]], document_content: str, results: List[QuestionResult]) -> None:
+        """Record the results of this run and what they depended on."""
+        document_hash = self._get_document_hash(document_content)
+        for question_config, result in zip(questions, results):
+            state.record(
+                question_config.name,
+                self._question_fingerprint(question_config),
+                dependencies[question_config.name],
+                document_hash if self._depends_on_full_document(result) else None,
+                result
+            )
+        state.save()
+    
+    @staticmethod
+    def _merge_results(questions: List[Question], reused: Dict[str, QuestionResult], new_results: List[QuestionResult]) -> List[QuestionResult]:
+        """Interleave reused and newly computed results back into configuration order."""
+        new_iter = iter(new_results)
+        return [reused[q.name] if q.name in reused else next(new_iter) for q in questions]
+    
+    def _build_result(self, results: List[QuestionResult], start_time: datetime) -> DocCheckResult:
+        """Build the overall result from the per-question results."""
         end_time = datetime.now()
         
         # Calculate summary
@@ -687,3 +1482,118 @@ class DocumentChecker:
             end_time=end_time,
             summarization_level=self.summarize
         )
+    
+    def check_document(self, config_path: Path) -> DocCheckResult:
+        """Check a document according to the configuration."""
+        start_time = datetime.now()
+        
+        self._run_deadline = time.monotonic() + self.deadline if self.deadline else None
+        if self.use_rag:
+            self._warm_up_embedding_model()
+        
+        with deadline_scope(self._run_deadline):
+            # Load configuration
+            config = self.load_config(config_path)
+            
+            # Load the documents, resolved relative to config file
+            documents = self._documents = self.load_documents(config_path, config.file)
+            doc_path = self._doc_path = self._corpus_path(config_path, documents)
+            document_content = self._combined_content(documents)
+            
+            # Summarize document if requested, each of several on its own
+            if self.summarize:
+                original_length = len(document_content)
+                with self._step_progress(f"Summarizing document ({self.summarize} level)..."):
+                    documents = self._documents = [
+                        (source, self.summarize_document(content, self._document_path(config_path, source)))
+                        for source, content in documents
+                    ]
+                document_content = self._combined_content(documents)
+                self._report_summarization(original_length, document_content)
+            
+            # Index document for RAG if requested
+            if self.use_rag:
+                self._index_document(document_content, doc_path)
+                self._precompute_contexts(config.questions)
+            
+            # Carry forward results whose inputs did not change
+            reused = {}
+            if self.incremental:
+                state = IncrementalState.load(self._incremental_state_path(config_path))
+                reused, dependencies = self._reuse_unchanged_results(config.questions, document_content, state)
+            
+            pending = [q for q in config.questions if q.name not in reused]
+            results = self._merge_results(config.questions, reused, self._run_questions(pending, document_content))
+            
+            if self.incremental:
+                self._update_incremental_state(state, config.questions, dependencies, document_content, results)
+        
+        return self._build_result(results, start_time)
+    
+    async def check_document_async(self, config_path: Path) -> DocCheckResult:
+        """Check a document according to the configuration using the async providers.
+        
+        All LLM requests are made from the running event loop, so many questions can be
+        in flight on a single thread. Local work (document loading, RAG indexing and
+        retrieval) runs in worker threads to keep the loop responsive.
+        """
+        start_time = datetime.now()
+        
+        self._run_deadline = time.monotonic() + self.deadline if self.deadline else None
+        if self.use_rag:
+            self._warm_up_embedding_model()
+        
+        with deadline_scope(self._run_deadline):
+            # Load configuration
+            config = self.load_config(config_path)
+            
+            # Load the documents, resolved relative to config file
+            documents = self._documents = await asyncio.to_thread(self.load_documents, config_path, config.file)
+            doc_path = self._doc_path = self._corpus_path(config_path, documents)
+            document_content = self._combined_content(documents)
+            
+            self.async_main_provider = self._create_provider(
+                self.provider, self.model, asynchronous=True, prompt_cache=self.prompt_cache
+            )
+            # Share usage tracking with the synchronous main provider
+            self.async_main_provider.api_usage = self.api_usage
+            summarizer_provider = self._create_provider(
+                detect_provider_from_model(self.summarizer_model), self.summarizer_model, asynchronous=True
+            )
+            
+            try:
+                # Summarize document if requested, each of several on its own
+                if self.summarize:
+                    original_length = len(document_content)
+                    with self._step_progress(f"Summarizing document ({self.summarize} level)..."):
+                        documents = self._documents = [
+                            (source, await self.summarize_document_async(content, self._document_path(config_path, source), summarizer_provider))
+                            for source, content in documents
+                        ]
+                    document_content = self._combined_content(documents)
+                    self._report_summarization(original_length, document_content)
+                
+                # Index document for RAG if requested
+                if self.use_rag:
+                    await asyncio.to_thread(self._index_document, document_content, doc_path)
+                    await asyncio.to_thread(self._precompute_contexts, config.questions)
+                
+                # Carry forward results whose inputs did not change
+                reused = {}
+                if self.incremental:
+                    state = IncrementalState.load(self._incremental_state_path(config_path))
+                    reused, dependencies = await asyncio.to_thread(
+                        self._reuse_unchanged_results, config.questions, document_content, state
+                    )
+                
+                pending = [q for q in config.questions if q.name not in reused]
+                results = self._merge_results(config.questions, reused, await self._run_questions_async(pending, document_content))
+                
+                if self.incremental:
+                    self._update_incremental_state(state, config.questions, dependencies, document_content, results)
+            finally:
+                await self.async_main_provider.aclose()
+                await summarizer_provider.aclose()
+                self.async_main_provider = None
+        
+        return self._build_result(results, start_time)
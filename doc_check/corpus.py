@@ -0,0 +1,86 @@
+"""Configurations checking several documents as one corpus.
+
+The file of a configuration may be a list of files and URLs, and files may be
+glob patterns relative to the configuration file. The documents are combined
+into a single text, each wrapped in a <document> element naming its source, so
+that the model can tell which document an answer comes from, and so that the
+RAG index can record the source of each chunk.
+"""
+
+import glob
+from pathlib import Path
+from typing import List, Sequence, Tuple, Union
+
+from .http_cache import is_url
+
+# Documents loaded at the same time; fetching URLs is network bound
+MAX_LOAD_WORKERS = 8
+
+# Markers of glob patterns in file names
+GLOB_CHARACTERS = ("*", "?", "[")
+
+
+def is_pattern(file: str) -> bool:
+    """Whether a file of a configuration is a glob pattern rather than a path."""
+    return not is_url(file) and any(character in file for character in GLOB_CHARACTERS)
+
+
+def expand_files(base_dir: Path, files: Union[str, List[str]]) -> List[str]:
+    """The documents of a configuration, with glob patterns expanded.
+
+    Args:
+        base_dir: Directory the files and patterns are relative to (that of the configuration file)
+        files: A file, URL or pattern, or a list of them
+
+    Returns:
+        URLs and file paths relative to base_dir, in the order of files (the matches
+        of a pattern sorted), each once
+
+    Raises:
+        ValueError: If there are no files, or a pattern matches no file
+    """
+    if isinstance(files, str):
+        files = [files]
+    if not files:
+        raise ValueError("Configuration must specify at least one file")
+
+    documents = []
+    for file in files:
+        if not is_pattern(file):
+            documents.append(file)
+            continue
+        matches = sorted(
+            Path(match).relative_to(base_dir).as_posix()
+            for match in glob.glob(str(base_dir / file), recursive=True)
+            if Path(match).is_file()
+        )
+        if not matches:
+            raise ValueError(f"No documents match {file}")
+        documents.extend(matches)
+    return list(dict.fromkeys(documents))
+
+
+def document_element(source: str, content: str) -> str:
+    """Content of a document wrapped in a <document> element naming its source."""
+    return f'<document source="{source}">\n{content}\n</document>'
+
+
+def combine_documents(documents: Sequence[Tuple[str, str]]) -> Tuple[str, List[Tuple[int, int, str]]]:
+    """Combine documents into one text.
+
+    Args:
+        documents: (source, content) of each document
+
+    Returns:
+        The combined text, and the (start, end, source) span of the content of each document in it
+    """
+    parts = []
+    spans = []
+    position = 0
+    for source, content in documents:
+        part = document_element(source, content)
+        start = position + part.index("\n") + 1
+        spans.append((start, start + len(content), source))
+        parts.append(part)
+        position += len(part) + 2
+    return "\n\n".join(parts), spans
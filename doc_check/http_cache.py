@@ -0,0 +1,244 @@
+"""On-disk HTTP cache for documents loaded from URLs.
+
+Each URL has two files in the http directory of the cache directory, named
+after the hash of the URL: the body, decoded from its content encoding, and a
+JSON file of metadata with the validators the server sent (ETag,
+Last-Modified). A cached body is used as it is for a TTL after it was fetched
+or last revalidated; after that the server is asked with a conditional
+request, and a 304 Not Modified costs no download. Offline, cached bodies are
+used whatever their age and nothing is requested.
+
+Bodies are streamed to a temporary file and moved into place, so a large
+document is never held in memory twice, and an interrupted download never
+leaves a truncated entry. Requests go through one httpx client, which reuses
+connections between documents and decompresses gzip and deflate bodies, and
+brotli ones when the brotli package is installed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .cache import DEFAULT_CACHE_MAX_SIZE_MB, EVICTION_TARGET_RATIO, default_cache_dir
+
+# Seconds a fetched document is used without asking the server whether it changed
+DEFAULT_HTTP_CACHE_TTL = 300
+
+# Timeout of each request in seconds
+DEFAULT_HTTP_TIMEOUT = 30.0
+
+# Bytes read at a time from a response body
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def is_url(location: str) -> bool:
+    """Whether a document location is an HTTP(S) URL rather than a file path."""
+    return str(location).startswith(('http://', 'https://'))
+
+
+class HTTPCache:
+    """On-disk cache of documents fetched over HTTP(S), revalidated with conditional requests.
+
+    Like the SQLite caches, bodies are evicted least recently used first once
+    their total size goes over max_size_mb.
+    """
+
+    filename = "http"
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_size_mb: float = DEFAULT_CACHE_MAX_SIZE_MB,
+        ttl: float = DEFAULT_HTTP_CACHE_TTL,
+        offline: bool = False,
+        timeout: float = DEFAULT_HTTP_TIMEOUT
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Cache directory, holding the http directory. Defaults to default_cache_dir().
+            max_size_mb: Maximum total size of the cached bodies in megabytes.
+            ttl: Seconds a cached body is used before it is revalidated. 0 revalidates on every use.
+            offline: Only use cached bodies, never make a request.
+            timeout: Timeout of each request in seconds.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.path = self.cache_dir / self.filename
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.ttl = ttl
+        self.offline = offline
+        self.timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str):
+        """Paths of the body and metadata files of a URL."""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.path / f"{key}.body", self.path / f"{key}.json"
+
+    def _get_client(self):
+        """The HTTP client, created on first use."""
+        with self._lock:
+            if self._client is None:
+                import httpx
+                self._client = httpx.Client(timeout=self.timeout, follow_redirects=True)
+            return self._client
+
+    def fetch(self, url: str) -> Path:
+        """Return the path of the cached body of a URL, downloading or revalidating it first if needed.
+
+        Raises:
+            ValueError: If the URL can't be fetched and isn't cached, or isn't cached in offline mode.
+        """
+        body_path, metadata_path = self._paths(url)
+        metadata = self._read_metadata(metadata_path) if body_path.exists() else None
+
+        if metadata is not None and (self.offline or time.time() - metadata["fetched_at"] < self.ttl):
+            self._touch(body_path)
+            return body_path
+        if self.offline:
+            raise ValueError(f"{url} is not in the HTTP cache, and requests are disabled in offline mode")
+
+        headers = {}
+        if metadata is not None:
+            if metadata.get("etag"):
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["If-Modified-Since"] = metadata["last_modified"]
+
+        import httpx
+        try:
+            with self._get_client().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and metadata is not None:
+                    metadata["fetched_at"] = time.time()
+                    self._write_metadata(metadata_path, metadata)
+                    self._touch(body_path)
+                    return body_path
+                response.raise_for_status()
+                self._download(response, body_path)
+                self._write_metadata(metadata_path, {
+                    "url": url,
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                    "fetched_at": time.time(),
+                })
+        except httpx.TransportError as e:
+            # The server can't be reached: a stale copy beats no document
+            if metadata is not None:
+                self._touch(body_path)
+                return body_path
+            raise ValueError(f"Failed to fetch {url}: {e}")
+        except httpx.HTTPStatusError as e:
+            raise ValueError(f"Failed to fetch {url}: HTTP {e.response.status_code}")
+
+        with self._lock:
+            # The document just fetched stays, even if it's larger than the cap on its own
+            self._evict(self.max_size_bytes, keep=body_path)
+        return body_path
+
+    def _download(self, response, body_path: Path) -> None:
+        """Stream a response body, decoded, into place."""
+        fd, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_bytes(STREAM_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(temporary, body_path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    @staticmethod
+    def _read_metadata(metadata_path: Path) -> Optional[dict]:
+        try:
+            return json.loads(metadata_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def _write_metadata(self, metadata_path: Path, metadata: dict) -> None:
+        fd, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding='utf-8') as f:
+            json.dump(metadata, f)
+        os.replace(temporary, metadata_path)
+
+    @staticmethod
+    def _touch(body_path: Path) -> None:
+        """Mark a body as recently used."""
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+    def _bodies(self):
+        """(modification time, size, path) of each cached body, least recently used first."""
+        bodies = []
+        for body_path in self.path.glob("*.body"):
+            try:
+                stat = body_path.stat()
+            except OSError:
+                continue
+            bodies.append((stat.st_mtime, stat.st_size, body_path))
+        return sorted(bodies)
+
+    def _remove(self, body_path: Path) -> None:
+        for path in (body_path, body_path.with_suffix(".json")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, max_size_bytes: int, keep: Optional[Path] = None) -> int:
+        """Remove least recently used bodies, except keep, when over max_size_bytes. Caller holds the lock."""
+        bodies = self._bodies()
+        total = sum(size for _, size, _ in bodies)
+        if total <= max_size_bytes:
+            return 0
+
+        to_free = total - int(max_size_bytes * EVICTION_TARGET_RATIO)
+        freed = removed = 0
+        for _, size, body_path in bodies:
+            if freed >= to_free:
+                break
+            if body_path == keep:
+                continue
+            self._remove(body_path)
+            freed += size
+            removed += 1
+        return removed
+
+    def gc(self) -> int:
+        """Evict bodies until the cache is within its size cap. Returns the number removed."""
+        with self._lock:
+            return self._evict(self.max_size_bytes)
+
+    def clear(self) -> int:
+        """Remove every cached body. Returns the number removed."""
+        with self._lock:
+            bodies = self._bodies()
+            for _, _, body_path in bodies:
+                self._remove(body_path)
+            return len(bodies)
+
+    def stats(self) -> dict:
+        """Return the number of cached bodies and their total size in bytes."""
+        with self._lock:
+            bodies = self._bodies()
+        return {
+            "path": str(self.path),
+            "entries": len(bodies),
+            "size_bytes": sum(size for _, size, _ in bodies),
+            "max_size_bytes": self.max_size_bytes,
+        }
+
+    def close(self) -> None:
+        """Close the HTTP client and its connections."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
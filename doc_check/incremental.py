@@ -0,0 +1,86 @@
+"""Incremental re-checking: reuse results of questions whose inputs did not change."""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .models import QuestionResult
+
+# Bump when the layout of the state file changes
+STATE_VERSION = 1
+
+
+class IncrementalState:
+    """Per-question results of the previous run and the content they depended on.
+
+    For each question the state stores a fingerprint of the question and the
+    settings used to answer it, the content hashes of the RAG chunks its context
+    was built from and, when the answer may have used the full document (no RAG,
+    or a full document fallback), the hash of the whole document. A result can be
+    reused when all of these are unchanged.
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, dict]] = None):
+        self.path = path
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "IncrementalState":
+        """Load the state file, starting from an empty state if it is missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == STATE_VERSION:
+                return cls(path, data.get("questions", {}))
+        except Exception:
+            # A missing or corrupt state file just means everything is re-checked
+            pass
+        return cls(path)
+
+    @staticmethod
+    def fingerprint(**settings) -> str:
+        """Hash the question and every setting that influences its result."""
+        payload = json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def reusable_result(self, name: str, fingerprint: str, chunk_hashes: List[str], document_hash: str) -> Optional[QuestionResult]:
+        """Return the previous result of a question if none of its inputs changed."""
+        entry = self.entries.get(name)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+        if entry.get("chunks") != chunk_hashes:
+            return None
+        if entry.get("document") is not None and entry["document"] != document_hash:
+            return None
+
+        result = QuestionResult(**entry["result"])
+        result.reused = True
+        return result
+
+    def record(self, name: str, fingerprint: str, chunk_hashes: List[str], document_hash: Optional[str], result: QuestionResult) -> None:
+        """Remember a result and what it depended on. Errors are never recorded."""
+        if result.error:
+            self.entries.pop(name, None)
+            return
+
+        self.entries[name] = {
+            "fingerprint": fingerprint,
+            "chunks": chunk_hashes,
+            "document": document_hash,
+            "result": result.model_dump(exclude={"reused"}),
+        }
+
+    def save(self) -> None:
+        """Atomically write the state file."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": STATE_VERSION, "questions": self.entries}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            # If we can't write the state, the next run simply re-checks everything
+            pass
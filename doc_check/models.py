@@ -1,9 +1,10 @@
 """Data models for doc-check."""
 
-from typing import List, Optional
-from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from datetime import datetime
 import json
+import threading
 
 
 class Question(BaseModel):
@@ -13,9 +14,15 @@ class Question(BaseModel):
     answerEvaluation: str
 
 
+class RateLimit(BaseModel):
+    """Request and token budgets for one model."""
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+
+
 class DocCheckConfig(BaseModel):
     """Configuration for document checking."""
-    file: str
+    file: Union[str, List[str]]  # a file, URL or glob pattern, or a list of them
     questions: List[Question]
     
     # Optional provider and model settings
@@ -33,12 +40,45 @@ class DocCheckConfig(BaseModel):
     rag_chunk_overlap: Optional[int] = None
     rag_top_k: Optional[int] = None
     rag_fallback: Optional[bool] = None
+    rag_fallback_steps: Optional[List[str]] = None
+    rag_chunker: Optional[str] = None
+    rag_chunk_tokens: Optional[int] = None
+    rag_index: Optional[str] = None
+    rag_retriever: Optional[str] = None
+    rag_context_tokens: Optional[int] = None
+    rag_mmr: Optional[float] = None
+    
+    # Optional execution settings
+    concurrency: Optional[int] = None
+    batch_size: Optional[int] = None
+    evaluation_batch_size: Optional[int] = None
+    prompt_cache: Optional[bool] = None
+    rate_limits: Optional[Dict[str, RateLimit]] = None  # keyed by model name
+    max_retries: Optional[int] = None
+    request_timeout: Optional[float] = None
+    question_timeout: Optional[float] = None
+    deadline: Optional[float] = None
+    
+    # Optional response cache settings
+    cache: Optional[bool] = None
+    cache_dir: Optional[str] = None
+    cache_max_size_mb: Optional[int] = None
+    incremental: Optional[bool] = None
+    http_cache_ttl: Optional[float] = None
+    offline: Optional[bool] = None
     
     # Optional output settings
     output_format: Optional[str] = None
     output_dir: Optional[str] = None
 
 
+class FallbackStep(BaseModel):
+    """A retry of a failed RAG answer with more of the document."""
+    step: str  # "top-k", "section", "summary" or "full"
+    passed: bool
+    context_tokens: int  # tokens of the content sent with the question
+
+
 class QuestionResult(BaseModel):
     """Result of a single question evaluation."""
     name: str
@@ -47,6 +87,10 @@ class QuestionResult(BaseModel):
     evaluation_result: str
     passed: bool
     error: Optional[str] = None
+    reused: bool = False  # carried forward from a previous run (incremental mode)
+    retries: int = 0  # LLM requests retried after transient failures
+    context_tokens: Optional[int] = None  # tokens of the RAG context sent with the question
+    fallback_steps: List[FallbackStep] = []  # fallback attempts after a failed RAG answer, in order
 
 
 class ApiUsage(BaseModel):
@@ -57,8 +101,55 @@ class ApiUsage(BaseModel):
     input_tokens: int = 0
     output_tokens: int = 0
     total_tokens: int = 0
+    cached_input_tokens: int = 0  # input tokens served from the provider's prompt cache
+    cache_creation_input_tokens: int = 0  # input tokens written to the provider's prompt cache
     estimated_cost: float = 0.0  # in USD
     api_calls: int = 0
+    cached_responses: int = 0  # responses served from the local response cache
+    
+    # Guards the counters when several questions are processed concurrently
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    
+    @property
+    def cache_hit_ratio(self) -> float:
+        """Percentage of input tokens served from the provider's prompt cache."""
+        if self.input_tokens == 0:
+            return 0.0
+        return (self.cached_input_tokens / self.input_tokens) * 100
+    
+    def add_call(self, input_tokens: int, output_tokens: int, cost: float, total_tokens: Optional[int] = None,
+                 cached_input_tokens: int = 0, cache_creation_input_tokens: int = 0) -> None:
+        """Record the usage of a single API call in a thread-safe way.
+        
+        input_tokens is the full prompt size, cached_input_tokens and
+        cache_creation_input_tokens are the parts of it read from and written to
+        the provider's prompt cache.
+        """
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.cached_input_tokens += cached_input_tokens
+            self.cache_creation_input_tokens += cache_creation_input_tokens
+            self.output_tokens += output_tokens
+            self.total_tokens += total_tokens if total_tokens is not None else input_tokens + output_tokens
+            self.api_calls += 1
+            self.estimated_cost += cost
+    
+    def add_cached_response(self) -> None:
+        """Record a response served from the local response cache (no API call)."""
+        with self._lock:
+            self.cached_responses += 1
+    
+    def merge(self, other: "ApiUsage") -> None:
+        """Add the counters of another usage record into this one."""
+        with self._lock:
+            self.input_tokens += other.input_tokens
+            self.cached_input_tokens += other.cached_input_tokens
+            self.cache_creation_input_tokens += other.cache_creation_input_tokens
+            self.output_tokens += other.output_tokens
+            self.total_tokens += other.total_tokens
+            self.api_calls += other.api_calls
+            self.cached_responses += other.cached_responses
+            self.estimated_cost += other.estimated_cost
 
 
 class DocCheckResult(BaseModel):
@@ -55,8 +55,11 @@ Model: {usage.model}
 API Calls: {usage.api_calls}
 Total Tokens: {usage.total_tokens:,}
 Input Tokens: {usage.input_tokens:,}
+Cached Input Tokens: {usage.cached_input_tokens:,} ({usage.cache_hit_ratio:.1f}% cache hit ratio)
 Output Tokens: {usage.output_tokens:,}
 Estimated Cost: ${usage.estimated_cost:.4f}"""
+            if usage.cached_responses:
+                summary_text += f"\nCached Responses: {usage.cached_responses}"
         
         self.console.print(Panel(summary_text.strip(), title="Summary", border_style="blue"))
         
@@ -68,6 +71,12 @@ Estimated Cost: ${usage.estimated_cost:.4f}"""
         
         for question_result in result.results:
             status = "[green]PASS[/green]" if question_result.passed else "[red]FAIL[/red]"
+            if question_result.reused:
+                status += " [dim](reused)[/dim]"
+            elif question_result.retries:
+                status += f" [dim]({question_result.retries} retries)[/dim]"
+            if question_result.passed and question_result.fallback_steps:
+                status += f" [dim](fallback: {question_result.fallback_steps[-1].step})[/dim]"
             
             if question_result.error:
                 evaluation = f"[red]Error: {question_result.error}[/red]"
@@ -94,6 +103,11 @@ Estimated Cost: ${usage.estimated_cost:.4f}"""
                 else:
                     self.console.print(f"[yellow]Answer:[/yellow] {question_result.answer}")
                     self.console.print(f"[blue]Evaluation:[/blue] {question_result.evaluation_result}")
+                if question_result.context_tokens is not None:
+                    self.console.print(f"[dim]RAG context: {question_result.context_tokens:,} tokens[/dim]")
+                for step in question_result.fallback_steps:
+                    outcome = "PASS" if step.passed else "FAIL"
+                    self.console.print(f"[dim]Fallback {step.step}: {outcome} ({step.context_tokens:,} tokens)[/dim]")
     
     def display_debug_prompt(self, question: str, document_content: str, prompt_type: str) -> None:
         """Display debug information about the prompt being sent to the model."""
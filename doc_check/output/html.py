@@ -149,6 +149,14 @@ class HTMLFormatter(OutputFormatter):
                             <span class="label">Input Tokens:</span>
                             <span class="value">{usage.input_tokens:,}</span>
                         </div>
+                        <div class="stat">
+                            <span class="label">Cached Input Tokens:</span>
+                            <span class="value">{usage.cached_input_tokens:,}</span>
+                        </div>
+                        <div class="stat">
+                            <span class="label">Cache Hit Ratio:</span>
+                            <span class="value">{usage.cache_hit_ratio:.1f}%</span>
+                        </div>
                         <div class="stat">
                             <span class="label">Output Tokens:</span>
                             <span class="value">{usage.output_tokens:,}</span>
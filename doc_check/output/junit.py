@@ -68,6 +68,8 @@ class JUnitFormatter(OutputFormatter):
             self._add_property(properties, "api.calls", str(usage.api_calls))
             self._add_property(properties, "api.total_tokens", str(usage.total_tokens))
             self._add_property(properties, "api.input_tokens", str(usage.input_tokens))
+            self._add_property(properties, "api.cached_input_tokens", str(usage.cached_input_tokens))
+            self._add_property(properties, "api.cache_hit_ratio", f"{usage.cache_hit_ratio:.1f}%")
             self._add_property(properties, "api.output_tokens", str(usage.output_tokens))
             self._add_property(properties, "api.estimated_cost", f"{usage.estimated_cost:.4f}")
         
@@ -1,7 +1,32 @@
-"""Provider modules for different LLM APIs."""
+"""Provider modules for different LLM APIs.
 
-from .openai import OpenAIProvider
-from .anthropic import AnthropicProvider
-from .ollama import OllamaProvider
+Provider classes are loaded on first access, so that only the SDK of the
+provider actually used gets imported.
+"""
 
-__all__ = ['OpenAIProvider', 'AnthropicProvider', 'OllamaProvider']
+import importlib
+
+from .ratelimit import RateLimiter, get_rate_limiter
+
+# Module defining each provider class
+_PROVIDER_MODULES = {
+    'OpenAIProvider': '.openai',
+    'AsyncOpenAIProvider': '.openai',
+    'AnthropicProvider': '.anthropic',
+    'AsyncAnthropicProvider': '.anthropic',
+    'OllamaProvider': '.ollama',
+    'AsyncOllamaProvider': '.ollama',
+}
+
+__all__ = [
+    'OpenAIProvider', 'AnthropicProvider', 'OllamaProvider',
+    'AsyncOpenAIProvider', 'AsyncAnthropicProvider', 'AsyncOllamaProvider',
+    'RateLimiter', 'get_rate_limiter',
+]
+
+
+def __getattr__(name):
+    module_name = _PROVIDER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
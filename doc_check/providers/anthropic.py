@@ -1,13 +1,18 @@
 """Anthropic provider for document checking."""
 
+import json
 import os
 import re
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 import anthropic
 
+from ..cache import ResponseCache
 from ..models import ApiUsage
 from ..pricing import ANTHROPIC_PRICING
+from .base import BATCH_EVALUATION_SCHEMA, ProviderBase
+from .ratelimit import RateLimiter, estimate_tokens
+from .retry import RetryPolicy
 
 # System prompts
 QUESTION_ANSWERING_SYSTEM_PROMPT = """You are a helpful assistant that answers questions about documentation accurately
@@ -27,6 +32,19 @@ Document:
 Please provide a comprehensive answer based on the information in the document, do not provide alternatives outside of the explicit
 examples in the documentation."""
 
+# Prompt caching layout: the document goes first in its own block so that the
+# prefix (system prompt + document) is identical for every question and can be
+# served from Anthropic's prompt cache. The question follows in a second block.
+CACHED_DOCUMENT_PROMPT_TEMPLATE = """Document:
+{document_content}"""
+
+CACHED_QUESTION_PROMPT_TEMPLATE = """Based on the document above, please answer this question:
+
+Question: {question}
+
+Please provide a comprehensive answer based on the information in the document, do not provide alternatives outside of the explicit
+examples in the documentation."""
+
 # Evaluation prompt template
 EVALUATION_PROMPT_TEMPLATE = """Please evaluate the following answer against the given criteria.
 
@@ -46,55 +64,56 @@ EXPLANATION: [Your explanation]"""
 
 # API configuration
 ANTHROPIC_MAX_TOKENS = 4000
+ANTHROPIC_EVALUATION_MAX_TOKENS = 2000
+# Output budget of a batched ask, per question and in total
+ANTHROPIC_BATCH_MAX_TOKENS_PER_QUESTION = 2000
+ANTHROPIC_BATCH_MAX_TOKENS = 8192
+# Output budget of a batched evaluation, per item (a verdict and a brief explanation)
+ANTHROPIC_BATCH_EVALUATION_MAX_TOKENS_PER_ITEM = 500
 ANTHROPIC_SUMMARIZER_MAX_TOKENS = 8000
 DEFAULT_TEMPERATURE = 0.1
 DEFAULT_ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
 
+# Batched evaluations are returned as the input of a forced tool call, which the
+# API validates against BATCH_EVALUATION_SCHEMA
+BATCH_EVALUATION_TOOL = {
+    "name": "record_evaluations",
+    "description": "Record the evaluation of every item.",
+    "input_schema": BATCH_EVALUATION_SCHEMA
+}
+
 
-class AnthropicProvider:
+class AnthropicProvider(ProviderBase):
     """Provider for Anthropic API interactions."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_ANTHROPIC_MODEL):
+    provider_name = "anthropic"
+    transient_errors = (anthropic.APIConnectionError,)
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_ANTHROPIC_MODEL, prompt_cache: bool = False, response_cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None, retry_policy: Optional[RetryPolicy] = None):
         """Initialize the Anthropic provider.
         
         Args:
             api_key: Anthropic API key. If None, will try to get from environment.
             model: Model to use for evaluation.
+            prompt_cache: Whether to send the document as a cacheable prefix block.
+            response_cache: Optional persistent cache of responses.
+            rate_limiter: Optional limiter shared by the clients of this model.
+            retry_policy: Retries and timeouts of the requests. Defaults to RetryPolicy().
         """
-        self.client = anthropic.Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+        self.client = anthropic.Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
         self.model = model
+        self.prompt_cache = prompt_cache
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
         self.api_usage = ApiUsage(provider="anthropic", model=model)
     
     def ask(self, document_content: str, question: str) -> str:
         """Ask a question about the document using Anthropic API."""
-        prompt = QUESTION_PROMPT_TEMPLATE.format(
-            question=question,
-            document_content=document_content
-        )
+        prompt = self._ask_prompt(document_content, question)
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=ANTHROPIC_MAX_TOKENS,
-                temperature=DEFAULT_TEMPERATURE,
-                system=QUESTION_ANSWERING_SYSTEM_PROMPT,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            # Track usage
-            if response.usage:
-                self.api_usage.input_tokens += response.usage.input_tokens
-                self.api_usage.output_tokens += response.usage.output_tokens
-                self.api_usage.total_tokens += response.usage.input_tokens + response.usage.output_tokens
-                self.api_usage.api_calls += 1
-                self.api_usage.estimated_cost += self._calculate_cost(response.usage)
-            
-            # Store raw response for debug mode
-            self.last_raw_response = response.content[0].text
-            
-            return response.content[0].text
+            return self._complete(QUESTION_ANSWERING_SYSTEM_PROMPT, prompt, ANTHROPIC_MAX_TOKENS)
         except Exception as e:
             raise RuntimeError(f"Failed to get answer from Anthropic: {e}")
     
@@ -107,68 +126,174 @@ class AnthropicProvider:
         )
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                temperature=DEFAULT_TEMPERATURE,
-                system=EVALUATION_SYSTEM_PROMPT,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            # Track usage
-            if response.usage:
-                self.api_usage.input_tokens += response.usage.input_tokens
-                self.api_usage.output_tokens += response.usage.output_tokens
-                self.api_usage.total_tokens += response.usage.input_tokens + response.usage.output_tokens
-                self.api_usage.api_calls += 1
-                self.api_usage.estimated_cost += self._calculate_cost(response.usage)
-            
-            evaluation_text = response.content[0].text
-            
-            # Store raw response for debug mode
-            self.last_raw_response = evaluation_text
-            
+            evaluation_text = self._complete(EVALUATION_SYSTEM_PROMPT, prompt, ANTHROPIC_EVALUATION_MAX_TOKENS)
             return self._parse_evaluation_result(evaluation_text)
-            
         except Exception as e:
             raise RuntimeError(f"Failed to evaluate answer with Anthropic: {e}")
     
+    def ask_many(self, document_content: str, questions: Dict[str, str]) -> Dict[str, str]:
+        """Ask several questions about the document in a single request.
+        
+        Args:
+            document_content: Document the questions are about.
+            questions: Questions by id.
+        
+        Returns:
+            Answers by id, only for the questions that were answered in a well-formed way
+        """
+        prompt = self._ask_many_prompt(document_content, questions)
+        max_tokens = min(ANTHROPIC_BATCH_MAX_TOKENS_PER_QUESTION * len(questions), ANTHROPIC_BATCH_MAX_TOKENS)
+
+        try:
+            response = self._complete(QUESTION_ANSWERING_SYSTEM_PROMPT, prompt, max_tokens)
+        except Exception as e:
+            raise RuntimeError(f"Failed to get answers from Anthropic: {e}")
+        
+        return self._parse_batch_answers(response, questions)
+    
+    def evaluate_many(self, items: Dict[str, Tuple[str, str, str]]) -> Dict[str, Tuple[bool, str]]:
+        """Evaluate several answers in a single request.
+        
+        Args:
+            items: (question, answer, evaluation criteria) tuples by id.
+        
+        Returns:
+            (passed, explanation) by id, only for the items that were evaluated in a well-formed way
+        """
+        prompt = self._batch_evaluation_prompt(items)
+        max_tokens = min(ANTHROPIC_BATCH_EVALUATION_MAX_TOKENS_PER_ITEM * len(items), ANTHROPIC_BATCH_MAX_TOKENS)
+
+        try:
+            response = self._complete(EVALUATION_SYSTEM_PROMPT, prompt, max_tokens, BATCH_EVALUATION_TOOL)
+        except Exception as e:
+            raise RuntimeError(f"Failed to evaluate answers with Anthropic: {e}")
+        
+        return self._parse_batch_evaluations(response, items)
+    
     def summarize(self, document_content: str) -> str:
         """Summarize document content using Anthropic API."""
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=ANTHROPIC_SUMMARIZER_MAX_TOKENS,
-                temperature=DEFAULT_TEMPERATURE,
-                system=SUMMARIZATION_SYSTEM_PROMPT,
-                messages=[
-                    {"role": "user", "content": document_content}
-                ]
-            )
-            
-            # Track usage
-            if response.usage:
-                self.api_usage.input_tokens += response.usage.input_tokens
-                self.api_usage.output_tokens += response.usage.output_tokens
-                self.api_usage.total_tokens += response.usage.input_tokens + response.usage.output_tokens
-                self.api_usage.api_calls += 1
-                self.api_usage.estimated_cost += self._calculate_cost(response.usage)
-            
-            return response.content[0].text
+            return self._complete(SUMMARIZATION_SYSTEM_PROMPT, document_content, ANTHROPIC_SUMMARIZER_MAX_TOKENS)
         except Exception as e:
             raise RuntimeError(f"Failed to summarize document with Anthropic: {e}")
     
+    def _ask_prompt(self, document_content: str, question: str) -> Union[str, List[dict]]:
+        """Build the user content for a question.
+        
+        With prompt caching enabled the document is sent as a separate content block
+        marked with cache_control, ahead of the question, so that repeated questions
+        about the same document reuse the cached prefix.
+        """
+        if not self.prompt_cache:
+            return QUESTION_PROMPT_TEMPLATE.format(
+                question=question,
+                document_content=document_content
+            )
+        
+        return [
+            {
+                "type": "text",
+                "text": CACHED_DOCUMENT_PROMPT_TEMPLATE.format(document_content=document_content),
+                "cache_control": {"type": "ephemeral"}
+            },
+            {
+                "type": "text",
+                "text": CACHED_QUESTION_PROMPT_TEMPLATE.format(question=question)
+            }
+        ]
+    
+    def _ask_many_prompt(self, document_content: str, questions: Dict[str, str]) -> Union[str, List[dict]]:
+        """Build the user content for a batched ask, with the same cacheable document block as _ask_prompt."""
+        if not self.prompt_cache:
+            return self._batch_ask_prompt(document_content, questions)
+        
+        return [
+            {
+                "type": "text",
+                "text": CACHED_DOCUMENT_PROMPT_TEMPLATE.format(document_content=document_content),
+                "cache_control": {"type": "ephemeral"}
+            },
+            {
+                "type": "text",
+                "text": self._batch_questions_prompt(questions)
+            }
+        ]
+    
+    def _complete(self, system_prompt: str, prompt: Union[str, List[dict]], max_tokens: int, tool: Optional[dict] = None) -> str:
+        """Send a single messages request and return the response text (the JSON input of tool, if forced to call one)."""
+        cache_key = self._response_cache_key(system_prompt, prompt, DEFAULT_TEMPERATURE)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        def send(timeout):
+            raw = self.client.messages.with_raw_response.create(**self._request_kwargs(system_prompt, prompt, max_tokens, tool), timeout=timeout)
+            return raw.parse(), raw.headers
+        
+        response = self._send_request(send, estimate_tokens(system_prompt, prompt, output_tokens=max_tokens))
+        text = self._handle_response(response)
+        self._store_response(cache_key, text)
+        return text
+    
+    def _request_kwargs(self, system_prompt: str, prompt: Union[str, List[dict]], max_tokens: int, tool: Optional[dict] = None) -> dict:
+        """Build the messages request arguments."""
+        kwargs = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": DEFAULT_TEMPERATURE,
+            "system": system_prompt,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        }
+        if tool:
+            kwargs["tools"] = [tool]
+            kwargs["tool_choice"] = {"type": "tool", "name": tool["name"]}
+        return kwargs
+    
+    def _handle_response(self, response) -> str:
+        """Track usage for a messages response and extract its text."""
+        if response.usage:
+            cache_read_tokens = getattr(response.usage, "cache_read_input_tokens", None) or 0
+            cache_creation_tokens = getattr(response.usage, "cache_creation_input_tokens", None) or 0
+            # input_tokens only counts the uncached part of the prompt, record the full prompt size
+            self.api_usage.add_call(
+                response.usage.input_tokens + cache_read_tokens + cache_creation_tokens,
+                response.usage.output_tokens,
+                self._calculate_cost(response.usage),
+                cached_input_tokens=cache_read_tokens,
+                cache_creation_input_tokens=cache_creation_tokens
+            )
+        
+        # Store raw response for debug mode
+        tool_use = next((block for block in response.content if getattr(block, "type", None) == "tool_use"), None)
+        if tool_use is not None:
+            self.last_raw_response = json.dumps(tool_use.input, ensure_ascii=False)
+        else:
+            self.last_raw_response = response.content[0].text
+        
+        return self.last_raw_response
+    
+    def _response_tokens(self, response) -> Optional[int]:
+        """Tokens used by a messages response."""
+        if not response.usage:
+            return None
+        return response.usage.input_tokens + response.usage.output_tokens
+    
     def _calculate_cost(self, usage) -> float:
         """Calculate estimated cost for Anthropic API usage."""
         # Default to sonnet 4 pricing if model not found
         model_pricing = ANTHROPIC_PRICING.get(self.model, ANTHROPIC_PRICING[DEFAULT_ANTHROPIC_MODEL])
         
+        cache_read_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_creation_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+        
         input_cost = (usage.input_tokens / 1000) * model_pricing["input"]
+        cache_read_cost = (cache_read_tokens / 1000) * model_pricing["cache_read"]
+        cache_write_cost = (cache_creation_tokens / 1000) * model_pricing["cache_write"]
         output_cost = (usage.output_tokens / 1000) * model_pricing["output"]
         
-        return input_cost + output_cost
+        return input_cost + cache_read_cost + cache_write_cost + output_cost
     
     def _parse_evaluation_result(self, evaluation_text: str) -> tuple[bool, str]:
         """Parse the evaluation result from LLM response."""
@@ -209,3 +334,115 @@ class AnthropicProvider:
                 passed = positive_count > negative_count
         
         return passed, explanation
+
+
+class AsyncAnthropicProvider(AnthropicProvider):
+    """Asyncio variant of the Anthropic provider built on the SDK's async client."""
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_ANTHROPIC_MODEL, prompt_cache: bool = False, response_cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None, retry_policy: Optional[RetryPolicy] = None):
+        """Initialize the async Anthropic provider.
+        
+        Args:
+            api_key: Anthropic API key. If None, will try to get from environment.
+            model: Model to use for evaluation.
+            prompt_cache: Whether to send the document as a cacheable prefix block.
+            response_cache: Optional persistent cache of responses.
+            rate_limiter: Optional limiter shared by the clients of this model.
+            retry_policy: Retries and timeouts of the requests. Defaults to RetryPolicy().
+        """
+        self.client = anthropic.AsyncAnthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
+        self.model = model
+        self.prompt_cache = prompt_cache
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.api_usage = ApiUsage(provider="anthropic", model=model)
+    
+    async def ask(self, document_content: str, question: str) -> str:
+        """Ask a question about the document using Anthropic API."""
+        prompt = self._ask_prompt(document_content, question)
+
+        try:
+            return await self._complete(QUESTION_ANSWERING_SYSTEM_PROMPT, prompt, ANTHROPIC_MAX_TOKENS)
+        except Exception as e:
+            raise RuntimeError(f"Failed to get answer from Anthropic: {e}")
+    
+    async def evaluate(self, question: str, answer: str, evaluation_criteria: str) -> tuple[bool, str]:
+        """Evaluate an answer against criteria using Anthropic API."""
+        prompt = EVALUATION_PROMPT_TEMPLATE.format(
+            question=question,
+            answer=answer,
+            evaluation_criteria=evaluation_criteria
+        )
+
+        try:
+            evaluation_text = await self._complete(EVALUATION_SYSTEM_PROMPT, prompt, ANTHROPIC_EVALUATION_MAX_TOKENS)
+            return self._parse_evaluation_result(evaluation_text)
+        except Exception as e:
+            raise RuntimeError(f"Failed to evaluate answer with Anthropic: {e}")
+    
+    async def ask_many(self, document_content: str, questions: Dict[str, str]) -> Dict[str, str]:
+        """Ask several questions about the document in a single request.
+        
+        Args:
+            document_content: Document the questions are about.
+            questions: Questions by id.
+        
+        Returns:
+            Answers by id, only for the questions that were answered in a well-formed way
+        """
+        prompt = self._ask_many_prompt(document_content, questions)
+        max_tokens = min(ANTHROPIC_BATCH_MAX_TOKENS_PER_QUESTION * len(questions), ANTHROPIC_BATCH_MAX_TOKENS)
+
+        try:
+            response = await self._complete(QUESTION_ANSWERING_SYSTEM_PROMPT, prompt, max_tokens)
+        except Exception as e:
+            raise RuntimeError(f"Failed to get answers from Anthropic: {e}")
+        
+        return self._parse_batch_answers(response, questions)
+    
+    async def evaluate_many(self, items: Dict[str, Tuple[str, str, str]]) -> Dict[str, Tuple[bool, str]]:
+        """Evaluate several answers in a single request.
+        
+        Args:
+            items: (question, answer, evaluation criteria) tuples by id.
+        
+        Returns:
+            (passed, explanation) by id, only for the items that were evaluated in a well-formed way
+        """
+        prompt = self._batch_evaluation_prompt(items)
+        max_tokens = min(ANTHROPIC_BATCH_EVALUATION_MAX_TOKENS_PER_ITEM * len(items), ANTHROPIC_BATCH_MAX_TOKENS)
+
+        try:
+            response = await self._complete(EVALUATION_SYSTEM_PROMPT, prompt, max_tokens, BATCH_EVALUATION_TOOL)
+        except Exception as e:
+            raise RuntimeError(f"Failed to evaluate answers with Anthropic: {e}")
+        
+        return self._parse_batch_evaluations(response, items)
+    
+    async def summarize(self, document_content: str) -> str:
+        """Summarize document content using Anthropic API."""
+        try:
+            return await self._complete(SUMMARIZATION_SYSTEM_PROMPT, document_content, ANTHROPIC_SUMMARIZER_MAX_TOKENS)
+        except Exception as e:
+            raise RuntimeError(f"Failed to summarize document with Anthropic: {e}")
+    
+    async def _complete(self, system_prompt: str, prompt: Union[str, List[dict]], max_tokens: int, tool: Optional[dict] = None) -> str:
+        """Send a single messages request and return the response text (the JSON input of tool, if forced to call one)."""
+        cache_key = self._response_cache_key(system_prompt, prompt, DEFAULT_TEMPERATURE)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        async def send(timeout):
+            raw = await self.client.messages.with_raw_response.create(**self._request_kwargs(system_prompt, prompt, max_tokens, tool), timeout=timeout)
+            return raw.parse(), raw.headers
+        
+        response = await self._send_request_async(send, estimate_tokens(system_prompt, prompt, output_tokens=max_tokens))
+        text = self._handle_response(response)
+        self._store_response(cache_key, text)
+        return text
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.client.close()
@@ -0,0 +1,309 @@
+"""Behaviour shared by the LLM providers."""
+
+import asyncio
+import json
+import re
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..cache import ResponseCache
+from .ratelimit import MAX_RATE_LIMIT_RETRIES, RateLimiter, rate_limit_headers, retry_after_seconds
+from .retry import TRANSIENT_STATUS_CODES, RetryPolicy, error_status, record_retry
+
+# Batched question answering: several questions about the same document are sent
+# in one request and answered as a JSON object keyed by question id, so the
+# document's input tokens are paid once per batch instead of once per question.
+# The document comes first so the prompt prefix stays cacheable.
+BATCH_DOCUMENT_PROMPT_TEMPLATE = """Document:
+{document_content}"""
+
+BATCH_QUESTION_PROMPT_TEMPLATE = """Please answer each of the following questions based on the document.
+
+Questions (JSON object mapping question id to question):
+{questions}
+
+Please provide a comprehensive answer to each question based on the information in the document, do not provide alternatives outside of the explicit
+examples in the documentation. Answer each question on its own, as if it was the only question asked.
+
+Respond only with a JSON object mapping every question id to its answer, for example:
+{{"question-id": "answer to the question"}}"""
+
+
+# Batched evaluation: several (question, answer, criteria) items are judged in one
+# request. The reply must follow BATCH_EVALUATION_SCHEMA; items missing from it or
+# not matching it are evaluated again one by one.
+BATCH_EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "evaluations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string"},
+                    "result": {"type": "string", "enum": ["PASS", "FAIL"]},
+                    "explanation": {"type": "string"}
+                },
+                "required": ["id", "result", "explanation"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["evaluations"],
+    "additionalProperties": False
+}
+
+BATCH_EVALUATION_PROMPT_TEMPLATE = """Please evaluate each of the following answers against its criteria.
+
+Items (JSON object mapping item id to the question, the answer and the evaluation criteria):
+{items}
+
+Evaluate every item on its own, as if it was the only one. For each item give PASS or FAIL and a brief
+explanation of your evaluation.
+
+Respond only with a JSON object, with one evaluation per item id, following this JSON schema:
+{schema}"""
+
+
+def parse_json_object(text: str) -> Optional[dict]:
+    """Extract a JSON object from a model response.
+    
+    Models sometimes wrap JSON in a markdown code fence or add a sentence before
+    or after it, so fall back to the outermost pair of braces.
+    
+    Returns:
+        The parsed object, or None if the response doesn't contain one
+    """
+    text = re.sub(r'^\s*```(?:json)?\s*|\s*```\s*$', '', text)
+    candidates = [text]
+    start, end = text.find('{'), text.rfind('}')
+    if 0 <= start < end:
+        candidates.append(text[start:end + 1])
+    
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+class ProviderBase:
+    """Base class for providers: response caching, rate limiting, retries and batch prompts.
+    
+    Subclasses set provider_name, transient_errors and the model, api_usage,
+    response_cache, rate_limiter and retry_policy attributes, and call these
+    helpers around each API request.
+    """
+    
+    provider_name = ""
+    # Exception types, besides transient HTTP statuses, that are worth retrying
+    transient_errors: Tuple[type, ...] = ()
+    response_cache: Optional[ResponseCache] = None
+    rate_limiter: Optional[RateLimiter] = None
+    retry_policy: RetryPolicy = RetryPolicy()
+    
+    def _batch_questions_prompt(self, questions: Dict[str, str]) -> str:
+        """Build the question part of a batched ask prompt."""
+        return BATCH_QUESTION_PROMPT_TEMPLATE.format(
+            questions=json.dumps(questions, indent=2, ensure_ascii=False)
+        )
+    
+    def _batch_ask_prompt(self, document_content: str, questions: Dict[str, str]) -> str:
+        """Build a batched ask prompt: the document followed by the questions."""
+        return BATCH_DOCUMENT_PROMPT_TEMPLATE.format(document_content=document_content) + "\n\n" + self._batch_questions_prompt(questions)
+    
+    def _parse_batch_answers(self, response: str, questions: Dict[str, str]) -> Dict[str, str]:
+        """Map a batched ask response back to individual answers.
+        
+        Only well-formed answers are returned: ids that are missing, unknown or not
+        answered with a non-empty string are left out so the caller can ask them
+        one by one.
+        """
+        data = parse_json_object(response)
+        if data is None:
+            return {}
+        # Tolerate a wrapping {"answers": {...}} object
+        if set(data) == {"answers"} and isinstance(data["answers"], dict):
+            data = data["answers"]
+        
+        return {
+            question_id: answer.strip()
+            for question_id, answer in data.items()
+            if question_id in questions and isinstance(answer, str) and answer.strip()
+        }
+    
+    def _batch_evaluation_prompt(self, items: Dict[str, Tuple[str, str, str]]) -> str:
+        """Build a batched evaluation prompt from (question, answer, criteria) items by id."""
+        payload = {
+            item_id: {"question": question, "answer": answer, "evaluation_criteria": evaluation_criteria}
+            for item_id, (question, answer, evaluation_criteria) in items.items()
+        }
+        return BATCH_EVALUATION_PROMPT_TEMPLATE.format(
+            items=json.dumps(payload, indent=2, ensure_ascii=False),
+            schema=json.dumps(BATCH_EVALUATION_SCHEMA, indent=2)
+        )
+    
+    def _parse_batch_evaluations(self, response: str, items: Dict[str, Tuple[str, str, str]]) -> Dict[str, Tuple[bool, str]]:
+        """Map a batched evaluation response back to (passed, explanation) by item id.
+        
+        Entries are checked against BATCH_EVALUATION_SCHEMA one by one: entries for
+        unknown or repeated ids, without a PASS/FAIL result or without a string
+        explanation are dropped so the caller can evaluate those items alone.
+        """
+        data = parse_json_object(response)
+        evaluations = data.get("evaluations") if data else None
+        if not isinstance(evaluations, list):
+            return {}
+        
+        results = {}
+        seen = set()
+        for entry in evaluations:
+            if not isinstance(entry, dict):
+                continue
+            item_id, result, explanation = entry.get("id"), entry.get("result"), entry.get("explanation")
+            if item_id not in items or not isinstance(result, str) or not isinstance(explanation, str):
+                continue
+            if item_id in seen:
+                # Conflicting verdicts for the same item, trust neither
+                results.pop(item_id, None)
+                continue
+            seen.add(item_id)
+            if result.strip().upper() in ("PASS", "FAIL"):
+                results[item_id] = (result.strip().upper() == "PASS", explanation.strip())
+        return results
+    
+    def _response_cache_key(self, system_prompt: str, prompt, temperature: float) -> Optional[str]:
+        """Cache key for a request, or None if response caching is disabled."""
+        if self.response_cache is None:
+            return None
+        return ResponseCache.make_key(self.provider_name, self.model, system_prompt, prompt, temperature)
+    
+    def _cached_response(self, cache_key: Optional[str]) -> Optional[str]:
+        """Return a previously stored response for this request, if any."""
+        if cache_key is None:
+            return None
+        try:
+            response = self.response_cache.get_response(cache_key)
+        except sqlite3.Error:
+            # If we can't read the cache, just make the request
+            return None
+        
+        if response is not None:
+            self.api_usage.add_cached_response()
+            # Store raw response for debug mode
+            self.last_raw_response = response
+        return response
+    
+    def _store_response(self, cache_key: Optional[str], response: str) -> None:
+        """Store a response for later runs."""
+        if cache_key is None or not response:
+            return
+        try:
+            self.response_cache.put_response(cache_key, response)
+        except sqlite3.Error:
+            # If we can't write the cache, just continue without caching
+            pass
+    
+    def _response_tokens(self, result) -> Optional[int]:
+        """Tokens actually used by a request, from its parsed response. None if unknown."""
+        return None
+    
+    def _is_transient(self, error: Exception) -> bool:
+        """Whether a failed request is worth retrying."""
+        return isinstance(error, self.transient_errors) or error_status(error) in TRANSIENT_STATUS_CODES
+    
+    def _retry_delay(self, error: Exception, retries: int) -> Optional[float]:
+        """Release the rate limiter after a failed request and decide whether to retry it.
+        
+        Returns:
+            Seconds to wait before retrying, or None if the error should be raised
+        """
+        headers = rate_limit_headers(error)
+        if self.rate_limiter is not None:
+            if headers is not None:
+                self.rate_limiter.release_rate_limited(headers)
+            else:
+                self.rate_limiter.release_failed()
+        
+        if headers is not None:
+            if retries >= max(self.retry_policy.max_retries, MAX_RATE_LIMIT_RETRIES):
+                return None
+            # The rate limiter already holds requests back until retry-after
+            delay = 0.0 if self.rate_limiter is not None else self.retry_policy.backoff(retries, retry_after_seconds(headers))
+        elif self._is_transient(error):
+            if retries >= self.retry_policy.max_retries:
+                return None
+            response = getattr(error, "response", None)
+            delay = self.retry_policy.backoff(retries, retry_after_seconds(dict(getattr(response, "headers", None) or {})))
+        else:
+            return None
+        
+        if not self.retry_policy.fits_deadline(delay):
+            return None
+        record_retry()
+        return delay
+    
+    def _send_request(self, send: Callable[[float], Tuple[Any, dict]], estimated_tokens: int):
+        """Send a request through the rate limiter, retrying transient failures.
+        
+        Args:
+            send: Sends the request with the given timeout in seconds and returns the
+                parsed response and its headers.
+            estimated_tokens: Estimated size of the request, input and output.
+        
+        Returns:
+            The parsed response
+        """
+        retries = 0
+        while True:
+            timeout = self.retry_policy.timeout()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimated_tokens)
+            try:
+                result, headers = send(timeout)
+            except Exception as e:
+                delay = self._retry_delay(e, retries)
+                if delay is None:
+                    raise
+                retries += 1
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Interrupted, give the concurrency slot back
+                if self.rate_limiter is not None:
+                    self.rate_limiter.release_failed()
+                raise
+            
+            if self.rate_limiter is not None:
+                self.rate_limiter.release(estimated_tokens, self._response_tokens(result), headers)
+            return result
+    
+    async def _send_request_async(self, send: Callable[[float], Awaitable[Tuple[Any, dict]]], estimated_tokens: int):
+        """Async variant of _send_request, send is a coroutine function."""
+        retries = 0
+        while True:
+            timeout = self.retry_policy.timeout()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(estimated_tokens)
+            try:
+                result, headers = await send(timeout)
+            except Exception as e:
+                delay = self._retry_delay(e, retries)
+                if delay is None:
+                    raise
+                retries += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled, such as by a question timeout: give the concurrency slot back
+                if self.rate_limiter is not None:
+                    self.rate_limiter.release_failed()
+                raise
+            
+            if self.rate_limiter is not None:
+                self.rate_limiter.release(estimated_tokens, self._response_tokens(result), headers)
+            return result
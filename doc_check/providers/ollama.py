@@ -1,10 +1,15 @@
 """Ollama provider for local LLM interactions."""
 
 import json
+import httpx
 import requests
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
+from ..cache import ResponseCache
 from ..models import ApiUsage
 from ..pricing import OLLAMA_PRICING
+from .base import BATCH_EVALUATION_SCHEMA, ProviderBase
+from .ratelimit import RateLimiter, estimate_tokens
+from .retry import DEFAULT_CONNECT_TIMEOUT, RetryPolicy
 
 QUESTION_ANSWERING_SYSTEM_PROMPT = """You are a helpful assistant that answers questions about documents accurately and comprehensively. Don't propose alternative solutions which aren't explicitly documented."""
 
@@ -44,12 +49,18 @@ DEFAULT_OLLAMA_MODEL = "llama3.2"
 DEFAULT_OLLAMA_BASE_URL = "http://localhost:11434"
 
 
-class OllamaProvider:
+class OllamaProvider(ProviderBase):
     """Provider for Ollama local LLM interactions."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_OLLAMA_MODEL, base_url: str = DEFAULT_OLLAMA_BASE_URL):
+    provider_name = "ollama"
+    transient_errors = (requests.ConnectionError, requests.Timeout)
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_OLLAMA_MODEL, base_url: str = DEFAULT_OLLAMA_BASE_URL, response_cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None, retry_policy: Optional[RetryPolicy] = None):
         self.model = model
         self.base_url = base_url.rstrip('/')
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
         self.api_usage = ApiUsage(provider="ollama", model=model)
     
     def ask(self, document_content: str, question: str) -> str:
@@ -81,15 +92,72 @@ class OllamaProvider:
         
         return self._parse_evaluation_result(evaluation_text)
     
+    def ask_many(self, document_content: str, questions: Dict[str, str]) -> Dict[str, str]:
+        """Ask several questions about the document in a single request.
+        
+        Returns answers by question id, only for the questions that were answered
+        in a well-formed way.
+        """
+        prompt = self._batch_ask_prompt(document_content, questions)
+        response = self._make_request(prompt, QUESTION_ANSWERING_SYSTEM_PROMPT)
+        
+        # Store raw response for debug mode
+        self.last_raw_response = response
+        
+        return self._parse_batch_answers(response, questions)
+    
+    def evaluate_many(self, items: Dict[str, Tuple[str, str, str]]) -> Dict[str, Tuple[bool, str]]:
+        """Evaluate several (question, answer, criteria) items in a single request.
+        
+        Returns (passed, explanation) by item id, only for the items that were
+        evaluated in a well-formed way.
+        """
+        prompt = self._batch_evaluation_prompt(items)
+        # Constrain the reply to the schema (structured outputs)
+        evaluation_text = self._make_request(prompt, EVALUATION_SYSTEM_PROMPT, BATCH_EVALUATION_SCHEMA)
+        
+        # Store raw response for debug mode
+        self.last_raw_response = evaluation_text
+        
+        return self._parse_batch_evaluations(evaluation_text, items)
+    
     def summarize(self, document_content: str) -> str:
         """Summarize the document content."""
         prompt = f"Please summarize the following document:\n\n{document_content}"
         return self._make_request(prompt, SUMMARIZATION_SYSTEM_PROMPT)
     
-    def _make_request(self, prompt: str, system_prompt: str) -> str:
+    def _make_request(self, prompt: str, system_prompt: str, response_format: Optional[dict] = None) -> str:
         """Make a request to the Ollama API."""
-        url = f"{self.base_url}/api/generate"
+        cache_key = self._response_cache_key(system_prompt, prompt, DEFAULT_TEMPERATURE)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
         
+        try:
+            def send(timeout):
+                response = requests.post(
+                    self._generate_url(),
+                    json=self._build_payload(prompt, system_prompt, response_format),
+                    timeout=(DEFAULT_CONNECT_TIMEOUT, timeout)
+                )
+                response.raise_for_status()
+                return response.json(), response.headers
+            
+            text = self._handle_result(self._send_request(send, estimate_tokens(system_prompt, prompt)))
+            self._store_response(cache_key, text)
+            return text
+            
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Ollama API request failed: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Failed to parse Ollama API response: {str(e)}")
+    
+    def _generate_url(self) -> str:
+        """URL of the Ollama generate endpoint."""
+        return f"{self.base_url}/api/generate"
+    
+    def _build_payload(self, prompt: str, system_prompt: str, response_format: Optional[dict] = None) -> dict:
+        """Build the generate request payload, with the JSON schema of the response if any."""
         # Combine system prompt and user prompt for Ollama
         full_prompt = f"{system_prompt}\n\n{prompt}"
         
@@ -101,29 +169,23 @@ class OllamaProvider:
                 "temperature": DEFAULT_TEMPERATURE
             }
         }
+        if response_format:
+            payload["format"] = response_format
+        return payload
+    
+    def _handle_result(self, result: dict) -> str:
+        """Track token usage for a generate response and extract its text."""
+        # Track token usage if available
+        input_tokens = result.get('prompt_eval_count', 0)
+        output_tokens = result.get('eval_count', 0)
         
-        try:
-            response = requests.post(url, json=payload, timeout=300)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Track token usage if available
-            input_tokens = result.get('prompt_eval_count', 0)
-            output_tokens = result.get('eval_count', 0)
-            
-            self.api_usage.input_tokens += input_tokens
-            self.api_usage.output_tokens += output_tokens
-            self.api_usage.total_tokens += input_tokens + output_tokens
-            self.api_usage.api_calls += 1
-            self.api_usage.estimated_cost += self._calculate_cost(result)
-            
-            return result.get('response', '')
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Ollama API request failed: {str(e)}")
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse Ollama API response: {str(e)}")
+        self.api_usage.add_call(input_tokens, output_tokens, self._calculate_cost(result))
+        
+        return result.get('response', '')
+    
+    def _response_tokens(self, result: dict) -> Optional[int]:
+        """Tokens used by a generate response."""
+        return result.get('prompt_eval_count', 0) + result.get('eval_count', 0)
     
     def _calculate_cost(self, response_data) -> float:
         """Calculate the cost of the API call (Ollama is free)."""
@@ -168,3 +230,106 @@ class OllamaProvider:
                 explanation = ' '.join(explanation_parts)
         
         return result, explanation
+
+
+class AsyncOllamaProvider(OllamaProvider):
+    """Asyncio variant of the Ollama provider built on an httpx async client."""
+    
+    transient_errors = (httpx.TransportError,)
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_OLLAMA_MODEL, base_url: str = DEFAULT_OLLAMA_BASE_URL, response_cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None, retry_policy: Optional[RetryPolicy] = None):
+        super().__init__(api_key=api_key, model=model, base_url=base_url, response_cache=response_cache, rate_limiter=rate_limiter, retry_policy=retry_policy)
+        self.client = httpx.AsyncClient()
+    
+    async def ask(self, document_content: str, question: str) -> str:
+        """Ask a question about the document content."""
+        prompt = QUESTION_PROMPT_TEMPLATE.format(
+            question=question,
+            document_content=document_content
+        )
+        
+        response = await self._make_request(prompt, QUESTION_ANSWERING_SYSTEM_PROMPT)
+        
+        # Store raw response for debug mode
+        self.last_raw_response = response
+        
+        return response
+    
+    async def evaluate(self, question: str, answer: str, evaluation_criteria: str) -> Tuple[bool, str]:
+        """Evaluate an answer against the given criteria."""
+        prompt = EVALUATION_PROMPT_TEMPLATE.format(
+            question=question,
+            answer=answer,
+            evaluation_criteria=evaluation_criteria
+        )
+        
+        evaluation_text = await self._make_request(prompt, EVALUATION_SYSTEM_PROMPT)
+        
+        # Store raw response for debug mode
+        self.last_raw_response = evaluation_text
+        
+        return self._parse_evaluation_result(evaluation_text)
+    
+    async def ask_many(self, document_content: str, questions: Dict[str, str]) -> Dict[str, str]:
+        """Ask several questions about the document in a single request.
+        
+        Returns answers by question id, only for the questions that were answered
+        in a well-formed way.
+        """
+        prompt = self._batch_ask_prompt(document_content, questions)
+        response = await self._make_request(prompt, QUESTION_ANSWERING_SYSTEM_PROMPT)
+        
+        # Store raw response for debug mode
+        self.last_raw_response = response
+        
+        return self._parse_batch_answers(response, questions)
+    
+    async def evaluate_many(self, items: Dict[str, Tuple[str, str, str]]) -> Dict[str, Tuple[bool, str]]:
+        """Evaluate several (question, answer, criteria) items in a single request.
+        
+        Returns (passed, explanation) by item id, only for the items that were
+        evaluated in a well-formed way.
+        """
+        prompt = self._batch_evaluation_prompt(items)
+        # Constrain the reply to the schema (structured outputs)
+        evaluation_text = await self._make_request(prompt, EVALUATION_SYSTEM_PROMPT, BATCH_EVALUATION_SCHEMA)
+        
+        # Store raw response for debug mode
+        self.last_raw_response = evaluation_text
+        
+        return self._parse_batch_evaluations(evaluation_text, items)
+    
+    async def summarize(self, document_content: str) -> str:
+        """Summarize the document content."""
+        prompt = f"Please summarize the following document:\n\n{document_content}"
+        return await self._make_request(prompt, SUMMARIZATION_SYSTEM_PROMPT)
+    
+    async def _make_request(self, prompt: str, system_prompt: str, response_format: Optional[dict] = None) -> str:
+        """Make a request to the Ollama API."""
+        cache_key = self._response_cache_key(system_prompt, prompt, DEFAULT_TEMPERATURE)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            async def send(timeout):
+                response = await self.client.post(
+                    self._generate_url(),
+                    json=self._build_payload(prompt, system_prompt, response_format),
+                    timeout=httpx.Timeout(timeout, connect=DEFAULT_CONNECT_TIMEOUT)
+                )
+                response.raise_for_status()
+                return response.json(), response.headers
+            
+            text = self._handle_result(await self._send_request_async(send, estimate_tokens(system_prompt, prompt)))
+            self._store_response(cache_key, text)
+            return text
+            
+        except httpx.HTTPError as e:
+            raise Exception(f"Ollama API request failed: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Failed to parse Ollama API response: {str(e)}")
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.client.aclose()
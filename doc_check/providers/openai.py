@@ -2,12 +2,16 @@
 
 import os
 import re
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
-from openai import OpenAI
+from openai import APIConnectionError, AsyncOpenAI, OpenAI
 
+from ..cache import ResponseCache
 from ..models import ApiUsage
 from ..pricing import OPENAI_PRICING
+from .base import BATCH_EVALUATION_SCHEMA, ProviderBase
+from .ratelimit import RateLimiter, estimate_tokens
+from .retry import RetryPolicy
 
 # System prompts
 QUESTION_ANSWERING_SYSTEM_PROMPT = """You are a helpful assistant that answers questions about documentation accurately and comprehensively.
@@ -18,13 +22,16 @@ Be strict but fair in your evaluation."""
 SUMMARIZATION_SYSTEM_PROMPT = "You are an expert document summarizer. Create comprehensive, detailed summaries that preserve all important information."
 
 # Question answering prompt template
-QUESTION_PROMPT_TEMPLATE = """Based on the following document, please answer this question:
-
-Question: {question}
+# The document comes first and the question last: OpenAI caches prompt prefixes
+# automatically, so repeated questions about the same document reuse the cached
+# system prompt + document prefix.
+QUESTION_PROMPT_TEMPLATE = """Please answer a question based on the following document.
 
 Document:
 {document_content}
 
+Question: {question}
+
 Please provide a comprehensive answer based on the information in the document, do not provide alternatives outside of the explicit
 examples in the documentation."""
 
@@ -49,19 +56,32 @@ EXPLANATION: [Your explanation]"""
 DEFAULT_TEMPERATURE = 0.1
 DEFAULT_OPENAI_MODEL = "gpt-4.1"
 
+# Models that accept a strict JSON schema as response_format (structured outputs),
+# older ones get the schema in the prompt only
+STRUCTURED_OUTPUT_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
 
-class OpenAIProvider:
+
+class OpenAIProvider(ProviderBase):
     """Provider for OpenAI API interactions."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_OPENAI_MODEL):
+    provider_name = "openai"
+    transient_errors = (APIConnectionError,)
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_OPENAI_MODEL, response_cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None, retry_policy: Optional[RetryPolicy] = None):
         """Initialize the OpenAI provider.
         
         Args:
             api_key: OpenAI API key. If None, will try to get from environment.
             model: Model to use for evaluation.
+            response_cache: Optional persistent cache of responses.
+            rate_limiter: Optional limiter shared by the clients of this model.
+            retry_policy: Retries and timeouts of the requests. Defaults to RetryPolicy().
         """
-        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), max_retries=0)
         self.model = model
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
         self.api_usage = ApiUsage(provider="openai", model=model)
     
     def ask(self, document_content: str, question: str) -> str:
@@ -72,27 +92,7 @@ class OpenAIProvider:
         )
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": QUESTION_ANSWERING_SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=DEFAULT_TEMPERATURE
-            )
-            
-            # Track usage
-            if response.usage:
-                self.api_usage.input_tokens += response.usage.prompt_tokens
-                self.api_usage.output_tokens += response.usage.completion_tokens
-                self.api_usage.total_tokens += response.usage.total_tokens
-                self.api_usage.api_calls += 1
-                self.api_usage.estimated_cost += self._calculate_cost(response.usage)
-            
-            # Store raw response for debug mode
-            self.last_raw_response = response.choices[0].message.content or ""
-            
-            return response.choices[0].message.content or ""
+            return self._complete(QUESTION_ANSWERING_SYSTEM_PROMPT, prompt)
         except Exception as e:
             raise RuntimeError(f"Failed to get answer from OpenAI: {e}")
     
@@ -105,66 +105,133 @@ class OpenAIProvider:
         )
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": EVALUATION_SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=DEFAULT_TEMPERATURE
-            )
-            
-            # Track usage
-            if response.usage:
-                self.api_usage.input_tokens += response.usage.prompt_tokens
-                self.api_usage.output_tokens += response.usage.completion_tokens
-                self.api_usage.total_tokens += response.usage.total_tokens
-                self.api_usage.api_calls += 1
-                self.api_usage.estimated_cost += self._calculate_cost(response.usage)
-            
-            evaluation_text = response.choices[0].message.content or ""
-            
-            # Store raw response for debug mode
-            self.last_raw_response = evaluation_text
-            
+            evaluation_text = self._complete(EVALUATION_SYSTEM_PROMPT, prompt)
             return self._parse_evaluation_result(evaluation_text)
-            
         except Exception as e:
             raise RuntimeError(f"Failed to evaluate answer with OpenAI: {e}")
     
+    def ask_many(self, document_content: str, questions: Dict[str, str]) -> Dict[str, str]:
+        """Ask several questions about the document in a single request.
+        
+        Args:
+            document_content: Document the questions are about.
+            questions: Questions by id.
+        
+        Returns:
+            Answers by id, only for the questions that were answered in a well-formed way
+        """
+        prompt = self._batch_ask_prompt(document_content, questions)
+
+        try:
+            response = self._complete(QUESTION_ANSWERING_SYSTEM_PROMPT, prompt)
+        except Exception as e:
+            raise RuntimeError(f"Failed to get answers from OpenAI: {e}")
+        
+        return self._parse_batch_answers(response, questions)
+    
+    def evaluate_many(self, items: Dict[str, Tuple[str, str, str]]) -> Dict[str, Tuple[bool, str]]:
+        """Evaluate several answers in a single request.
+        
+        Args:
+            items: (question, answer, evaluation criteria) tuples by id.
+        
+        Returns:
+            (passed, explanation) by id, only for the items that were evaluated in a well-formed way
+        """
+        prompt = self._batch_evaluation_prompt(items)
+
+        try:
+            response = self._complete(EVALUATION_SYSTEM_PROMPT, prompt, self._batch_evaluation_response_format())
+        except Exception as e:
+            raise RuntimeError(f"Failed to evaluate answers with OpenAI: {e}")
+        
+        return self._parse_batch_evaluations(response, items)
+    
     def summarize(self, document_content: str) -> str:
         """Summarize document content using OpenAI API."""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": SUMMARIZATION_SYSTEM_PROMPT},
-                    {"role": "user", "content": document_content}
-                ],
-                temperature=DEFAULT_TEMPERATURE
-            )
-            
-            # Track usage
-            if response.usage:
-                self.api_usage.input_tokens += response.usage.prompt_tokens
-                self.api_usage.output_tokens += response.usage.completion_tokens
-                self.api_usage.total_tokens += response.usage.total_tokens
-                self.api_usage.api_calls += 1
-                self.api_usage.estimated_cost += self._calculate_cost(response.usage)
-            
-            return response.choices[0].message.content or ""
+            return self._complete(SUMMARIZATION_SYSTEM_PROMPT, document_content)
         except Exception as e:
             raise RuntimeError(f"Failed to summarize document with OpenAI: {e}")
     
+    def _complete(self, system_prompt: str, prompt: str, response_format: Optional[dict] = None) -> str:
+        """Send a single chat completion request and return the response text."""
+        cache_key = self._response_cache_key(system_prompt, prompt, DEFAULT_TEMPERATURE)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        def send(timeout):
+            raw = self.client.chat.completions.with_raw_response.create(**self._request_kwargs(system_prompt, prompt, response_format), timeout=timeout)
+            return raw.parse(), raw.headers
+        
+        response = self._send_request(send, estimate_tokens(system_prompt, prompt))
+        text = self._handle_response(response)
+        self._store_response(cache_key, text)
+        return text
+    
+    def _request_kwargs(self, system_prompt: str, prompt: str, response_format: Optional[dict] = None) -> dict:
+        """Build the chat completion request arguments."""
+        kwargs = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": DEFAULT_TEMPERATURE
+        }
+        if response_format:
+            kwargs["response_format"] = response_format
+        return kwargs
+    
+    def _batch_evaluation_response_format(self) -> Optional[dict]:
+        """Strict JSON schema response format for batched evaluations, if the model supports it."""
+        if not self.model.startswith(STRUCTURED_OUTPUT_MODEL_PREFIXES):
+            return None
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "evaluations", "schema": BATCH_EVALUATION_SCHEMA, "strict": True}
+        }
+    
+    def _handle_response(self, response) -> str:
+        """Track usage for a chat completion response and extract its text."""
+        if response.usage:
+            self.api_usage.add_call(
+                response.usage.prompt_tokens,
+                response.usage.completion_tokens,
+                self._calculate_cost(response.usage),
+                total_tokens=response.usage.total_tokens,
+                cached_input_tokens=self._cached_tokens(response.usage)
+            )
+        
+        # Store raw response for debug mode
+        self.last_raw_response = response.choices[0].message.content or ""
+        
+        return self.last_raw_response
+    
+    def _response_tokens(self, response) -> Optional[int]:
+        """Tokens used by a chat completion response."""
+        return response.usage.total_tokens if response.usage else None
+    
     def _calculate_cost(self, usage) -> float:
         """Calculate estimated cost for OpenAI API usage."""
         # Default to gpt-4.1 pricing if model not found
         model_pricing = OPENAI_PRICING.get(self.model, OPENAI_PRICING[DEFAULT_OPENAI_MODEL])
         
-        input_cost = (usage.prompt_tokens / 1000) * model_pricing["input"]
+        # Cached prompt tokens are billed at a discount, models without one pay full price
+        cached_tokens = self._cached_tokens(usage)
+        cached_price = model_pricing.get("cached_input", model_pricing["input"])
+        
+        input_cost = ((usage.prompt_tokens - cached_tokens) / 1000) * model_pricing["input"]
+        cached_input_cost = (cached_tokens / 1000) * cached_price
         output_cost = (usage.completion_tokens / 1000) * model_pricing["output"]
         
-        return input_cost + output_cost
+        return input_cost + cached_input_cost + output_cost
+    
+    def _cached_tokens(self, usage) -> int:
+        """Number of prompt tokens served from OpenAI's prompt cache."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        return (getattr(details, "cached_tokens", None) or 0) if details else 0
     
     def _parse_evaluation_result(self, evaluation_text: str) -> tuple[bool, str]:
         """Parse the evaluation result from LLM response."""
@@ -205,3 +272,114 @@ class OpenAIProvider:
                 passed = positive_count > negative_count
         
         return passed, explanation
+
+
+class AsyncOpenAIProvider(OpenAIProvider):
+    """Asyncio variant of the OpenAI provider built on the SDK's async client."""
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_OPENAI_MODEL, response_cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None, retry_policy: Optional[RetryPolicy] = None):
+        """Initialize the async OpenAI provider.
+        
+        Args:
+            api_key: OpenAI API key. If None, will try to get from environment.
+            model: Model to use for evaluation.
+            response_cache: Optional persistent cache of responses.
+            rate_limiter: Optional limiter shared by the clients of this model.
+            retry_policy: Retries and timeouts of the requests. Defaults to RetryPolicy().
+        """
+        self.client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), max_retries=0)
+        self.model = model
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.api_usage = ApiUsage(provider="openai", model=model)
+    
+    async def ask(self, document_content: str, question: str) -> str:
+        """Ask a question about the document using OpenAI API."""
+        prompt = QUESTION_PROMPT_TEMPLATE.format(
+            question=question,
+            document_content=document_content
+        )
+
+        try:
+            return await self._complete(QUESTION_ANSWERING_SYSTEM_PROMPT, prompt)
+        except Exception as e:
+            raise RuntimeError(f"Failed to get answer from OpenAI: {e}")
+    
+    async def evaluate(self, question: str, answer: str, evaluation_criteria: str) -> tuple[bool, str]:
+        """Evaluate an answer against criteria using OpenAI API."""
+        prompt = EVALUATION_PROMPT_TEMPLATE.format(
+            question=question,
+            answer=answer,
+            evaluation_criteria=evaluation_criteria
+        )
+
+        try:
+            evaluation_text = await self._complete(EVALUATION_SYSTEM_PROMPT, prompt)
+            return self._parse_evaluation_result(evaluation_text)
+        except Exception as e:
+            raise RuntimeError(f"Failed to evaluate answer with OpenAI: {e}")
+    
+    async def ask_many(self, document_content: str, questions: Dict[str, str]) -> Dict[str, str]:
+        """Ask several questions about the document in a single request.
+        
+        Args:
+            document_content: Document the questions are about.
+            questions: Questions by id.
+        
+        Returns:
+            Answers by id, only for the questions that were answered in a well-formed way
+        """
+        prompt = self._batch_ask_prompt(document_content, questions)
+
+        try:
+            response = await self._complete(QUESTION_ANSWERING_SYSTEM_PROMPT, prompt)
+        except Exception as e:
+            raise RuntimeError(f"Failed to get answers from OpenAI: {e}")
+        
+        return self._parse_batch_answers(response, questions)
+    
+    async def evaluate_many(self, items: Dict[str, Tuple[str, str, str]]) -> Dict[str, Tuple[bool, str]]:
+        """Evaluate several answers in a single request.
+        
+        Args:
+            items: (question, answer, evaluation criteria) tuples by id.
+        
+        Returns:
+            (passed, explanation) by id, only for the items that were evaluated in a well-formed way
+        """
+        prompt = self._batch_evaluation_prompt(items)
+
+        try:
+            response = await self._complete(EVALUATION_SYSTEM_PROMPT, prompt, self._batch_evaluation_response_format())
+        except Exception as e:
+            raise RuntimeError(f"Failed to evaluate answers with OpenAI: {e}")
+        
+        return self._parse_batch_evaluations(response, items)
+    
+    async def summarize(self, document_content: str) -> str:
+        """Summarize document content using OpenAI API."""
+        try:
+            return await self._complete(SUMMARIZATION_SYSTEM_PROMPT, document_content)
+        except Exception as e:
+            raise RuntimeError(f"Failed to summarize document with OpenAI: {e}")
+    
+    async def _complete(self, system_prompt: str, prompt: str, response_format: Optional[dict] = None) -> str:
+        """Send a single chat completion request and return the response text."""
+        cache_key = self._response_cache_key(system_prompt, prompt, DEFAULT_TEMPERATURE)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        async def send(timeout):
+            raw = await self.client.chat.completions.with_raw_response.create(**self._request_kwargs(system_prompt, prompt, response_format), timeout=timeout)
+            return raw.parse(), raw.headers
+        
+        response = await self._send_request_async(send, estimate_tokens(system_prompt, prompt))
+        text = self._handle_response(response)
+        self._store_response(cache_key, text)
+        return text
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.client.close()
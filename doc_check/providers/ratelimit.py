@@ -0,0 +1,279 @@
+"""Client-side rate limiting shared by the providers.
+
+Every provider and model pair gets one RateLimiter, shared by all the clients
+talking to it (sync or async, main or summarizer). It enforces requests-per-minute
+and tokens-per-minute budgets with token buckets, estimating the size of each
+request before sending it, and adapts the number of requests in flight AIMD-style:
+halved when the API answers 429, grown back by one per round of successful
+requests. Limits that aren't configured are learned from the rate-limit headers
+of the responses.
+"""
+
+import asyncio
+import email.utils
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .retry import DeadlineExceeded, remaining_time
+
+# Rough number of characters per token, used to estimate the size of a request before sending it
+CHARS_PER_TOKEN = 4
+
+# Output size assumed for requests that don't set max_tokens
+DEFAULT_OUTPUT_TOKENS = 1000
+
+# How many times a request answered with 429 is sent again before giving up
+MAX_RATE_LIMIT_RETRIES = 6
+
+# Wait after a 429 that has no retry-after header, in seconds
+DEFAULT_RATE_LIMIT_BACKOFF = 5.0
+
+# How often a request waiting for a concurrency slot checks again, in seconds
+SLOT_POLL_INTERVAL = 0.05
+
+# Rate limit headers sent by OpenAI (x-ratelimit-*) and Anthropic (anthropic-ratelimit-*)
+LIMIT_HEADERS = {
+    "requests": ("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit"),
+    "tokens": ("x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit"),
+}
+REMAINING_HEADERS = {
+    "requests": ("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining"),
+    "tokens": ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining"),
+}
+
+
+def estimate_tokens(*parts, output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> int:
+    """Estimate the tokens a request will use: its prompt parts plus the expected output.
+
+    Parts may be strings or lists of content blocks with a "text" field.
+    """
+    chars = 0
+    for part in parts:
+        if isinstance(part, str):
+            chars += len(part)
+        elif isinstance(part, list):
+            chars += sum(len(block.get("text", "")) for block in part if isinstance(block, dict))
+    return math.ceil(chars / CHARS_PER_TOKEN) + output_tokens
+
+
+def rate_limit_headers(error: Exception) -> Optional[dict]:
+    """Return the response headers if error is a 429 response, None for any other error.
+
+    Works with the OpenAI and Anthropic SDK errors as well as requests and httpx
+    HTTP errors, which all expose the response they failed on.
+    """
+    response = getattr(error, "response", None)
+    status_code = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status_code != 429:
+        return None
+    return dict(getattr(response, "headers", None) or {})
+
+
+def _header(headers: dict, names: Tuple[str, ...]) -> Optional[float]:
+    """Numeric value of the first of names present in headers."""
+    lowered = {key.lower(): value for key, value in headers.items()}
+    for name in names:
+        try:
+            return float(lowered[name])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def retry_after_seconds(headers: dict) -> Optional[float]:
+    """Parse retry-after-ms or retry-after (seconds or an HTTP date) from response headers."""
+    milliseconds = _header(headers, ("retry-after-ms",))
+    if milliseconds is not None:
+        return milliseconds / 1000
+
+    seconds = _header(headers, ("retry-after",))
+    if seconds is not None:
+        return seconds
+
+    value = {key.lower(): value for key, value in headers.items()}.get("retry-after")
+    if value:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+class TokenBucket:
+    """Budget of `per_minute` units, refilled continuously."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount units are available."""
+        self._refill(now)
+        # A request larger than the whole budget only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / self.capacity
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+    def resize(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.level = min(self.level, self.capacity)
+
+
+class RateLimiter:
+    """Requests/tokens per minute budgets and adaptive concurrency for one provider and model."""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Maximum requests per minute, learned from the API if None.
+            tokens_per_minute: Maximum tokens (input and output) per minute, learned from the API if None.
+        """
+        self._lock = threading.Lock()
+        self.buckets: Dict[str, Optional[TokenBucket]] = {"requests": None, "tokens": None}
+        self.configured = {"requests": False, "tokens": False}
+        self.configure(requests_per_minute, tokens_per_minute)
+        # Unbounded until the first 429
+        self.concurrency_limit = math.inf
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.rate_limited = 0
+
+    def configure(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None) -> None:
+        """Set explicit budgets, which take precedence over limits learned from headers."""
+        with self._lock:
+            for kind, per_minute in (("requests", requests_per_minute), ("tokens", tokens_per_minute)):
+                if per_minute:
+                    self._set_limit(kind, per_minute)
+                    self.configured[kind] = True
+
+    def _set_limit(self, kind: str, per_minute: float) -> None:
+        bucket = self.buckets[kind]
+        if bucket is None:
+            self.buckets[kind] = TokenBucket(per_minute)
+        elif bucket.capacity != per_minute:
+            bucket.resize(per_minute)
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve budget and a concurrency slot for a request, or return how long to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self.paused_until - now
+            if self.in_flight >= self.concurrency_limit:
+                wait = max(wait, SLOT_POLL_INTERVAL)
+            for kind, amount in (("requests", 1), ("tokens", tokens)):
+                bucket = self.buckets[kind]
+                if bucket is not None:
+                    wait = max(wait, bucket.wait_time(amount, now))
+            if wait > 0:
+                return wait
+
+            for kind, amount in (("requests", 1), ("tokens", tokens)):
+                if self.buckets[kind] is not None:
+                    self.buckets[kind].take(amount)
+            self.in_flight += 1
+            return 0.0
+
+    def _check_deadline(self, wait: float) -> None:
+        """Raise DeadlineExceeded if the current deadline passes before wait seconds."""
+        remaining = remaining_time()
+        if remaining is not None and remaining <= wait:
+            raise DeadlineExceeded("Deadline exceeded")
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a request of the estimated size may be sent.
+
+        Raises:
+            DeadlineExceeded: If the request can't be sent before the current deadline
+        """
+        while (wait := self._reserve(tokens)) > 0:
+            self._check_deadline(wait)
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int) -> None:
+        """Wait, without blocking the event loop, until a request of the estimated size may be sent.
+
+        Raises:
+            DeadlineExceeded: If the request can't be sent before the current deadline
+        """
+        while (wait := self._reserve(tokens)) > 0:
+            self._check_deadline(wait)
+            await asyncio.sleep(wait)
+
+    def release(self, estimated_tokens: int, actual_tokens: Optional[int] = None, headers: Optional[dict] = None) -> None:
+        """Record a successful request: correct the token estimate, learn from headers, grow concurrency."""
+        with self._lock:
+            self.in_flight -= 1
+            if actual_tokens is not None and self.buckets["tokens"] is not None:
+                self.buckets["tokens"].give(estimated_tokens - actual_tokens)
+            self._update_from_headers(headers or {})
+            # Additive increase: about one more slot per round of successful requests
+            if self.concurrency_limit != math.inf:
+                self.concurrency_limit += 1 / self.concurrency_limit
+
+    def release_rate_limited(self, headers: Optional[dict] = None) -> float:
+        """Record a 429 response: halve concurrency and pause sending until retry-after.
+
+        Returns:
+            Seconds until requests may be sent again
+        """
+        headers = headers or {}
+        with self._lock:
+            self.in_flight -= 1
+            self.rate_limited += 1
+            now = time.monotonic()
+            # Multiplicative decrease, once per backoff: the other requests in flight
+            # during the same burst get their 429 too
+            if now >= self.paused_until:
+                self.concurrency_limit = max(1.0, min(self.concurrency_limit, self.in_flight + 1) / 2)
+            retry_after = retry_after_seconds(headers)
+            self.paused_until = max(self.paused_until, now + (retry_after if retry_after is not None else DEFAULT_RATE_LIMIT_BACKOFF))
+            self._update_from_headers(headers)
+            return self.paused_until - now
+
+    def release_failed(self) -> None:
+        """Record a request that failed for another reason than rate limiting."""
+        with self._lock:
+            self.in_flight -= 1
+
+    def _update_from_headers(self, headers: dict) -> None:
+        """Adopt limits and remaining budgets reported by the API. Caller holds the lock."""
+        for kind in ("requests", "tokens"):
+            limit = _header(headers, LIMIT_HEADERS[kind])
+            if limit and not self.configured[kind]:
+                self._set_limit(kind, limit)
+
+            remaining = _header(headers, REMAINING_HEADERS[kind])
+            bucket = self.buckets[kind]
+            if remaining is not None and bucket is not None:
+                # The server's view includes requests made by other clients
+                bucket.level = min(bucket.level, remaining)
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None) -> RateLimiter:
+    """Return the limiter shared by every client of a provider and model, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get((provider, model))
+        if limiter is None:
+            limiter = _limiters[(provider, model)] = RateLimiter(requests_per_minute, tokens_per_minute)
+            return limiter
+    limiter.configure(requests_per_minute, tokens_per_minute)
+    return limiter
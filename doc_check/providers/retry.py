@@ -0,0 +1,130 @@
+"""Retries, timeouts and deadlines for provider requests.
+
+Transient failures (connection errors, timeouts, 5xx and overloaded responses)
+are retried with exponential backoff and full jitter. Every request gets a
+timeout, capped by the deadline of the work it belongs to: a deadline is set for
+the current thread or asyncio task with deadline_scope(), for example the run
+deadline or a question's time budget, and requests fail with DeadlineExceeded
+once it has passed instead of being sent or retried.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_INITIAL_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 30.0
+
+# Time allowed for a single request, and for opening its connection, in seconds
+DEFAULT_REQUEST_TIMEOUT = 120.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+# HTTP statuses worth retrying: timeouts, conflicts, server errors and Anthropic's "overloaded"
+TRANSIENT_STATUS_CODES = {408, 409, 500, 502, 503, 504, 529}
+
+# Deadline of the current question or run, as a time.monotonic() value
+_deadline: ContextVar[Optional[float]] = ContextVar("doc_check_deadline", default=None)
+_retry_counter: ContextVar[Optional["RetryCounter"]] = ContextVar("doc_check_retry_counter", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request would start or continue past the current deadline."""
+
+
+class RetryCounter:
+    """Number of retries made while it is active, see count_retries()."""
+
+    def __init__(self):
+        self.count = 0
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]):
+    """Apply a deadline (a time.monotonic() value, or None) to requests made in the body.
+
+    Nested scopes keep the earliest deadline. Context variables don't flow into
+    worker threads, so each thread sets its own scope.
+    """
+    current = _deadline.get()
+    if deadline is None or (current is not None and current < deadline):
+        deadline = current
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, None if there is none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextmanager
+def count_retries():
+    """Count the retries of the requests made in the body."""
+    counter = RetryCounter()
+    token = _retry_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _retry_counter.reset(token)
+
+
+def record_retry() -> None:
+    """Count a retry in the active counter, if any."""
+    counter = _retry_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of an SDK, requests or httpx error, None if it has none."""
+    response = getattr(error, "response", None)
+    return getattr(error, "status_code", None) or getattr(response, "status_code", None)
+
+
+class RetryPolicy:
+    """How many times, and how long to wait before, a failed request is retried."""
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 initial_backoff: float = DEFAULT_INITIAL_BACKOFF, max_backoff: float = DEFAULT_MAX_BACKOFF):
+        """Initialize the policy.
+
+        Args:
+            max_retries: Retries of a request after a transient failure.
+            request_timeout: Timeout of each request in seconds.
+            initial_backoff: Upper bound of the first wait in seconds, doubled on every retry.
+            max_backoff: Upper bound of any wait in seconds.
+        """
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Wait before retry number attempt (0-based): full jitter, at least retry_after."""
+        delay = random.uniform(0, min(self.max_backoff, self.initial_backoff * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def timeout(self) -> float:
+        """Timeout for the next request, capped by the current deadline.
+
+        Raises:
+            DeadlineExceeded: If the deadline has already passed
+        """
+        remaining = remaining_time()
+        if remaining is None:
+            return self.request_timeout
+        if remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded")
+        return min(self.request_timeout, remaining)
+
+    def fits_deadline(self, delay: float) -> bool:
+        """Whether there is time left to wait delay seconds and retry."""
+        remaining = remaining_time()
+        return remaining is None or delay < remaining
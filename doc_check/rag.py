@@ -1,57 +1,248 @@
-"""RAG (Retrieval-Augmented Generation) functionality for document indexing and retrieval."""
+"""RAG (Retrieval-Augmented Generation) functionality for document indexing and retrieval.
 
+numpy, faiss and sentence-transformers (which pulls in torch) are imported when
+first needed rather than with this module, so importing doc_check stays fast
+for runs that don't use RAG. The BM25 retriever needs neither faiss nor torch.
+
+An index is cached on disk as a directory holding the chunked text once, the
+start/end offsets of the chunks, their embeddings and the faiss index (or the
+BM25 index, or both, depending on the retriever). Loading
+it memory-maps the arrays and the index, and chunks are views slicing the
+shared text, so a cached index opens without unpickling or copying the corpus.
+
+Several documents can be indexed as one corpus (see doc_check.corpus): each is
+chunked on its own, so no chunk spans two documents, and every chunk records
+the source of the document it comes from.
+"""
+
+import json
+import os
 import re
 import hashlib
+import shutil
+from bisect import bisect_right
+from collections.abc import Sequence
 from pathlib import Path
 from typing import List, Tuple, Optional
-import pickle
+import threading
+
+from .ann import INDEX_TYPES, apply_search_params, build_index, search
+from .bm25 import BM25Index
+from .cache import EmbeddingCache
+from .chunking import DEFAULT_CHUNK_TOKENS, TokenCounter, count_tokens, enclosing_section, markdown_chunks, parse_sections
+from .context import DEFAULT_CONTEXT_TOKENS, MMR_CANDIDATE_FACTOR, mmr, pack_context
+from .corpus import combine_documents, document_element
+
+# Sentence-transformers model used for embeddings
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Retrievers: keyword (BM25), embedding similarity, or both fused by reciprocal rank
+RETRIEVERS = ("bm25", "dense", "hybrid")
+
+# Reciprocal rank fusion constant: higher values flatten the advantage of top ranks
+RRF_K = 60
+
+# Candidates taken from each retriever before fusing their rankings
+HYBRID_CANDIDATES = 50
+
+# Embedding models loaded in this process, and the locks serializing their loading, by name
+_embedding_models = {}
+_embedding_model_locks = {}
+_embedding_model_locks_lock = threading.Lock()
+
+
+def load_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Return the embedding model, loading it on first use and sharing it afterwards.
+    
+    Callers block while another thread (such as the warm-up) is loading it.
+    """
+    with _embedding_model_locks_lock:
+        lock = _embedding_model_locks.setdefault(model_name, threading.Lock())
+    with lock:
+        model = _embedding_models.get(model_name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+            # Encode once so the tokenizer and encoder are initialized before the first real query
+            model.encode(["warm up"], convert_to_numpy=True)
+            _embedding_models[model_name] = model
+        return model
+
+
+def warm_up_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL) -> threading.Thread:
+    """Start loading the embedding model in a background thread.
+    
+    Loading torch and the model takes seconds; starting early lets that overlap with
+    document loading and summarization.
+    """
+    def load():
+        try:
+            load_embedding_model(model_name)
+        except Exception:
+            # Raised again, and reported, when the model is actually needed
+            pass
+    
+    thread = threading.Thread(target=load, name="doc-check-embedding-warm-up", daemon=True)
+    thread.start()
+    return thread
+
 
-import numpy as np
-from sentence_transformers import SentenceTransformer
-import faiss
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = RRF_K) -> List[int]:
+    """Merge rankings of ids, scoring each id by the sum of 1 / (k + rank) over the rankings containing it.
+    
+    Returns:
+        All ids, best first; ties keep the order of first appearance
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda item: -scores[item])
 
 
 class DocumentChunk:
-    """Represents a chunk of document content with metadata."""
+    """Represents a chunk of document content with metadata.
     
-    def __init__(self, content: str, start_pos: int, end_pos: int, chunk_id: int):
-        self.content = content
+    The content is a slice of a text that may be shared by many chunks, taken on
+    access, so chunks of a large document don't each hold a copy of their text.
+    """
+    
+    __slots__ = ("_text", "_start", "_end", "start_pos", "end_pos", "chunk_id", "heading_path", "source")
+    
+    def __init__(self, content: str, start_pos: int, end_pos: int, chunk_id: int, heading_path: str = "", source: str = ""):
+        self._text = content
+        self._start = 0
+        self._end = len(content)
         self.start_pos = start_pos
         self.end_pos = end_pos
         self.chunk_id = chunk_id
+        # Headings the chunk is under, such as "Install > Linux" (markdown chunker only)
+        self.heading_path = heading_path
+        # Document the chunk comes from, in a corpus of several documents
+        self.source = source
+    
+    @classmethod
+    def view(cls, text: str, start: int, end: int, chunk_id: int, heading_path: str = "", source: str = "") -> "DocumentChunk":
+        """Create the chunk covering text[start:end] without copying it."""
+        chunk = cls.__new__(cls)
+        chunk._text = text
+        chunk._start = chunk.start_pos = start
+        chunk._end = chunk.end_pos = end
+        chunk.chunk_id = chunk_id
+        chunk.heading_path = heading_path
+        chunk.source = source
+        return chunk
+    
+    @property
+    def content(self) -> str:
+        return self._text[self._start:self._end]
+    
+    @property
+    def content_hash(self) -> str:
+        """SHA1 of the chunk content, used to detect changed chunks between runs."""
+        return hashlib.sha1(self.content.encode('utf-8')).hexdigest()
+
+
+class ChunkViews(Sequence):
+    """The chunks of an indexed text, created from their offsets when accessed."""
+    
+    def __init__(self, text: str, offsets, heading_paths: Optional[List[str]] = None, sources: Optional[List[Tuple[int, int, str]]] = None):
+        """Initialize the views.
+        
+        Args:
+            text: The chunked text
+            offsets: Array of shape (n, 2) with the start and end offset of each chunk in text
+            heading_paths: Heading path of each chunk, if the chunker records them
+            sources: (start, end, source) span of each document, if text combines several
+        """
+        self.text = text
+        self.offsets = offsets
+        self.heading_paths = heading_paths
+        self.sources = [tuple(span) for span in sources] if sources else None
+        self._source_starts = [span[0] for span in self.sources] if self.sources else None
+    
+    def document_span(self, offset: int) -> Tuple[int, int, str]:
+        """(start, end, source) of the document containing an offset of the text."""
+        if not self.sources:
+            return 0, len(self.text), ""
+        return self.sources[max(bisect_right(self._source_starts, offset) - 1, 0)]
+    
+    def __len__(self) -> int:
+        return len(self.offsets)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        start, end = self.offsets[index]
+        heading_path = self.heading_paths[index] if self.heading_paths else ""
+        source = self.document_span(int(start))[2] if self.sources else ""
+        return DocumentChunk.view(self.text, int(start), int(end), index, heading_path, source)
 
 
 class RAGIndexer:
     """Handles document chunking, embedding, and retrieval for RAG."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", chunk_size: int = 512, chunk_overlap: int = 50):
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, chunk_size: int = 512, chunk_overlap: int = 50, embedding_cache: Optional[EmbeddingCache] = None, chunker: str = "fixed", chunk_tokens: int = DEFAULT_CHUNK_TOKENS, index_type: str = "auto", retriever: str = "dense"):
         """Initialize the RAG indexer.
         
         Args:
             model_name: Name of the sentence transformer model to use for embeddings
-            chunk_size: Size of each document chunk in characters
-            chunk_overlap: Number of characters to overlap between chunks
+            chunk_size: Size of each document chunk in characters (fixed chunker)
+            chunk_overlap: Number of characters to overlap between chunks (fixed chunker)
+            embedding_cache: Cache of chunk embeddings shared across documents and runs, if any
+            chunker: "fixed" for overlapping character windows, "markdown" to follow the document structure
+            chunk_tokens: Size of each document chunk in tokens (markdown chunker): word pieces of the embedding model, or words and punctuation marks with the bm25 retriever
+            index_type: Nearest-neighbour index, see doc_check.ann. "auto" picks one from the number of chunks
+            retriever: "dense" for embedding similarity, "bm25" for keywords (no embedding model), "hybrid" for both
         """
+        if chunker not in ("fixed", "markdown"):
+            raise ValueError(f"Unknown chunker: {chunker}")
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {index_type}")
+        if retriever not in RETRIEVERS:
+            raise ValueError(f"Unknown retriever: {retriever}")
         self.model_name = model_name
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.chunker = chunker
+        self.chunk_tokens = chunk_tokens
+        self.index_type = index_type
+        self.retriever = retriever
+        # Type and parameters of the index, see doc_check.ann.build_index
+        self.index_params = {}
+        self.embedding_cache = embedding_cache
         self.embedding_model = None
         self.index = None
         self.chunks = []
+        # Normalized chunk embeddings, one row per chunk
+        self.embeddings = None
+        self.bm25 = None
+        # Markdown sections of each document of the indexed text, parsed on first use, by document start
+        self._sections = {}
         
     def _load_embedding_model(self):
         """Lazy load the embedding model."""
         if self.embedding_model is None:
-            self.embedding_model = SentenceTransformer(self.model_name)
+            self.embedding_model = load_embedding_model(self.model_name)
     
-    def _chunk_document(self, content: str) -> List[DocumentChunk]:
-        """Split document into overlapping chunks."""
-        chunks = []
-        chunk_id = 0
-        
-        # Clean up the content - remove excessive whitespace but preserve structure
+    def _clean_content(self, content: str) -> str:
+        """Remove excessive whitespace from the document but preserve its structure."""
         content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)
-        content = content.strip()
+        return content.strip()
+    
+    def _chunk_offsets(self, content: str):
+        """Split the cleaned document into overlapping chunks.
+        
+        Returns:
+            Array of shape (n, 2) with the start and end offset of each chunk, whitespace trimmed
+        """
+        import numpy as np
+        
+        offsets = []
         
         start = 0
         while start < len(content):
@@ -79,10 +270,11 @@ class RAGIndexer:
                             if word_break > start + self.chunk_size // 2:
                                 end = word_break + 1
             
-            chunk_content = content[start:end].strip()
-            if chunk_content:  # Only add non-empty chunks
-                chunks.append(DocumentChunk(chunk_content, start, end, chunk_id))
-                chunk_id += 1
+            chunk_content = content[start:end]
+            stripped = chunk_content.strip()
+            if stripped:  # Only add non-empty chunks
+                chunk_start = start + len(chunk_content) - len(chunk_content.lstrip())
+                offsets.append((chunk_start, chunk_start + len(stripped)))
             
             # Move start position with overlap
             start = max(start + 1, end - self.chunk_overlap)
@@ -91,30 +283,72 @@ class RAGIndexer:
             if start >= end:
                 start = end
         
-        return chunks
+        return np.array(offsets, dtype=np.int64).reshape(-1, 2)
+    
+    def _token_counter(self) -> TokenCounter:
+        """Token counter sizing markdown chunks.
+        
+        Chunks that are embedded are sized in word pieces of the embedding model,
+        so that they fit its input; BM25 chunks in words and punctuation marks.
+        """
+        if self.retriever == "bm25":
+            return count_tokens
+        self._load_embedding_model()
+        tokenizer = getattr(self.embedding_model, "tokenizer", None)
+        if tokenizer is None:
+            return count_tokens
+        return lambda text: len(tokenizer.tokenize(text))
     
-    def _get_cache_path(self, doc_path: Path, content_hash: str) -> Tuple[Path, Path]:
-        """Get cache file paths for index and chunks."""
+    def _split(self, text: str) -> ChunkViews:
+        """Chunk the cleaned document with the configured chunker."""
+        if self.chunker == "markdown":
+            import numpy as np
+            
+            chunks = markdown_chunks(text, self.chunk_tokens, self._token_counter())
+            offsets = np.array([(start, end) for start, end, _ in chunks], dtype=np.int64).reshape(-1, 2)
+            return ChunkViews(text, offsets, [heading_path for _, _, heading_path in chunks])
+        return ChunkViews(text, self._chunk_offsets(text))
+    
+    def _get_cache_path(self, doc_path: Path, content_hash: str) -> Path:
+        """Get the cache directory of the index."""
         cache_dir = doc_path.parent / ".doc_check_cache"
         cache_dir.mkdir(exist_ok=True)
         
-        base_name = f"{doc_path.name}.{content_hash}.{self.model_name.replace('/', '_')}.{self.chunk_size}.{self.chunk_overlap}"
-        index_path = cache_dir / f"{base_name}.index"
-        chunks_path = cache_dir / f"{base_name}.chunks"
-        
-        return index_path, chunks_path
+        if self.chunker == "markdown":
+            chunking = f"markdown.{self.chunk_tokens}"
+        else:
+            chunking = f"{self.chunk_size}.{self.chunk_overlap}"
+        if self.retriever == "bm25":
+            retrieval = "bm25"
+        elif self.retriever == "hybrid":
+            retrieval = f"hybrid.{self.index_type}"
+        else:
+            retrieval = self.index_type
+        base_name = f"{doc_path.name}.{content_hash}.{self.model_name.replace('/', '_')}.{chunking}.{retrieval}"
+        return cache_dir / f"{base_name}.rag"
     
-    def _load_from_cache(self, index_path: Path, chunks_path: Path) -> bool:
-        """Load index and chunks from cache if available."""
+    def _load_from_cache(self, cache_path: Path) -> bool:
+        """Load index and chunks from cache if available, memory-mapping the arrays and the index."""
         try:
-            if index_path.exists() and chunks_path.exists():
-                # Load FAISS index
-                self.index = faiss.read_index(str(index_path))
-                
-                # Load chunks
-                with open(chunks_path, 'rb') as f:
-                    self.chunks = pickle.load(f)
+            if cache_path.is_dir():
+                import numpy as np
                 
+                with open(cache_path / "text.txt", 'r', encoding='utf-8', newline='') as f:
+                    text = f.read()
+                offsets = np.load(cache_path / "offsets.npy", mmap_mode='r')
+                if self.retriever != "bm25":
+                    self.embeddings = np.load(cache_path / "embeddings.npy", mmap_mode='r')
+                    self.index = self._read_index(cache_path / "index.faiss")
+                    self.index_params = json.loads((cache_path / "index.json").read_text(encoding='utf-8'))
+                    apply_search_params(self.index, self.index_params)
+                if self.retriever != "dense":
+                    self.bm25 = BM25Index.load(cache_path)
+                heading_paths = sources = None
+                if (cache_path / "headings.json").exists():
+                    heading_paths = json.loads((cache_path / "headings.json").read_text(encoding='utf-8'))
+                if (cache_path / "sources.json").exists():
+                    sources = json.loads((cache_path / "sources.json").read_text(encoding='utf-8'))
+                self.chunks = ChunkViews(text, offsets, heading_paths, sources)
                 return True
         except Exception:
             # If loading fails, we'll rebuild
@@ -122,18 +356,43 @@ class RAGIndexer:
         
         return False
     
-    def _save_to_cache(self, index_path: Path, chunks_path: Path):
-        """Save index and chunks to cache."""
+    @staticmethod
+    def _read_index(index_path: Path):
+        """Read a faiss index, memory-mapped when faiss supports it for the index type."""
+        import faiss
+        
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        try:
+            return faiss.read_index(str(index_path), mmap_flag | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            return faiss.read_index(str(index_path))
+    
+    def _save_to_cache(self, cache_path: Path):
+        """Save index and chunks to cache, replacing the directory atomically."""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
         try:
-            # Save FAISS index
-            faiss.write_index(self.index, str(index_path))
+            import numpy as np
             
-            # Save chunks
-            with open(chunks_path, 'wb') as f:
-                pickle.dump(self.chunks, f)
+            tmp_path.mkdir(exist_ok=True)
+            with open(tmp_path / "text.txt", 'w', encoding='utf-8', newline='') as f:
+                f.write(self.chunks.text)
+            np.save(tmp_path / "offsets.npy", np.asarray(self.chunks.offsets))
+            if self.index is not None:
+                import faiss
+                
+                np.save(tmp_path / "embeddings.npy", np.asarray(self.embeddings))
+                faiss.write_index(self.index, str(tmp_path / "index.faiss"))
+                (tmp_path / "index.json").write_text(json.dumps(self.index_params), encoding='utf-8')
+            if self.bm25 is not None:
+                self.bm25.save(tmp_path)
+            if self.chunks.heading_paths is not None:
+                (tmp_path / "headings.json").write_text(json.dumps(self.chunks.heading_paths), encoding='utf-8')
+            if self.chunks.sources is not None:
+                (tmp_path / "sources.json").write_text(json.dumps(self.chunks.sources), encoding='utf-8')
+            os.replace(tmp_path, cache_path)
         except Exception:
-            # If saving fails, just continue without caching
-            pass
+            # If saving fails (or another process saved it first), just continue without caching
+            shutil.rmtree(tmp_path, ignore_errors=True)
     
     def index_document(self, content: str, doc_path: Path) -> None:
         """Index a document for retrieval.
@@ -144,35 +403,109 @@ class RAGIndexer:
         """
         # Calculate content hash for caching
         content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
-        index_path, chunks_path = self._get_cache_path(doc_path, content_hash)
+        cache_path = self._get_cache_path(doc_path, content_hash)
         
         # Try to load from cache first
-        if self._load_from_cache(index_path, chunks_path):
+        if self._load_from_cache(cache_path):
             return
         
-        # Load embedding model
-        self._load_embedding_model()
-        
         # Chunk the document
-        self.chunks = self._chunk_document(content)
+        self.chunks = self._split(self._clean_content(content))
+        self._build_index()
         
+        # Save to cache
+        self._save_to_cache(cache_path)
+    
+    def index_documents(self, documents: List[Tuple[str, str]], doc_path: Path) -> None:
+        """Index several documents as one corpus for retrieval.
+        
+        The documents are combined with doc_check.corpus.combine_documents, and
+        each is chunked separately. The index is cached under the hashes of the
+        documents and their sources, so it is reused as long as none of them changed.
+        
+        Args:
+            documents: (source, content) of each document
+            doc_path: Path naming the corpus (used for caching), such as its configuration file
+        """
+        member_hashes = [
+            hashlib.sha1(f"{source}\0{content}".encode('utf-8')).hexdigest() for source, content in documents
+        ]
+        content_hash = hashlib.sha1("".join(member_hashes).encode('utf-8')).hexdigest()
+        cache_path = self._get_cache_path(doc_path, content_hash)
+        
+        if self._load_from_cache(cache_path):
+            return
+        
+        self.chunks = self._split_documents(documents)
+        self._build_index()
+        self._save_to_cache(cache_path)
+    
+    def _split_documents(self, documents: List[Tuple[str, str]]) -> ChunkViews:
+        """Combine the cleaned documents into one text and chunk each of them."""
+        import numpy as np
+        
+        cleaned = [(source, self._clean_content(content)) for source, content in documents]
+        text, spans = combine_documents(cleaned)
+        offsets = []
+        heading_paths = []
+        for (start, _, _), (_, content) in zip(spans, cleaned):
+            views = self._split(content)
+            offsets.append(np.asarray(views.offsets) + start)
+            heading_paths.extend(views.heading_paths or [])
+        return ChunkViews(
+            text,
+            np.concatenate(offsets).reshape(-1, 2),
+            heading_paths if self.chunker == "markdown" else None,
+            spans
+        )
+    
+    def _build_index(self) -> None:
+        """Build the retrieval indexes of the chunks."""
         if not self.chunks:
             raise ValueError("No valid chunks created from document")
         
-        # Create embeddings for all chunks
-        chunk_texts = [chunk.content for chunk in self.chunks]
-        embeddings = self.embedding_model.encode(chunk_texts, convert_to_numpy=True)
+        texts = [chunk.content for chunk in self.chunks]
+        if self.retriever != "dense":
+            self.bm25 = BM25Index.build(texts)
+        
+        if self.retriever != "bm25":
+            import faiss
+            
+            # Create embeddings for all chunks
+            embeddings = self._embed_chunks(texts)
+            
+            # Normalize embeddings for cosine similarity
+            faiss.normalize_L2(embeddings)
+            self.embeddings = embeddings
+            
+            # Create FAISS index (inner product, for cosine similarity)
+            self.index, self.index_params = build_index(embeddings, self.index_type)
+    
+    def _embed_chunks(self, texts: List[str]):
+        """Embed chunk texts, reusing the embeddings of chunks found in the embedding cache.
+        
+        Returns:
+            float32 array with one row per text
+        """
+        import numpy as np
         
-        # Create FAISS index
-        dimension = embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
+        if self.embedding_cache is None:
+            self._load_embedding_model()
+            return self.embedding_model.encode(texts, convert_to_numpy=True).astype(np.float32)
         
-        # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(embeddings)
-        self.index.add(embeddings.astype(np.float32))
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        cached = self.embedding_cache.get_many(keys)
         
-        # Save to cache
-        self._save_to_cache(index_path, chunks_path)
+        # Only encode chunks seen for the first time, each distinct one once
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            self._load_embedding_model()
+            encoded = self.embedding_model.encode(list(missing.values()), convert_to_numpy=True).astype(np.float32)
+            new = {key: row.tobytes() for key, row in zip(missing, encoded)}
+            self.embedding_cache.put_many(new)
+            cached.update(new)
+        
+        return np.stack([np.frombuffer(cached[key], dtype=np.float32) for key in keys])
     
     def retrieve_relevant_chunks(self, query: str, top_k: int = 5) -> List[DocumentChunk]:
         """Retrieve the most relevant chunks for a query.
@@ -184,55 +517,148 @@ class RAGIndexer:
         Returns:
             List of most relevant document chunks
         """
-        if self.index is None or not self.chunks:
+        return self.retrieve_relevant_chunks_batch([query], top_k)[0]
+    
+    def retrieve_relevant_chunks_batch(self, queries: List[str], top_k: int = 5, mmr_lambda: Optional[float] = None) -> List[List[DocumentChunk]]:
+        """Retrieve the most relevant chunks for many queries at once.
+        
+        All queries are embedded in a single batch and searched with a single
+        index lookup, which is much faster than one call per query. The hybrid
+        retriever fuses the dense and BM25 rankings by reciprocal rank.
+        
+        Args:
+            queries: The queries to search for
+            top_k: Number of top chunks to retrieve for each query
+            mmr_lambda: If set, pick the top_k chunks among more candidates by maximal marginal
+                relevance with this relevance weight (0 to 1). Needs embeddings, so the bm25 retriever ignores it.
+            
+        Returns:
+            The most relevant document chunks of each query, in the order of queries
+        """
+        if (self.index is None and self.bm25 is None) or not self.chunks:
             raise ValueError("Document must be indexed before retrieval")
+        if not queries:
+            return []
+        
+        use_mmr = mmr_lambda is not None and self.retriever != "bm25"
+        candidates = top_k * MMR_CANDIDATE_FACTOR if use_mmr else top_k
+        if self.retriever == "hybrid":
+            candidates = max(candidates, HYBRID_CANDIDATES)
+        
+        query_embeddings = None
+        rankings = []
+        if self.retriever != "bm25":
+            query_embeddings = self._encode_queries(queries)
+            rankings.append(self._dense_search(query_embeddings, candidates))
+        if self.retriever != "dense":
+            rankings.append(self.bm25.search(queries, candidates))
+        
+        if len(rankings) == 1:
+            ids = rankings[0]
+        else:
+            ids = [reciprocal_rank_fusion(list(query_rankings)) for query_rankings in zip(*rankings)]
+        
+        if use_mmr:
+            ids = [
+                [row[i] for i in mmr(query, self.embeddings[row], top_k, mmr_lambda)] if row else []
+                for query, row in zip(query_embeddings, ids)
+            ]
+        return [[self.chunks[idx] for idx in row[:top_k]] for row in ids]
+    
+    def _encode_queries(self, queries: List[str]):
+        """Normalized embeddings of the queries, encoded in one batch."""
+        import faiss
+        import numpy as np
         
         # Load embedding model if not already loaded
         self._load_embedding_model()
         
-        # Encode the query
-        query_embedding = self.embedding_model.encode([query], convert_to_numpy=True)
-        faiss.normalize_L2(query_embedding)
-        
+        query_embeddings = self.embedding_model.encode(list(queries), convert_to_numpy=True).astype(np.float32)
+        faiss.normalize_L2(query_embeddings)
+        return query_embeddings
+    
+    def _dense_search(self, query_embeddings, top_k: int) -> List[List[int]]:
+        """Ids of the chunks most similar to each query embedding, best first."""
         # Search for similar chunks
-        scores, indices = self.index.search(query_embedding.astype(np.float32), top_k)
+        scores, indices = search(self.index, self.index_params, query_embeddings, top_k, self.embeddings)
         
-        # Return the relevant chunks
-        relevant_chunks = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.chunks):  # Valid index
-                chunk = self.chunks[idx]
-                relevant_chunks.append(chunk)
+        # Skip the -1 padding of queries with fewer hits
+        return [[int(idx) for idx in row if 0 <= idx < len(self.chunks)] for row in indices]
+    
+    def get_context_for_question(self, question: str, max_context_tokens: int = DEFAULT_CONTEXT_TOKENS, top_k: int = 5, mmr_lambda: Optional[float] = None) -> str:
+        """Get relevant context for a question, within a token budget.
         
-        return relevant_chunks
+        Args:
+            question: The question to find context for
+            max_context_tokens: Token budget of the context
+            top_k: Number of chunks to retrieve
+            mmr_lambda: Relevance weight of MMR diversification, None to rank by relevance only
+            
+        Returns:
+            The relevant chunks packed into a context
+        """
+        context, _ = self.get_context_with_chunks(question, max_context_tokens, top_k, mmr_lambda)
+        return context
     
-    def get_context_for_question(self, question: str, max_context_length: int = 4000) -> str:
-        """Get relevant context for a question, respecting length limits.
+    def get_context_with_chunks(self, question: str, max_context_tokens: int = DEFAULT_CONTEXT_TOKENS, top_k: int = 5, mmr_lambda: Optional[float] = None) -> Tuple[str, List[DocumentChunk]]:
+        """Get relevant context for a question together with the chunks it was built from.
         
         Args:
             question: The question to find context for
-            max_context_length: Maximum length of context to return
+            max_context_tokens: Token budget of the context
+            top_k: Number of chunks to retrieve
+            mmr_lambda: Relevance weight of MMR diversification, None to rank by relevance only
             
         Returns:
-            Concatenated relevant chunks as context
+            Tuple of the context and the chunks included in it
+        """
+        return self.get_contexts_with_chunks([question], max_context_tokens, top_k, mmr_lambda)[0]
+    
+    def get_contexts_with_chunks(self, questions: List[str], max_context_tokens: int = DEFAULT_CONTEXT_TOKENS, top_k: int = 5, mmr_lambda: Optional[float] = None) -> List[Tuple[str, List[DocumentChunk]]]:
+        """Get the context of many questions with a single batched retrieval.
+        
+        The chunks of each question are packed by doc_check.context.pack_context:
+        overlapping and adjacent chunks are merged into passages in document order.
+        
+        Args:
+            questions: The questions to find context for
+            max_context_tokens: Token budget of each context
+            top_k: Number of chunks to retrieve for each question
+            mmr_lambda: Relevance weight of MMR diversification, None to rank by relevance only
+            
+        Returns:
+            The context and its chunks for each question, in the order of questions
+        """
+        return [
+            pack_context(relevant_chunks, max_context_tokens)
+            for relevant_chunks in self.retrieve_relevant_chunks_batch(questions, top_k, mmr_lambda)
+        ]
+    
+    def get_section_context(self, chunk: DocumentChunk, max_tokens: int) -> str:
+        """The document section containing a chunk, within a token budget.
+        
+        The largest enclosing section (with its subsections) that fits the budget
+        is returned. Of a section too large on its own, the chunk and as much of
+        the start of the section as fits are returned.
+        
+        In a corpus of several documents, the section never extends beyond the
+        document of the chunk, and is labelled with its source.
+        
+        Args:
+            chunk: A chunk of the indexed document
+            max_tokens: Token budget of the context
         """
-        # Retrieve relevant chunks
-        relevant_chunks = self.retrieve_relevant_chunks(question, top_k=10)
-        
-        # Build context string, respecting length limit
-        context_parts = []
-        current_length = 0
-        
-        for chunk in relevant_chunks:
-            chunk_text = chunk.content
-            if current_length + len(chunk_text) + 2 <= max_context_length:  # +2 for separator
-                context_parts.append(chunk_text)
-                current_length += len(chunk_text) + 2
-            else:
-                # Try to fit a partial chunk
-                remaining_space = max_context_length - current_length - 2
-                if remaining_space > 100:  # Only add if we have reasonable space
-                    context_parts.append(chunk_text[:remaining_space] + "...")
-                break
-        
-        return "\n\n".join(context_parts)
+        text = self.chunks.text
+        document_start, document_end, source = self.chunks.document_span(chunk.start_pos)
+        if document_start not in self._sections:
+            self._sections[document_start] = parse_sections(text[document_start:document_end])
+        sections = self._sections[document_start]
+        if not sections:
+            return document_element(source, chunk.content) if source else chunk.content
+        start, end = enclosing_section(sections, chunk.start_pos - document_start, max_tokens)
+        start, end = start + document_start, end + document_start
+        if count_tokens(text[start:end]) <= max_tokens:
+            return document_element(source, text[start:end]) if source else text[start:end]
+        section = DocumentChunk.view(text, start, end, chunk.chunk_id, source=source)
+        own = DocumentChunk.view(text, chunk.start_pos, chunk.end_pos, chunk.chunk_id, source=source)
+        return pack_context([own, section], max_tokens)[0]
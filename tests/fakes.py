@@ -0,0 +1,157 @@
+"""Fake providers, SDK clients and configurations shared by the tests."""
+
+import asyncio
+import random
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from doc_check.core import DocumentChecker
+from doc_check.models import ApiUsage
+
+
+def raw_response_api(create, headers=None):
+    """Expose a fake SDK create() as the with_raw_response API the providers call.
+
+    The providers read rate limit headers, so they call
+    client.<api>.with_raw_response.create() and parse() the result.
+    """
+    def raw_create(**kwargs):
+        response = create(**kwargs)
+        return SimpleNamespace(headers=dict(headers or {}), parse=lambda: response)
+
+    return SimpleNamespace(create=raw_create)
+
+
+class FakeProvider:
+    """Provider stand-in recording what it is asked.
+
+    Questions are answered with "answer to <question>" and every answer passes,
+    unless answer and evaluation functions say otherwise. Every call is accounted
+    in api_usage as 10 input and 5 output tokens costing $0.001.
+    """
+
+    def __init__(self, answer=None, evaluation=None, summary=None, delay=None):
+        """Initialize the fake.
+
+        Args:
+            answer: Function of the document content and question returning the answer
+            evaluation: Function of the question and answer returning (passed, explanation)
+            summary: Function of the summarization prompt returning the summary
+            delay: (min, max) seconds each call takes, so that concurrent calls overlap
+        """
+        self.api_usage = ApiUsage(provider="fake", model="fake-model")
+        self.answer = answer or (lambda document_content, question: f"answer to {question}")
+        self.evaluation = evaluation or (lambda question, answer: (True, f"evaluated {question}"))
+        self.summary = summary or (lambda prompt: f"summary {len(self.prompts)}")
+        self.delay = delay
+        self.asked = []
+        self.contents = []
+        self.evaluated = []
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _finish(self):
+        with self._lock:
+            self.active -= 1
+        self.api_usage.add_call(10, 5, 0.001)
+
+    def _call(self):
+        self._start()
+        if self.delay:
+            time.sleep(random.uniform(*self.delay))
+        self._finish()
+
+    def _answer(self, document_content, question):
+        self.asked.append(question)
+        self.contents.append(document_content)
+        return self.answer(document_content, question)
+
+    def _evaluate(self, question, answer):
+        self.evaluated.append(question)
+        return self.evaluation(question, answer)
+
+    def _summarize(self, prompt):
+        self.prompts.append(prompt)
+        return self.summary(prompt)
+
+    def ask(self, document_content, question):
+        self._call()
+        return self._answer(document_content, question)
+
+    def evaluate(self, question, answer, evaluation_criteria):
+        self._call()
+        return self._evaluate(question, answer)
+
+    def summarize(self, prompt):
+        self._call()
+        return self._summarize(prompt)
+
+
+class AsyncFakeProvider(FakeProvider):
+    """Async variant of FakeProvider, whose delays don't block the event loop."""
+
+    async def _call_async(self):
+        self._start()
+        if self.delay:
+            await asyncio.sleep(random.uniform(*self.delay))
+        self._finish()
+
+    async def ask(self, document_content, question):
+        await self._call_async()
+        return self._answer(document_content, question)
+
+    async def evaluate(self, question, answer, evaluation_criteria):
+        await self._call_async()
+        return self._evaluate(question, answer)
+
+    async def summarize(self, prompt):
+        await self._call_async()
+        return self._summarize(prompt)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def make_checker(monkeypatch, provider=None, summarizer=None, **kwargs) -> DocumentChecker:
+    """A DocumentChecker using fake providers, with usage tracked by the main one.
+
+    Args:
+        provider: Main provider, a FakeProvider by default
+        summarizer: Summarizer provider, if the test summarizes
+        kwargs: Settings of the checker
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    checker = DocumentChecker(**kwargs)
+    checker.main_provider = provider or FakeProvider()
+    checker.api_usage = checker.main_provider.api_usage
+    if summarizer is not None:
+        checker.summarizer_provider = summarizer
+    return checker
+
+
+def use_async_provider(monkeypatch, checker, provider) -> None:
+    """Make check_document_async use an async fake for every provider it creates."""
+    checker.api_usage = provider.api_usage
+    monkeypatch.setattr(checker, "_create_provider", lambda *args, **kwargs: provider)
+
+
+def write_config(directory: Path, questions: int = 1, document: str = "# Doc\n\nSome content.") -> Path:
+    """Write doc.md and a config.yaml asking questions q0, q1... ("question 0", "criteria 0"...) about it."""
+    (directory / "doc.md").write_text(document)
+    items = "\n".join(
+        f"  - name: q{i}\n    question: question {i}\n    answerEvaluation: criteria {i}"
+        for i in range(questions)
+    )
+    config = directory / "config.yaml"
+    config.write_text(f"file: doc.md\nquestions:\n{items}\n")
+    return config
@@ -0,0 +1,92 @@
+"""Tests for the approximate nearest-neighbour index options."""
+
+import pytest
+
+from doc_check import ann
+
+
+def normalized_vectors(count, dimension=32, seed=0):
+    import faiss
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((20, dimension)).astype(np.float32)
+    vectors = centres[rng.integers(0, 20, count)] + 0.3 * rng.standard_normal((count, dimension)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def test_auto_selects_by_chunk_count():
+    assert ann.select_index_type(ann.AUTO_FLAT_MAX_CHUNKS) == "flat"
+    assert ann.select_index_type(ann.AUTO_FLAT_MAX_CHUNKS + 1) == "hnsw"
+    assert ann.select_index_type(ann.AUTO_HNSW_MAX_CHUNKS + 1) == "ivf-pq"
+    assert ann.index_params("auto", 10, 384) == {"type": "flat"}
+
+
+def test_ivf_pq_params_fit_the_corpus():
+    params = ann.index_params("ivf-pq", 1_000_000, 384)
+    assert params["nlist"] == 4000
+    assert 384 % params["pq_m"] == 0 and params["pq_bits"] == 8
+
+    # Too few vectors to train 256 centroids per sub-quantizer
+    small = ann.index_params("ivf-pq", 2000, 100)
+    assert 100 % small["pq_m"] == 0
+    assert 2 ** small["pq_bits"] * ann.MIN_POINTS_PER_CENTROID <= 2000
+    assert small["nlist"] * ann.MIN_POINTS_PER_CENTROID <= 2000
+
+    with pytest.raises(ValueError):
+        ann.index_params("annoy", 10, 384)
+
+
+@pytest.mark.parametrize("index_type", ["hnsw", "ivf-flat", "ivf-pq"])
+def test_approximate_indexes_find_the_exact_neighbours(index_type):
+    import numpy as np
+
+    vectors = normalized_vectors(5000)
+    queries = vectors[:50]
+    exact, _ = ann.build_index(vectors, "flat")
+    index, params = ann.build_index(vectors, index_type)
+
+    _, expected = exact.search(queries, 10)
+    _, found = ann.search(index, params, queries, 10, vectors)
+
+    assert params["type"] == index_type
+    recall = np.mean([len(set(f) & set(e)) / 10 for f, e in zip(found, expected)])
+    # A small corpus trains few, coarse PQ codes; the exact re-scoring makes up for much of it
+    assert recall >= (0.6 if index_type == "ivf-pq" else 0.9)
+    # Each query vector is its own nearest neighbour
+    assert (found[:, 0] == np.arange(50)).mean() >= 0.9
+
+
+def test_index_type_and_search_params_survive_the_cache(monkeypatch, tmp_path):
+    import sys
+    from types import ModuleType
+
+    import faiss
+
+    from doc_check import rag
+
+    vectors = normalized_vectors(3000, dimension=16)
+    model = ModuleType("sentence_transformers")
+    model.SentenceTransformer = lambda name: type("Model", (), {
+        "encode": lambda self, texts, convert_to_numpy=True: vectors[:len(texts)]
+    })()
+    monkeypatch.setitem(sys.modules, "sentence_transformers", model)
+    monkeypatch.setattr(rag, "_embedding_models", {})
+    document = "\n\n".join(f"Paragraph {i}." for i in range(3000))
+
+    built = rag.RAGIndexer(chunk_size=20, chunk_overlap=0, index_type="ivf-flat")
+    built.index_document(document, tmp_path / "doc.md")
+    loaded = rag.RAGIndexer(chunk_size=20, chunk_overlap=0, index_type="ivf-flat")
+    loaded.index_document(document, tmp_path / "doc.md")
+
+    assert len(built.chunks) == 3000
+    assert loaded.index_params == built.index_params
+    assert faiss.extract_index_ivf(loaded.index).nprobe == built.index_params["nprobe"] > 1
+    # Another index type doesn't reuse the cached index
+    flat = rag.RAGIndexer(chunk_size=20, chunk_overlap=0, index_type="flat")
+    flat.index_document(document, tmp_path / "doc.md")
+    assert flat.index_params == {"type": "flat"}
+
+    with pytest.raises(ValueError):
+        rag.RAGIndexer(index_type="annoy")
@@ -0,0 +1,54 @@
+"""Tests for the asyncio provider layer and async check API."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from doc_check.providers import AsyncOllamaProvider
+
+from .fakes import AsyncFakeProvider, make_checker, use_async_provider, write_config
+
+
+def test_check_document_async_keeps_order_and_concurrency(monkeypatch, tmp_path):
+    config = write_config(tmp_path, questions=20)
+    checker = make_checker(monkeypatch, concurrency=5)
+    fake = AsyncFakeProvider(delay=(0.01, 0.01))
+    use_async_provider(monkeypatch, checker, fake)
+
+    result = asyncio.run(checker.check_document_async(config))
+
+    assert [r.name for r in result.results] == [f"q{i}" for i in range(20)]
+    assert result.passed_questions == 20
+    assert result.api_usage.api_calls == 40
+    assert 1 < fake.max_active <= 5
+    assert fake.closed
+
+
+def test_async_ollama_provider_tracks_usage():
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "response": "RESULT: PASS\nEXPLANATION: Looks good",
+            "prompt_eval_count": 12,
+            "eval_count": 3,
+        })
+
+    async def run():
+        provider = AsyncOllamaProvider(model="llama3.2")
+        provider.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return provider, await provider.evaluate("q", "a", "c")
+        finally:
+            await provider.aclose()
+
+    provider, (passed, explanation) = asyncio.run(run())
+
+    assert passed is True
+    assert explanation == "Looks good"
+    assert requests_seen[0]["model"] == "llama3.2"
+    assert provider.api_usage.input_tokens == 12
+    assert provider.api_usage.api_calls == 1
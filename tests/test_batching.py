@@ -0,0 +1,229 @@
+"""Tests for batched question answering and evaluation."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from doc_check.providers import AnthropicProvider, OllamaProvider, OpenAIProvider
+from doc_check.providers.base import BATCH_EVALUATION_SCHEMA
+
+from .fakes import FakeProvider, make_checker, raw_response_api, write_config
+
+
+class FakeCompletions:
+    """Stand-in for the OpenAI chat completions API returning a fixed reply."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []
+        self.with_raw_response = raw_response_api(self.create)
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=100, total_tokens=1100),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply))]
+        )
+
+
+def openai_provider(reply):
+    provider = OpenAIProvider(api_key="test-key", model="gpt-4.1")
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(reply)))
+    return provider
+
+
+def test_ask_many_sends_document_once_and_parses_answers():
+    reply = '```json\n{"install": "Run pip install.", "usage": "Run doc-check."}\n```'
+    provider = openai_provider(reply)
+
+    answers = provider.ask_many("DOCUMENT BODY", {"install": "How to install?", "usage": "How to use?"})
+
+    assert answers == {"install": "Run pip install.", "usage": "Run doc-check."}
+    prompt = provider.client.chat.completions.requests[0]["messages"][1]["content"]
+    assert prompt.count("DOCUMENT BODY") == 1
+    assert prompt.index("DOCUMENT BODY") < prompt.index("How to install?")
+    assert provider.api_usage.api_calls == 1
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ('{"install": "Run pip install.", "usage": ""}', {"install": "Run pip install."}),
+    ('{"install": "Run pip install.", "other": "Unrelated"}', {"install": "Run pip install."}),
+    ('{"answers": {"usage": "Run doc-check."}}', {"usage": "Run doc-check."}),
+    ('{"install": ["not", "a", "string"]}', {}),
+    ('I could not answer these questions.', {}),
+])
+def test_ask_many_drops_missing_and_malformed_answers(reply, expected):
+    provider = openai_provider(reply)
+
+    answers = provider.ask_many("DOCUMENT BODY", {"install": "How to install?", "usage": "How to use?"})
+
+    assert answers == expected
+
+
+class BatchingProvider(FakeProvider):
+    """Provider stand-in whose batched replies leave out every third question."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def ask_many(self, document_content, questions):
+        self.batches.append(list(questions))
+        self.api_usage.add_call(100, 10, 0.0)
+        return {name: f"batched answer to {question}" for name, question in questions.items()
+                if not name.endswith(("0", "3", "6"))}
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    return write_config(tmp_path, questions=10)
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_batched_answers_with_per_question_fallback(monkeypatch, config_file, concurrency):
+    checker = make_checker(monkeypatch, BatchingProvider(), batch_size=4, concurrency=concurrency)
+
+    result = checker.check_document(config_file)
+
+    assert checker.main_provider.batches == [["q0", "q1", "q2", "q3"], ["q4", "q5", "q6", "q7"], ["q8", "q9"]]
+    assert sorted(checker.main_provider.asked) == ["question 0", "question 3", "question 6"]
+    assert [r.name for r in result.results] == [f"q{i}" for i in range(10)]
+    assert result.results[1].answer == "batched answer to question 1"
+    assert result.results[3].answer == "answer to question 3"
+    # 3 batches + 3 individual asks + 10 evaluations
+    assert result.api_usage.api_calls == 16
+
+
+def test_batching_is_not_used_with_rag(monkeypatch):
+    checker = make_checker(monkeypatch, BatchingProvider(), batch_size=4, use_rag=True)
+    questions = [SimpleNamespace(name=f"q{i}", question=f"question {i}") for i in range(4)]
+
+    assert checker._batch_answers(questions, "document") == {}
+    assert checker.main_provider.batches == []
+
+
+ITEMS = {
+    "install": ("How to install?", "Run pip install.", "Mentions pip"),
+    "usage": ("How to use?", "Run it.", "Mentions doc-check"),
+}
+
+
+def test_evaluate_many_uses_strict_schema_when_supported():
+    reply = json.dumps({"evaluations": [
+        {"id": "install", "result": "PASS", "explanation": "Mentions pip."},
+        {"id": "usage", "result": "FAIL", "explanation": "Does not mention doc-check."},
+    ]})
+    provider = openai_provider(reply)
+
+    evaluations = provider.evaluate_many(ITEMS)
+
+    assert evaluations == {"install": (True, "Mentions pip."), "usage": (False, "Does not mention doc-check.")}
+    request = provider.client.chat.completions.requests[0]
+    assert request["response_format"]["json_schema"]["strict"] is True
+    assert "Run pip install." in request["messages"][1]["content"]
+
+
+def test_evaluate_many_without_structured_outputs_relies_on_prompt():
+    provider = openai_provider('{"evaluations": []}')
+    provider.model = "gpt-4"
+
+    provider.evaluate_many(ITEMS)
+
+    assert "response_format" not in provider.client.chat.completions.requests[0]
+
+
+@pytest.mark.parametrize("evaluations, expected", [
+    ([{"id": "install", "result": "MAYBE", "explanation": "Unsure."}], {}),
+    ([{"id": "install", "result": "PASS"}], {}),
+    ([{"id": "unknown", "result": "PASS", "explanation": "Fine."}], {}),
+    ([{"id": "install", "result": "PASS", "explanation": "Fine."},
+      {"id": "install", "result": "FAIL", "explanation": "Not fine."}], {}),
+    (["not an object", {"id": "usage", "result": "fail", "explanation": "No."}], {"usage": (False, "No.")}),
+])
+def test_evaluate_many_drops_items_not_matching_schema(evaluations, expected):
+    provider = openai_provider(json.dumps({"evaluations": evaluations}))
+
+    assert provider.evaluate_many(ITEMS) == expected
+
+
+class JudgingProvider(FakeProvider):
+    """Provider stand-in whose batched evaluations leave out odd questions."""
+
+    def __init__(self):
+        super().__init__()
+        self.evaluation_batches = []
+
+    def evaluate_many(self, items):
+        self.evaluation_batches.append(list(items))
+        self.api_usage.add_call(100, 10, 0.0)
+        return {name: (True, f"batch evaluated {name}") for name in items if int(name[1:]) % 2 == 0}
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_batched_evaluations_retry_unparsed_items_alone(monkeypatch, config_file, concurrency):
+    checker = make_checker(monkeypatch, JudgingProvider(), evaluation_batch_size=5, concurrency=concurrency)
+
+    result = checker.check_document(config_file)
+
+    assert checker.main_provider.evaluation_batches == [["q0", "q1", "q2", "q3", "q4"], ["q5", "q6", "q7", "q8", "q9"]]
+    assert sorted(checker.main_provider.evaluated) == [f"question {i}" for i in (1, 3, 5, 7, 9)]
+    assert [r.name for r in result.results] == [f"q{i}" for i in range(10)]
+    assert result.results[0].evaluation_result == "batch evaluated q0"
+    assert result.results[1].evaluation_result == "evaluated question 1"
+    # 10 asks + 2 evaluation batches + 5 individual evaluations
+    assert result.api_usage.api_calls == 17
+
+
+class FakeMessages:
+    """Stand-in for the Anthropic messages API calling any forced tool with a fixed input."""
+
+    def __init__(self, tool_input):
+        self.tool_input = tool_input
+        self.requests = []
+        self.with_raw_response = raw_response_api(self.create)
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        if "tools" in kwargs:
+            content = [SimpleNamespace(type="tool_use", name=kwargs["tool_choice"]["name"], input=self.tool_input)]
+        else:
+            content = [SimpleNamespace(type="text", text="RESULT: FAIL\nEXPLANATION: evaluated alone")]
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=100, output_tokens=10), content=content)
+
+
+def test_anthropic_batched_evaluations_call_a_tool_and_fall_back_for_missing_items(monkeypatch, config_file):
+    messages = FakeMessages({"evaluations": [{"id": "q0", "result": "PASS", "explanation": "batch evaluated"}]})
+    provider = AnthropicProvider(api_key="test-key")
+    provider.client = SimpleNamespace(messages=messages)
+    checker = make_checker(monkeypatch, provider, evaluation_batch_size=10)
+
+    result = checker.check_document(config_file)
+
+    batches = [request for request in messages.requests if "tools" in request]
+    assert len(batches) == 1
+    assert batches[0]["tools"][0]["input_schema"] == BATCH_EVALUATION_SCHEMA
+    assert batches[0]["tool_choice"] == {"type": "tool", "name": batches[0]["tools"][0]["name"]}
+    assert [r.evaluation_result for r in result.results] == ["batch evaluated"] + ["evaluated alone"] * 9
+    assert result.passed_questions == 1
+
+
+def test_ollama_batched_evaluations_use_the_schema_and_fall_back_on_malformed_replies(monkeypatch, config_file):
+    payloads = []
+
+    def post(url, json, timeout):
+        payloads.append(json)
+        reply = "RESULT: FAIL\nEXPLANATION: evaluated alone"
+        if "format" in json:
+            # A reply cut short by the output limit
+            reply = '{"evaluations": [{"id": "q0", "result": "PA'
+        return SimpleNamespace(headers={}, raise_for_status=lambda: None, json=lambda: {"response": reply})
+
+    monkeypatch.setattr(requests, "post", post)
+    checker = make_checker(monkeypatch, OllamaProvider(), evaluation_batch_size=10)
+
+    result = checker.check_document(config_file)
+
+    assert [payload["format"] for payload in payloads if "format" in payload] == [BATCH_EVALUATION_SCHEMA]
+    assert [r.evaluation_result for r in result.results] == ["evaluated alone"] * 10
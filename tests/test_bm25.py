@@ -0,0 +1,93 @@
+"""Tests for BM25 and hybrid retrieval."""
+
+import sys
+
+from doc_check import rag
+from doc_check.bm25 import BM25Index, tokenize
+
+CHUNKS = [
+    "Set --rag-top-k to change how many chunks are retrieved.",
+    "Install the package with pip and set your API key.",
+    "The cache directory defaults to the XDG cache home.",
+    "Chunks are retrieved by similarity to the question.",
+]
+
+
+def test_identifiers_are_kept_whole_and_split():
+    assert tokenize("Use --rag-top-k or rag_top_k") == [
+        "use", "rag-top-k", "rag", "top", "k", "or", "rag_top_k", "rag", "top", "k"
+    ]
+
+
+def test_search_ranks_exact_identifiers_first():
+    index = BM25Index.build(CHUNKS)
+
+    results = index.search(["What does --rag-top-k do?", "how do I install it", "unrelated words"], top_k=2)
+
+    assert results[0][0] == 0
+    assert results[1][0] == 1
+    assert results[2] == []
+
+
+def test_index_round_trips_through_files(tmp_path):
+    index = BM25Index.build(CHUNKS)
+    index.save(tmp_path)
+
+    loaded = BM25Index.load(tmp_path)
+
+    queries = ["cache directory", "retrieved chunks", "--rag-top-k"]
+    assert loaded.search(queries, top_k=4) == index.search(queries, top_k=4)
+
+
+def test_reciprocal_rank_fusion_favours_ids_ranked_by_both():
+    assert rag.reciprocal_rank_fusion([[1, 2, 3], [3, 4, 1]]) == [1, 3, 2, 4]
+
+
+def test_bm25_retriever_needs_no_embedding_model_or_faiss(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+    monkeypatch.setitem(sys.modules, "faiss", None)
+    document = "\n\n".join(CHUNKS)
+
+    built = rag.RAGIndexer(chunk_size=60, chunk_overlap=0, retriever="bm25")
+    built.index_document(document, tmp_path / "doc.md")
+    loaded = rag.RAGIndexer(chunk_size=60, chunk_overlap=0, retriever="bm25")
+    loaded.index_document(document, tmp_path / "doc.md")
+
+    assert loaded.bm25 is not None and loaded.index is None
+    assert loaded.retrieve_relevant_chunks("What is --rag-top-k?", top_k=1)[0].content == CHUNKS[0]
+
+
+def test_hybrid_retriever_fuses_dense_and_keyword_rankings(monkeypatch, tmp_path):
+    import numpy as np
+    from types import ModuleType
+
+    class Model:
+        # Dense similarity matches the question with the chunk about similarity, and not the one with the flag
+        def encode(self, texts, convert_to_numpy=True):
+            def vector(text):
+                if text.startswith("Which") or "similarity" in text:
+                    return [1.0, 0.0]
+                return [-1.0, 0.0] if "--rag-top-k" in text else [0.0, 1.0]
+            return np.array([vector(text) for text in texts], dtype=np.float32)
+
+    module = ModuleType("sentence_transformers")
+    module.SentenceTransformer = lambda name: Model()
+    monkeypatch.setitem(sys.modules, "sentence_transformers", module)
+    monkeypatch.setattr(rag, "_embedding_models", {})
+    document = "\n\n".join(CHUNKS)
+
+    dense = rag.RAGIndexer(chunk_size=60, chunk_overlap=0)
+    dense.index_document(document, tmp_path / "doc.md")
+    hybrid = rag.RAGIndexer(chunk_size=60, chunk_overlap=0, retriever="hybrid")
+    hybrid.index_document(document, tmp_path / "doc.md")
+    cached = rag.RAGIndexer(chunk_size=60, chunk_overlap=0, retriever="hybrid")
+    cached.index_document(document, tmp_path / "doc.md")
+
+    question = "Which chunks are retrieved with --rag-top-k?"
+    dense_ranking = [c.content for c in dense.retrieve_relevant_chunks(question, top_k=4)]
+    assert dense_ranking[0] == CHUNKS[3] and dense_ranking[-1] == CHUNKS[0]
+    assert {c.content for c in hybrid.retrieve_relevant_chunks(question, top_k=2)} == {CHUNKS[0], CHUNKS[3]}
+    assert cached.bm25 is not None and cached.index is not None
+    assert [c.content for c in cached.retrieve_relevant_chunks(question, top_k=4)] == [
+        c.content for c in hybrid.retrieve_relevant_chunks(question, top_k=4)
+    ]
@@ -0,0 +1,117 @@
+"""Tests for the persistent on-disk caches."""
+
+from types import SimpleNamespace
+
+from click.testing import CliRunner
+
+from doc_check.cache import ResponseCache, SummaryCache, default_cache_dir
+from doc_check.cli import cli
+from doc_check.providers import OpenAIProvider
+
+from .fakes import FakeProvider, make_checker, raw_response_api
+
+
+def test_default_cache_dir_follows_xdg(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == tmp_path / "doc-check"
+
+
+def test_key_depends_on_every_request_field():
+    base = ResponseCache.make_key("openai", "gpt-4.1", "system", "prompt", 0.1)
+    assert base == ResponseCache.make_key("openai", "gpt-4.1", "system", "prompt", 0.1)
+    assert base != ResponseCache.make_key("anthropic", "gpt-4.1", "system", "prompt", 0.1)
+    assert base != ResponseCache.make_key("openai", "gpt-4o", "system", "prompt", 0.1)
+    assert base != ResponseCache.make_key("openai", "gpt-4.1", "other", "prompt", 0.1)
+    assert base != ResponseCache.make_key("openai", "gpt-4.1", "system", "other", 0.1)
+    assert base != ResponseCache.make_key("openai", "gpt-4.1", "system", "prompt", 0.2)
+
+
+def test_responses_persist_between_instances(tmp_path):
+    ResponseCache(tmp_path).put_response("key", "response")
+    assert ResponseCache(tmp_path).get_response("key") == "response"
+    assert ResponseCache(tmp_path).get_response("missing") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path, max_size_mb=3000 / (1024 * 1024))
+    cache.put_response("a", "x" * 1000)
+    cache.put_response("b", "x" * 1000)
+    cache.get_response("a")  # "b" is now the least recently used
+    cache.put_response("c", "x" * 1500)
+
+    assert cache.get_response("b") is None
+    assert cache.get_response("a") is not None
+    assert cache.get_response("c") is not None
+    assert cache.stats()["size_bytes"] <= 3000
+
+
+def test_provider_serves_repeated_requests_from_cache(tmp_path):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15, prompt_tokens_details=None)
+        message = SimpleNamespace(content="cached answer")
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message)])
+
+    def provider():
+        p = OpenAIProvider(api_key="test-key", response_cache=ResponseCache(tmp_path))
+        p.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create, with_raw_response=raw_response_api(create))))
+        return p
+
+    first = provider()
+    assert first.ask("document", "question") == "cached answer"
+
+    second = provider()
+    assert second.ask("document", "question") == "cached answer"
+    assert second.ask("document", "another question") == "cached answer"
+
+    assert len(calls) == 2
+    assert second.api_usage.api_calls == 1
+    assert second.api_usage.cached_responses == 1
+
+
+def test_summary_key_depends_on_content_level_model_and_prompt():
+    base = SummaryCache.make_key("hash", "medium", "model", "v1")
+    assert base == SummaryCache.make_key("hash", "medium", "model", "v1")
+    assert base != SummaryCache.make_key("other", "medium", "model", "v1")
+    assert base != SummaryCache.make_key("hash", "light", "model", "v1")
+    assert base != SummaryCache.make_key("hash", "medium", "other", "v1")
+    assert base != SummaryCache.make_key("hash", "medium", "model", "v2")
+
+
+def test_summaries_are_shared_by_content_not_path(monkeypatch, tmp_path):
+    checker = make_checker(monkeypatch, summarizer=FakeProvider(), summarize="medium", cache_dir=tmp_path / "cache")
+
+    first = checker.summarize_document("# Doc\n\nContent", tmp_path / "a" / "doc.md")
+    again = checker.summarize_document("# Doc\n\nContent", tmp_path / "b" / "copy.md")
+    light = checker.summarize_document("# Doc\n\nContent", tmp_path / "a" / "doc.md", level="light")
+
+    assert first == again == "summary 1"
+    assert light == "summary 2"
+    # Nothing is written next to the document
+    assert not (tmp_path / "a").exists()
+    assert SummaryCache(tmp_path / "cache").stats()["entries"] == 2
+
+
+def test_cache_command_reports_and_cleans_up_caches(tmp_path):
+    ResponseCache(tmp_path).put_response("key", "x" * 2048)
+    SummaryCache(tmp_path).put_summary("key", "summary")
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["cache", "stats", "--cache-dir", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "responses" in result.output and "summaries" in result.output and "embeddings" in result.output
+
+    result = runner.invoke(cli, ["cache", "gc", "--cache-dir", str(tmp_path), "--cache-max-size", "0"])
+    assert result.exit_code == 0
+    assert ResponseCache(tmp_path).stats()["entries"] == 0
+
+    SummaryCache(tmp_path).put_summary("key", "summary")
+    result = runner.invoke(cli, ["cache", "clear", "--cache-dir", str(tmp_path)], input="n\n")
+    assert result.exit_code != 0
+    assert SummaryCache(tmp_path).stats()["entries"] == 1
+
+    result = runner.invoke(cli, ["cache", "clear", "--cache-dir", str(tmp_path), "--yes"])
+    assert result.exit_code == 0
+    assert SummaryCache(tmp_path).stats()["entries"] == 0
@@ -0,0 +1,131 @@
+"""Tests for the markdown-aware chunker."""
+
+from doc_check.chunking import count_tokens, enclosing_section, heading_parts, markdown_chunks, parse_sections
+
+DOCUMENT = """Intro paragraph.
+
+# Install
+
+Some text about install.
+
+## Linux
+
+```bash
+apt install foo
+
+apt install bar
+```
+
+| OS | Command |
+|----|---------|
+| Debian | apt |
+
+## macOS
+
+brew install foo
+
+# Usage
+
+Run it.
+"""
+
+
+def chunk_texts(text, max_tokens):
+    return [(text[start:end], heading_path) for start, end, heading_path in markdown_chunks(text, max_tokens)]
+
+
+def test_sections_are_grouped_under_their_heading_path():
+    chunks = chunk_texts(DOCUMENT, 200)
+
+    assert [heading_path for _, heading_path in chunks] == ["", "Install", "Usage"]
+    assert chunks[1][0].startswith("# Install") and chunks[1][0].endswith("brew install foo")
+    assert chunks[2][0] == "# Usage\n\nRun it."
+
+
+def test_small_budget_splits_between_blocks_and_keeps_code_and_tables_whole():
+    chunks = chunk_texts(DOCUMENT, 12)
+
+    # Headings stay with the block that follows them
+    assert ("## Linux\n\n```bash\napt install foo\n\napt install bar\n```", "Install > Linux") in chunks
+    assert ("| OS | Command |\n|----|---------|\n| Debian | apt |", "Install > Linux") in chunks
+    assert ("## macOS\n\nbrew install foo", "Install > macOS") in chunks
+
+
+def test_long_paragraphs_are_split_by_tokens():
+    text = "# Title\n\n" + "word " * 250
+
+    chunks = chunk_texts(text, 100)
+
+    assert len(chunks) == 3
+    # The heading goes with the first piece, on top of the budget
+    assert all(count_tokens(chunk) <= 100 + count_tokens("# Title") for chunk, _ in chunks)
+    assert "".join(chunk for chunk, _ in chunks).replace(" ", "") == text.replace(" ", "").rstrip()
+
+
+def test_chunks_are_sized_with_the_token_counter():
+    text = "# Title\n\n" + "word " * 100
+
+    # Two word pieces per word, as a tokenizer splitting every word would count
+    chunks = markdown_chunks(text, 20, count=lambda text: 2 * count_tokens(text))
+
+    assert len(chunks) == 10
+    assert [count_tokens(text[start:end]) for start, end, _ in chunks[1:]] == [10] * 9
+
+
+def test_chunks_do_not_overlap():
+    spans = [(start, end) for start, end, _ in markdown_chunks(DOCUMENT * 5, 30)]
+
+    assert all(end <= next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+
+
+def test_enclosing_section_grows_up_the_hierarchy_while_it_fits():
+    sections = parse_sections(DOCUMENT)
+    offset = DOCUMENT.index("apt install bar")
+
+    def section(max_tokens):
+        start, end = enclosing_section(sections, offset, max_tokens)
+        return DOCUMENT[start:end]
+
+    assert section(1000).startswith("# Install") and section(1000).endswith("brew install foo")
+    # Too small for "Install": its "Linux" subsection, or that section alone when nothing fits
+    assert section(30).startswith("## Linux") and section(30).endswith("| Debian | apt |")
+    assert section(1) == section(30)
+
+
+def test_heading_parts_split_at_the_shallowest_headings_that_fit():
+    text = "Intro\n\n# A\n\nOne two\n\n## A1\n\nThree\n\n# B\n\nFour five six\n"
+
+    def parts(max_tokens):
+        return [text[start:end] for start, end in heading_parts(text, max_tokens)]
+
+    assert parts(100) == [text]
+    assert parts(8) == ["Intro\n\n", "# A\n\nOne two\n\n## A1\n\nThree\n\n", "# B\n\nFour five six\n"]
+    # Too small for any section: split between blocks, keeping headings with the block after them
+    assert parts(3) == ["Intro\n\n", "# A\n\nOne two\n\n", "## A1\n\nThree\n\n", "# B\n\nFour five six\n"]
+
+
+def test_heading_parts_split_oversized_paragraphs_between_lines_and_words():
+    text = "Intro\n\n# A\n\n" + "one two three\n" * 4 + " ".join(["word"] * 10) + "\n\n# B\n\nend\n"
+
+    parts = [text[start:end] for start, end in heading_parts(text, 6)]
+
+    assert "".join(parts) == text
+    assert parts == [
+        "Intro\n\n",
+        # The heading stays with the first lines after it, on top of the budget
+        "# A\n\none two three\none two three\n",
+        "one two three\none two three\n",
+        # A line larger than the budget is split between words
+        "word word word word word word ",
+        "word word word word\n\n",
+        "# B\n\nend\n",
+    ]
+
+
+def test_heading_parts_split_paragraphs_larger_than_the_budget():
+    text = "# A\n\n" + " ".join(["word"] * 500) + "\n\n# B\n\nshort\n"
+
+    parts = heading_parts(text, 100)
+
+    assert len(parts) == 6
+    assert "".join(text[start:end] for start, end in parts) == text
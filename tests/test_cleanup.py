@@ -0,0 +1,50 @@
+"""Tests for the markdown cleanup of --summarize cleanup."""
+
+from doc_check.cleanup import cleanup_document
+
+
+def test_html_is_converted_to_markdown():
+    document = (
+        "<html><head><title>T</title><style>p {}</style><script>if (a < b) {}</script></head>\n<body>\n"
+        "<h1>Title</h1>\n"
+        "<p>Some <strong>bold</strong>, <em>italic</em> and <code>code</code> text &amp; a "
+        "<a href=\"https://example.com/?a=1&amp;b=2\">link</a>.</p>\n"
+        "<!-- comment -->\n<img src=\"d.png\" alt=\"Diagram\"><br>\n</body></html>"
+    )
+
+    assert cleanup_document(document) == (
+        "# Title\nSome **bold**, *italic* and `code` text & a [link](https://example.com/?a=1&b=2).\n\n![Diagram](d.png)"
+    )
+
+
+def test_tables_and_lists():
+    document = (
+        "<table>\n<tr><th>Name</th><th>Type</th></tr>\n<tr><td>x</td><td>int</td></tr>\n</table>\n"
+        "<ul>\n<li>One</li>\n<li>Two</li>\n</ul>"
+    )
+
+    assert cleanup_document(document) == "| Name | Type\n\n| x | int\n\n- One\n- Two"
+
+
+def test_markdown_code_is_kept_exactly():
+    document = "Keep   `a  <b>  b`   and\n\n\n\n```\n  <i>indented</i>   \n\n\n\n```\n\nWow!!! Really???   Wait....."
+
+    assert cleanup_document(document) == (
+        "Keep `a  <b>  b` and\n\n```\n  <i>indented</i>   \n\n\n\n```\n\nWow! Really? Wait..."
+    )
+
+
+def test_pre_blocks_become_code_blocks_with_their_indentation():
+    document = "Text\n\n<pre><code class=\"py\">def f():\n    <span>return</span> 1 &lt; 2</code></pre>\n\nMore"
+
+    assert cleanup_document(document) == "Text\n\n```\ndef f():\n    return 1 < 2\n```\n\nMore"
+
+
+def test_unclosed_elements_are_dropped_not_converted():
+    assert cleanup_document("<li>unclosed item\n<b>unclosed bold") == "unclosed item\nunclosed bold"
+
+
+def test_tags_starting_like_bold_or_italic_are_not_converted():
+    document = "<body>\nA<br>B <b>bold</b> <img src=\"x.png\"> <i>italic</i>\n</body>"
+
+    assert cleanup_document(document) == "A\nB **bold** ![](x.png) *italic*"
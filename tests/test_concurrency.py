@@ -0,0 +1,41 @@
+"""Tests for concurrent question processing."""
+
+import pytest
+
+from .fakes import FakeProvider, make_checker, write_config
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Write a config with many questions and its document."""
+    return write_config(tmp_path, questions=40)
+
+
+def concurrent_checker(monkeypatch, concurrency):
+    """Checker whose calls take a random time, passing the answers to questions ending in 0."""
+    provider = FakeProvider(evaluation=lambda question, answer: (answer.endswith("0"), f"evaluated {question}"),
+                            delay=(0.001, 0.02))
+    return make_checker(monkeypatch, provider, concurrency=concurrency)
+
+
+@pytest.mark.parametrize("concurrency", [1, 8])
+def test_results_keep_config_order(monkeypatch, config_file, concurrency):
+    checker = concurrent_checker(monkeypatch, concurrency)
+
+    result = checker.check_document(config_file)
+
+    assert [r.name for r in result.results] == [f"q{i}" for i in range(40)]
+    assert [r.answer for r in result.results] == [f"answer to question {i}" for i in range(40)]
+    assert result.passed_questions == 4
+
+
+def test_usage_is_accounted_for_every_call(monkeypatch, config_file):
+    checker = concurrent_checker(monkeypatch, 8)
+
+    result = checker.check_document(config_file)
+
+    assert result.api_usage.api_calls == 80
+    assert result.api_usage.input_tokens == 800
+    assert result.api_usage.total_tokens == 1200
+    assert result.api_usage.estimated_cost == pytest.approx(0.08)
+    assert checker.main_provider.max_active > 1
@@ -0,0 +1,54 @@
+"""Tests for RAG context packing."""
+
+import numpy as np
+
+from doc_check.chunking import count_tokens
+from doc_check.context import mmr, pack_context
+from doc_check.rag import ChunkViews, DocumentChunk
+
+TEXT = "Alpha beta gamma. Delta epsilon zeta.\n\nEta theta iota. Kappa lambda mu.\n\nNu xi omicron. Pi rho sigma."
+
+
+def views(*spans):
+    return ChunkViews(TEXT, np.array(spans, dtype=np.int64))
+
+
+def span(text):
+    start = TEXT.index(text)
+    return start, start + len(text)
+
+
+def test_overlapping_and_adjacent_chunks_merge_in_document_order():
+    chunks = views(
+        span("Nu xi omicron."),
+        span("Delta epsilon zeta.\n\nEta theta"),
+        span("Alpha beta gamma. Delta epsilon"),
+        span("Eta theta iota."),
+    )
+
+    context, used = pack_context(chunks, max_tokens=100)
+
+    assert context == "Alpha beta gamma. Delta epsilon zeta.\n\nEta theta iota.\n\nNu xi omicron."
+    # Shared text is counted once
+    assert count_tokens(context) == 16
+    assert [c.chunk_id for c in used] == [0, 1, 2, 3]
+
+
+def test_budget_is_spent_best_chunk_first_and_the_last_chunk_truncated():
+    chunks = views(span("Nu xi omicron. Pi rho sigma."), span("Alpha beta gamma. Delta epsilon zeta."))
+
+    context, used = pack_context(chunks, max_tokens=8)
+
+    assert context == "Nu xi omicron. Pi rho sigma."
+    assert [c.chunk_id for c in used] == [0]
+
+    context, used = pack_context([DocumentChunk("word " * 100, 0, 500, 0)], max_tokens=40)
+    assert context == "word " * 39 + "word..."
+
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 0.0], dtype=np.float32)
+    candidates = np.array([[1.0, 0.0], [0.99, 0.14], [0.8, -0.6]], dtype=np.float32)
+
+    assert mmr(query, candidates, 2, relevance_weight=1.0) == [0, 1]
+    assert mmr(query, candidates, 2, relevance_weight=0.3) == [0, 2]
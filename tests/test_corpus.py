@@ -0,0 +1,112 @@
+"""Tests for configurations checking several documents as one corpus."""
+
+import sys
+import threading
+
+import pytest
+
+from doc_check import rag
+from doc_check.context import pack_context
+from doc_check.corpus import combine_documents, expand_files
+
+from .fakes import make_checker
+
+INSTALL = "# Install\n\nInstall the package with pip.\n\n## Linux\n\nUse the --user flag on Linux."
+USAGE = "# Usage\n\nRun doc-check with a configuration file.\n\n## Linux\n\nSet --rag-top-k to retrieve more chunks."
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    (tmp_path / "docs" / "guide").mkdir(parents=True)
+    (tmp_path / "docs" / "install.md").write_text(INSTALL)
+    (tmp_path / "docs" / "guide" / "usage.md").write_text(USAGE)
+    (tmp_path / "docs" / "notes.txt").write_text("Not markdown.")
+    return tmp_path
+
+
+def test_files_and_patterns_expand_in_order_without_duplicates(docs_dir):
+    files = ["https://example.com/doc.md", "docs/**/*.md", "docs/install.md"]
+
+    assert expand_files(docs_dir, files) == ["https://example.com/doc.md", "docs/guide/usage.md", "docs/install.md"]
+    assert expand_files(docs_dir, "docs/notes.txt") == ["docs/notes.txt"]
+    with pytest.raises(ValueError, match="No documents match docs/\\*.rst"):
+        expand_files(docs_dir, ["docs/*.rst"])
+
+
+def test_combined_documents_are_labelled_and_their_spans_recorded():
+    text, spans = combine_documents([("install.md", INSTALL), ("usage.md", USAGE)])
+
+    assert text.startswith('<document source="install.md">\n# Install')
+    assert [(text[start:end], source) for start, end, source in spans] == [(INSTALL, "install.md"), (USAGE, "usage.md")]
+
+
+def index_corpus(monkeypatch, tmp_path, documents, **kwargs):
+    monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+    monkeypatch.setitem(sys.modules, "faiss", None)
+    indexer = rag.RAGIndexer(retriever="bm25", **kwargs)
+    indexer.index_documents(documents, tmp_path / "config.yaml")
+    return indexer
+
+
+def test_corpus_chunks_record_their_source_and_never_span_documents(monkeypatch, tmp_path):
+    documents = [("install.md", INSTALL), ("usage.md", USAGE)]
+
+    built = index_corpus(monkeypatch, tmp_path, documents, chunker="markdown", chunk_tokens=12)
+    loaded = index_corpus(monkeypatch, tmp_path, documents, chunker="markdown", chunk_tokens=12)
+
+    assert loaded.bm25 is not None
+    for indexer in (built, loaded):
+        assert {chunk.source for chunk in indexer.chunks} == {"install.md", "usage.md"}
+        for chunk in indexer.chunks:
+            assert chunk.content in dict(documents)[chunk.source]
+        assert indexer.chunks[0].heading_path == "Install"
+    best = loaded.retrieve_relevant_chunks("What does --rag-top-k do?", top_k=1)[0]
+    assert best.source == "usage.md" and best.heading_path == "Usage > Linux"
+
+
+def test_corpus_index_is_cached_by_the_content_of_its_documents(monkeypatch, tmp_path):
+    index_corpus(monkeypatch, tmp_path, [("install.md", INSTALL), ("usage.md", USAGE)])
+    index_corpus(monkeypatch, tmp_path, [("install.md", INSTALL), ("usage.md", USAGE)])
+    assert len(list((tmp_path / ".doc_check_cache").glob("config.yaml.*.rag"))) == 1
+
+    index_corpus(monkeypatch, tmp_path, [("install.md", INSTALL), ("usage.md", USAGE + "\n\nMore.")])
+    assert len(list((tmp_path / ".doc_check_cache").glob("config.yaml.*.rag"))) == 2
+
+
+def test_context_groups_passages_by_document(monkeypatch, tmp_path):
+    indexer = index_corpus(monkeypatch, tmp_path, [("install.md", INSTALL), ("usage.md", USAGE)], chunker="markdown", chunk_tokens=12)
+    chunks = {(chunk.source, chunk.heading_path): chunk for chunk in indexer.chunks}
+    usage, install = chunks["usage.md", "Usage > Linux"], chunks["install.md", "Install"]
+
+    context, _ = pack_context([usage, install], max_tokens=200)
+
+    assert context == (
+        f'<document source="usage.md">\n{usage.content}\n</document>\n\n'
+        f'<document source="install.md">\n{install.content}\n</document>'
+    )
+
+
+def test_section_context_stays_within_the_document_of_the_chunk(monkeypatch, tmp_path):
+    indexer = index_corpus(monkeypatch, tmp_path, [("install.md", INSTALL), ("usage.md", USAGE)], chunker="markdown", chunk_tokens=12)
+    linux = next(chunk for chunk in indexer.chunks if chunk.source == "install.md" and chunk.heading_path == "Install > Linux")
+
+    assert indexer.get_section_context(linux, max_tokens=1000) == f'<document source="install.md">\n{INSTALL}\n</document>'
+
+
+def test_check_document_loads_every_document_concurrently(monkeypatch, docs_dir):
+    config = docs_dir / "config.yaml"
+    config.write_text(
+        "file:\n  - docs/install.md\n  - docs/guide/*.md\n"
+        "questions:\n  - name: q\n    question: How do I install it?\n    answerEvaluation: Mentions pip\n"
+    )
+    checker = make_checker(monkeypatch)
+    # Both documents must be loading at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    load_document = checker.load_document
+    monkeypatch.setattr(checker, "load_document", lambda path: barrier.wait() is not None and load_document(path))
+
+    result = checker.check_document(config)
+
+    assert result.passed_questions == 1
+    assert checker.main_provider.contents == [combine_documents([("docs/install.md", INSTALL), ("docs/guide/usage.md", USAGE)])[0]]
+    assert checker._doc_path == config
@@ -0,0 +1,100 @@
+"""Tests for the progressive RAG fallback."""
+
+import asyncio
+
+import pytest
+
+from doc_check.core import DocumentChecker
+from doc_check.models import Question
+from doc_check.rag import DocumentChunk
+
+from .fakes import AsyncFakeProvider, FakeProvider, make_checker
+
+QUESTION = Question(name="q", question="How do I install it?", answerEvaluation="Mentions pip")
+
+
+def marker_provider(passing_marker, provider_class=FakeProvider):
+    """Provider answering with the content it was given, passing answers that contain a marker."""
+    return provider_class(
+        answer=lambda document_content, question: f"answer from {document_content}",
+        evaluation=lambda question, answer: (passing_marker in answer, "good" if passing_marker in answer else "bad"),
+    )
+
+
+class FakeIndexer:
+    """RAG indexer stand-in with a larger context at a larger top-k, and a section around the best chunk."""
+
+    def get_context_with_chunks(self, question, max_context_tokens, top_k, mmr_lambda=None):
+        return f"top {top_k} chunks", []
+
+    def get_section_context(self, chunk, max_tokens):
+        return f"section around {chunk.content}"
+
+
+def fallback_checker(monkeypatch, passing_marker, **kwargs):
+    checker = make_checker(
+        monkeypatch, marker_provider(passing_marker), use_rag=True, rag_fallback=True, rag_top_k=5, **kwargs
+    )
+    checker.rag_indexer = FakeIndexer()
+    chunk = DocumentChunk("the best chunk", 0, 14, 0)
+    checker._precomputed_contexts[QUESTION.question] = ("the best chunk", [chunk])
+    return checker
+
+
+def test_steps_are_tried_in_order_until_one_passes(monkeypatch):
+    checker = fallback_checker(monkeypatch, "section")
+
+    result = checker._process_question(QUESTION, "the full document")
+
+    assert result.passed
+    assert checker.main_provider.contents == ["the best chunk", "top 20 chunks", "section around the best chunk"]
+    assert [(step.step, step.passed) for step in result.fallback_steps] == [("top-k", False), ("section", True)]
+    assert result.evaluation_result == "(section) good"
+    assert result.answer == "answer from section around the best chunk"
+
+
+def test_failing_ladder_keeps_the_rag_answer_and_records_every_step(monkeypatch):
+    checker = fallback_checker(monkeypatch, "nothing passes", rag_fallback_steps=["section", "full"])
+
+    result = checker._process_question(QUESTION, "the full document")
+
+    assert not result.passed
+    assert result.answer == "answer from the best chunk"
+    assert [step.step for step in result.fallback_steps] == ["section", "full"]
+    assert result.fallback_steps[1].context_tokens == 3
+
+
+def test_summary_step_summarizes_once_and_is_skipped_when_already_summarized(monkeypatch, tmp_path):
+    checker = fallback_checker(monkeypatch, "summary", rag_fallback_steps=["summary", "full"])
+    checker._doc_path = tmp_path / "doc.md"
+    levels = []
+    monkeypatch.setattr(checker, "summarize_document", lambda content, path, level=None: levels.append(level) or "summary")
+
+    results = [checker._process_question(QUESTION, "the full document") for _ in range(2)]
+
+    assert levels == ["medium"]
+    assert all(r.passed and [s.step for s in r.fallback_steps] == ["summary"] for r in results)
+
+    summarized = fallback_checker(monkeypatch, "summary", summarize="medium", rag_fallback_steps=["summary", "full"])
+    summarized._doc_path = tmp_path / "doc.md"
+    result = summarized._process_question(QUESTION, "the summarized document")
+    assert [step.step for step in result.fallback_steps] == ["full"]
+
+
+def test_async_questions_fall_back_the_same_way(monkeypatch):
+    checker = fallback_checker(monkeypatch, "full document")
+    checker.async_main_provider = marker_provider("full document", AsyncFakeProvider)
+    checker.async_main_provider.api_usage = checker.api_usage
+
+    result = asyncio.run(checker._process_question_async(QUESTION, "the full document"))
+
+    assert result.passed
+    # No document path outside of a check, so no summary step
+    assert [step.step for step in result.fallback_steps] == ["top-k", "section", "full"]
+    assert result.evaluation_result == "(full document) good"
+
+
+def test_unknown_steps_are_rejected(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    with pytest.raises(ValueError, match="Unknown fallback steps: everything"):
+        DocumentChecker(rag_fallback_steps=["top-k", "everything"])
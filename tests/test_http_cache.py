@@ -0,0 +1,159 @@
+"""Tests for the HTTP cache of URL documents, against a local HTTP server."""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from doc_check.core import DocumentChecker
+from doc_check.http_cache import HTTPCache
+
+DOCUMENT = "# Guide\n\nInstall with pip. " + "Lots of text. " * 1000
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 05 Oct 2026 10:00:00 GMT"
+
+
+class DocumentServer(ThreadingHTTPServer):
+    """Serves DOCUMENT with validators, gzip encoded when accepted, and records the requests."""
+
+    def __init__(self, use_etag=True):
+        self.use_etag = use_etag
+        self.requests = []
+        super().__init__(("127.0.0.1", 0), DocumentHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/docs/guide.md"
+
+
+class DocumentHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.path.split("?")[0] != "/docs/guide.md":
+            self.send_error(404)
+            return
+        if self.server.use_etag and self.headers.get("If-None-Match") == ETAG or (
+            not self.server.use_etag and self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        ):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = DOCUMENT.encode("utf-8")
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        if self.server.use_etag:
+            self.send_header("ETag", ETAG)
+        else:
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = DocumentServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_documents_are_served_from_the_cache_within_the_ttl(server, tmp_path):
+    cache = HTTPCache(tmp_path, ttl=3600)
+
+    first = cache.fetch(server.url)
+    second = cache.fetch(server.url)
+
+    assert first == second
+    assert first.read_text(encoding="utf-8") == DOCUMENT
+    assert len(server.requests) == 1
+    # The body was sent compressed and stored decoded
+    assert "gzip" in server.requests[0]["Accept-Encoding"]
+
+
+def test_expired_documents_are_revalidated_with_their_etag(server, tmp_path):
+    cache = HTTPCache(tmp_path, ttl=0)
+    cache.fetch(server.url)
+
+    body = cache.fetch(server.url)
+
+    assert body.read_text(encoding="utf-8") == DOCUMENT
+    assert server.requests[1]["If-None-Match"] == ETAG
+
+
+def test_last_modified_is_used_without_an_etag(tmp_path):
+    server = DocumentServer(use_etag=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        cache = HTTPCache(tmp_path, ttl=0)
+        cache.fetch(server.url)
+        cache.fetch(server.url)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert server.requests[1]["If-Modified-Since"] == LAST_MODIFIED
+    assert "If-None-Match" not in server.requests[1]
+
+
+def test_offline_mode_uses_the_cache_only(server, tmp_path):
+    HTTPCache(tmp_path).fetch(server.url)
+    offline = HTTPCache(tmp_path, ttl=0, offline=True)
+
+    assert offline.fetch(server.url).read_text(encoding="utf-8") == DOCUMENT
+    assert len(server.requests) == 1
+    with pytest.raises(ValueError, match="offline"):
+        offline.fetch(server.url + "?other")
+
+
+def test_stale_documents_are_used_when_the_server_is_down(server, tmp_path):
+    url = server.url
+    HTTPCache(tmp_path).fetch(url)
+    server.shutdown()
+    server.server_close()
+
+    assert HTTPCache(tmp_path, ttl=0).fetch(url).read_text(encoding="utf-8") == DOCUMENT
+    with pytest.raises(ValueError, match="Failed to fetch"):
+        HTTPCache(tmp_path, ttl=0).fetch(url + "?uncached")
+
+
+def test_http_errors_are_reported(server, tmp_path):
+    with pytest.raises(ValueError, match="HTTP 404"):
+        HTTPCache(tmp_path).fetch(server.url.replace("guide", "missing"))
+
+
+def test_least_recently_used_documents_are_evicted(server, tmp_path):
+    cache = HTTPCache(tmp_path, max_size_mb=1.5 * len(DOCUMENT) / (1024 * 1024))
+    cache.fetch(server.url)
+    cache.fetch(server.url + "?second")
+
+    assert cache.stats()["entries"] == 1
+    assert cache.fetch(server.url + "?second").exists()
+    assert cache.clear() == 1
+
+
+def test_documents_larger_than_the_cache_are_kept_until_the_next_fetch(server, tmp_path):
+    cache = HTTPCache(tmp_path, max_size_mb=0.5 * len(DOCUMENT) / (1024 * 1024))
+
+    assert cache.fetch(server.url).read_text() == DOCUMENT
+    assert cache.fetch(server.url + "?second").read_text() == DOCUMENT
+    assert cache.stats()["entries"] == 1
+
+
+def test_checker_loads_url_documents_through_the_cache(server, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    checker = DocumentChecker(cache_dir=tmp_path)
+
+    assert checker.load_document(server.url) == DOCUMENT
+    assert checker.load_document(server.url) == DOCUMENT
+    assert len(server.requests) == 1
+    assert checker._document_path(tmp_path / "doc-check.yaml", server.url) == tmp_path / "guide.md"
@@ -0,0 +1,90 @@
+"""Tests for incremental re-checking."""
+
+import asyncio
+
+from doc_check.rag import DocumentChunk
+
+from .fakes import AsyncFakeProvider, make_checker, use_async_provider, write_config
+
+
+class FakeIndexer:
+    """RAG indexer stand-in that maps each question to fixed chunk contents."""
+
+    def __init__(self, chunks_by_question):
+        self.chunks_by_question = chunks_by_question
+
+    def get_context_with_chunks(self, question, *args):
+        chunks = [
+            DocumentChunk(content=text, start_pos=0, end_pos=len(text), chunk_id=i)
+            for i, text in enumerate(self.chunks_by_question[question])
+        ]
+        return "\n\n".join(c.content for c in chunks), chunks
+
+    def get_contexts_with_chunks(self, questions, *args):
+        return [self.get_context_with_chunks(question) for question in questions]
+
+
+def run_check(monkeypatch, config, use_rag=False, indexer=None):
+    checker = make_checker(monkeypatch, use_rag=use_rag, rag_fallback=False, incremental=True)
+    if indexer is not None:
+        monkeypatch.setattr(checker, "_warm_up_embedding_model", lambda: None)
+        monkeypatch.setattr(checker, "_index_document", lambda *args: setattr(checker, "rag_indexer", indexer))
+    return checker, checker.check_document(config)
+
+
+def test_unchanged_document_reuses_results(monkeypatch, tmp_path):
+    config = write_config(tmp_path, questions=2)
+
+    _, first = run_check(monkeypatch, config)
+    checker, second = run_check(monkeypatch, config)
+
+    assert not any(r.reused for r in first.results)
+    assert [r.reused for r in second.results] == [True, True]
+    assert [r.answer for r in second.results] == [r.answer for r in first.results]
+    assert checker.main_provider.asked == []
+
+
+def test_changed_document_without_rag_rechecks_everything(monkeypatch, tmp_path):
+    config = write_config(tmp_path, questions=2)
+    run_check(monkeypatch, config)
+
+    write_config(tmp_path, questions=2, document="# Doc\n\nOther content.")
+    checker, result = run_check(monkeypatch, config)
+
+    assert not any(r.reused for r in result.results)
+    assert checker.main_provider.asked == ["question 0", "question 1"]
+
+
+def test_rag_rechecks_only_questions_with_changed_chunks(monkeypatch, tmp_path):
+    config = write_config(tmp_path, questions=2)
+    chunks = {"question 0": ["intro"], "question 1": ["install"]}
+    run_check(monkeypatch, config, use_rag=True, indexer=FakeIndexer(chunks))
+
+    # Edit the document in a section only question 1 depends on
+    write_config(tmp_path, questions=2, document="# Doc\n\nEdited content.")
+    chunks["question 1"] = ["install, edited"]
+    checker, result = run_check(monkeypatch, config, use_rag=True, indexer=FakeIndexer(chunks))
+
+    assert [r.name for r in result.results] == ["q0", "q1"]
+    assert [r.reused for r in result.results] == [True, False]
+    assert checker.main_provider.asked == ["question 1"]
+    # "install", ",", "edited"
+    assert result.results[1].context_tokens == 3
+
+
+def test_unchanged_document_reuses_results_in_async_mode_with_concurrency(monkeypatch, tmp_path):
+    config = write_config(tmp_path, questions=2)
+
+    def run():
+        # The OpenAI provider warms the prompt cache with the first pending question
+        checker = make_checker(monkeypatch, incremental=True, concurrency=4)
+        provider = AsyncFakeProvider()
+        use_async_provider(monkeypatch, checker, provider)
+        return provider, asyncio.run(checker.check_document_async(config))
+
+    _, first = run()
+    provider, second = run()
+
+    assert not any(r.reused for r in first.results)
+    assert [r.reused for r in second.results] == [True, True]
+    assert provider.asked == []
@@ -0,0 +1,127 @@
+"""Tests for provider request building and usage accounting."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from doc_check.providers import AnthropicProvider, OpenAIProvider
+
+from .fakes import raw_response_api
+
+
+class FakeMessages:
+    """Stand-in for the Anthropic messages API that records requests."""
+
+    def __init__(self, usage):
+        self.usage = usage
+        self.requests = []
+        self.with_raw_response = raw_response_api(self.create)
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return SimpleNamespace(
+            usage=self.usage,
+            content=[SimpleNamespace(text="the answer")]
+        )
+
+
+def anthropic_provider(usage, prompt_cache):
+    provider = AnthropicProvider(api_key="test-key", model="claude-sonnet-4-20250514", prompt_cache=prompt_cache)
+    provider.client = SimpleNamespace(messages=FakeMessages(usage))
+    return provider
+
+
+def test_anthropic_prompt_cache_puts_document_in_cached_prefix():
+    usage = SimpleNamespace(input_tokens=20, output_tokens=100,
+                            cache_read_input_tokens=0, cache_creation_input_tokens=10000)
+    provider = anthropic_provider(usage, prompt_cache=True)
+
+    assert provider.ask("DOCUMENT BODY", "How do I install it?") == "the answer"
+
+    content = provider.client.messages.requests[0]["messages"][0]["content"]
+    assert content[0]["cache_control"] == {"type": "ephemeral"}
+    assert "DOCUMENT BODY" in content[0]["text"]
+    assert "How do I install it?" not in content[0]["text"]
+    assert "How do I install it?" in content[1]["text"]
+
+
+def test_anthropic_without_prompt_cache_sends_plain_prompt():
+    usage = SimpleNamespace(input_tokens=20, output_tokens=100)
+    provider = anthropic_provider(usage, prompt_cache=False)
+
+    provider.ask("DOCUMENT BODY", "How do I install it?")
+
+    content = provider.client.messages.requests[0]["messages"][0]["content"]
+    assert isinstance(content, str)
+    assert provider.api_usage.input_tokens == 20
+    assert provider.api_usage.cached_input_tokens == 0
+
+
+def test_anthropic_cache_tokens_are_tracked_and_priced():
+    usage = SimpleNamespace(input_tokens=1000, output_tokens=1000,
+                            cache_read_input_tokens=9000, cache_creation_input_tokens=2000)
+    provider = anthropic_provider(usage, prompt_cache=True)
+
+    provider.ask("DOCUMENT BODY", "question")
+
+    assert provider.api_usage.input_tokens == 12000
+    assert provider.api_usage.cached_input_tokens == 9000
+    assert provider.api_usage.cache_creation_input_tokens == 2000
+    # 1k uncached input + 9k cache reads + 2k cache writes + 1k output at sonnet 4 prices
+    expected = 1 * 0.003 + 9 * 0.0003 + 2 * 0.00375 + 1 * 0.015
+    assert provider.api_usage.estimated_cost == pytest.approx(expected)
+
+
+class FakeCompletions:
+    """Stand-in for the OpenAI chat completions API that records requests."""
+
+    def __init__(self, usage):
+        self.usage = usage
+        self.requests = []
+        self.with_raw_response = raw_response_api(self.create)
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        message = SimpleNamespace(content="the answer")
+        return SimpleNamespace(usage=self.usage, choices=[SimpleNamespace(message=message)])
+
+
+def openai_provider(usage, model="gpt-4.1"):
+    provider = OpenAIProvider(api_key="test-key", model=model)
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(usage)))
+    return provider
+
+
+def test_openai_prompt_puts_document_before_question():
+    usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10, total_tokens=110, prompt_tokens_details=None)
+    provider = openai_provider(usage)
+
+    provider.ask("DOCUMENT BODY", "How do I install it?")
+
+    prompt = provider.client.chat.completions.requests[0]["messages"][1]["content"]
+    assert prompt.index("DOCUMENT BODY") < prompt.index("How do I install it?")
+
+
+def test_openai_cached_tokens_are_tracked_and_discounted():
+    usage = SimpleNamespace(prompt_tokens=10000, completion_tokens=1000, total_tokens=11000,
+                            prompt_tokens_details=SimpleNamespace(cached_tokens=8000))
+    provider = openai_provider(usage)
+
+    provider.ask("DOCUMENT BODY", "question")
+
+    assert provider.api_usage.input_tokens == 10000
+    assert provider.api_usage.cached_input_tokens == 8000
+    assert provider.api_usage.cache_hit_ratio == pytest.approx(80.0)
+    # 2k uncached input + 8k cached input + 1k output at gpt-4.1 prices
+    expected = 2 * 0.002 + 8 * 0.0005 + 1 * 0.008
+    assert provider.api_usage.estimated_cost == pytest.approx(expected)
+
+
+def test_openai_model_without_cached_price_pays_full_input_price():
+    usage = SimpleNamespace(prompt_tokens=10000, completion_tokens=0, total_tokens=10000,
+                            prompt_tokens_details=SimpleNamespace(cached_tokens=8000))
+    provider = openai_provider(usage, model="gpt-4")
+
+    provider.ask("DOCUMENT BODY", "question")
+
+    assert provider.api_usage.estimated_cost == pytest.approx(10 * 0.03)
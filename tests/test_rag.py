@@ -0,0 +1,243 @@
+"""Tests for RAG indexing and retrieval."""
+
+import sys
+import threading
+from types import ModuleType
+
+import pytest
+
+from doc_check import rag
+from doc_check.core import DocumentChecker
+
+from .fakes import make_checker
+
+
+class FakeSentenceTransformer:
+    """Stand-in for sentence_transformers.SentenceTransformer that counts loads."""
+
+    loaded = []
+
+    def __init__(self, model_name):
+        self.loaded.append(model_name)
+        self.encoded = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.encoded.append(list(texts))
+
+
+@pytest.fixture
+def fake_sentence_transformers(monkeypatch):
+    module = ModuleType("sentence_transformers")
+    module.SentenceTransformer = FakeSentenceTransformer
+    monkeypatch.setitem(sys.modules, "sentence_transformers", module)
+    monkeypatch.setattr(rag, "_embedding_models", {})
+    FakeSentenceTransformer.loaded = []
+    return module
+
+
+def test_embedding_model_is_loaded_once_and_warmed(fake_sentence_transformers):
+    rag.warm_up_embedding_model("fake-model").join()
+
+    indexer = rag.RAGIndexer(model_name="fake-model")
+    indexer._load_embedding_model()
+
+    assert FakeSentenceTransformer.loaded == ["fake-model"]
+    assert indexer.embedding_model.encoded == [["warm up"]]
+
+
+def test_warm_up_failures_surface_when_the_model_is_needed(monkeypatch):
+    monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+    monkeypatch.setattr(rag, "_embedding_models", {})
+
+    rag.warm_up_embedding_model("fake-model").join()
+
+    with pytest.raises(ImportError):
+        rag.RAGIndexer(model_name="fake-model")._load_embedding_model()
+
+
+def test_check_document_warms_up_before_loading_the_document(monkeypatch, tmp_path):
+    (tmp_path / "doc.md").write_text("# Doc\n\nSome content.")
+    config = tmp_path / "config.yaml"
+    config.write_text("file: doc.md\nquestions:\n  - name: q\n    question: What?\n    answerEvaluation: Something\n")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    checker = DocumentChecker(use_rag=True)
+    events = []
+    monkeypatch.setattr(rag, "warm_up_embedding_model", lambda: events.append("warm up") or threading.Thread())
+    monkeypatch.setattr(checker, "load_document", lambda path: events.append("load document") or "content")
+    monkeypatch.setattr(checker, "_index_document", lambda content, path: events.append("index"))
+    monkeypatch.setattr(checker, "_precompute_contexts", lambda questions: events.append("retrieve"))
+    monkeypatch.setattr(checker, "_run_questions", lambda questions, content: events.append("ask") or [])
+    monkeypatch.setattr(checker, "_merge_results", lambda questions, reused, results: [])
+    monkeypatch.setattr(checker, "_build_result", lambda results, start_time: None)
+
+    checker.check_document(config)
+
+    assert events == ["warm up", "load document", "index", "retrieve", "ask"]
+
+
+class FakeEncoder:
+    """Embedding model stand-in mapping each text to a fixed vector and counting batches."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.batches = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        import numpy as np
+
+        self.batches.append(list(texts))
+        return np.array([self.vectors[text] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def indexer():
+    import faiss
+    import numpy as np
+
+    vectors = {
+        "about install": [1, 0, 0], "about usage": [0, 1, 0], "about license": [0, 0, 1],
+        "how to install?": [0.9, 0.1, 0], "how to use?": [0.1, 0.9, 0], "which license?": [0, 0.2, 0.8],
+    }
+    indexer = rag.RAGIndexer()
+    indexer.embedding_model = FakeEncoder(vectors)
+    indexer.chunks = [
+        rag.DocumentChunk(text, 0, len(text), i)
+        for i, text in enumerate(["about install", "about usage", "about license"])
+    ]
+    embeddings = np.array([vectors[chunk.content] for chunk in indexer.chunks], dtype=np.float32)
+    faiss.normalize_L2(embeddings)
+    indexer.index = faiss.IndexFlatIP(3)
+    indexer.index.add(embeddings)
+    return indexer
+
+
+def test_batch_retrieval_encodes_all_questions_at_once(indexer):
+    questions = ["how to install?", "how to use?", "which license?"]
+
+    contexts = indexer.get_contexts_with_chunks(questions)
+
+    assert indexer.embedding_model.batches == [questions]
+    assert [chunks[0].content for _, chunks in contexts] == ["about install", "about usage", "about license"]
+    # Fewer chunks than top_k: the index pads its results, which must not show up as chunks
+    assert all(len(chunks) == 3 for _, chunks in contexts)
+    assert contexts[1] == indexer.get_context_with_chunks("how to use?")
+
+
+def test_index_round_trips_through_the_compact_cache(fake_sentence_transformers, monkeypatch, tmp_path):
+    import numpy as np
+
+    def encode(self, texts, convert_to_numpy=True):
+        # One dimension per distinct first word keeps the embeddings deterministic
+        return np.array([[hash(text.split()[0]) % 7 + 1, len(text), 1] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(FakeSentenceTransformer, "encode", encode)
+    document = "\n\n\n".join(f"Section {i}. " + "words " * 40 for i in range(20))
+    doc_path = tmp_path / "doc.md"
+
+    built = rag.RAGIndexer(chunk_size=200, chunk_overlap=20)
+    built.index_document(document, doc_path)
+    loaded = rag.RAGIndexer(chunk_size=200, chunk_overlap=20)
+    loaded.index_document(document, doc_path)
+
+    assert FakeSentenceTransformer.loaded == ["all-MiniLM-L6-v2"]
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert [c.content for c in loaded.chunks] == [c.content for c in built.chunks]
+    assert all(c.content == c.content.strip() and c.content for c in loaded.chunks)
+    # Chunks are views over a single copy of the text
+    assert all(c._text is loaded.chunks.text for c in loaded.chunks)
+    query = built.chunks[3].content
+    assert loaded.retrieve_relevant_chunks(query, top_k=1)[0].chunk_id == built.retrieve_relevant_chunks(query, top_k=1)[0].chunk_id
+
+
+def test_reindexing_an_edited_document_only_embeds_changed_chunks(fake_sentence_transformers, monkeypatch, tmp_path):
+    import numpy as np
+
+    from doc_check.cache import EmbeddingCache
+
+    encoded = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        encoded.append(list(texts))
+        return np.array([[len(text), text.count("e") + 1, 1] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(FakeSentenceTransformer, "encode", encode)
+    sections = [f"Section {i}. " + "words " * 40 for i in range(20)]
+    cache = EmbeddingCache(tmp_path / "cache")
+
+    first = rag.RAGIndexer(chunk_size=300, chunk_overlap=0, embedding_cache=cache)
+    first.index_document("\n\n".join(sections), tmp_path / "doc.md")
+    encoded.clear()
+
+    sections[5] = "Section 5. Edited content here."
+    second = rag.RAGIndexer(chunk_size=300, chunk_overlap=0, embedding_cache=cache)
+    second.index_document("\n\n".join(sections), tmp_path / "doc.md")
+
+    changed = [c.content for c in second.chunks if c.content not in {c.content for c in first.chunks}]
+    assert encoded == [changed]
+    assert 0 < len(changed) < len(second.chunks)
+    # Embeddings read back from the cache match freshly computed ones
+    fresh = rag.RAGIndexer(chunk_size=300, chunk_overlap=0)
+    fresh.index_document("\n\n".join(sections), tmp_path / "other.md")
+    np.testing.assert_allclose(second.embeddings, fresh.embeddings)
+
+
+def test_markdown_chunker_heading_paths_survive_the_cache(fake_sentence_transformers, monkeypatch, tmp_path):
+    import numpy as np
+
+    monkeypatch.setattr(FakeSentenceTransformer, "encode",
+                        lambda self, texts, convert_to_numpy=True: np.ones((len(texts), 3), dtype=np.float32))
+    document = "# Install\n\nRun pip.\n\n## Linux\n\n" + "Use apt. " * 100 + "\n\n# Usage\n\nRun it.\n"
+
+    built = rag.RAGIndexer(chunker="markdown", chunk_tokens=50)
+    built.index_document(document, tmp_path / "doc.md")
+    loaded = rag.RAGIndexer(chunker="markdown", chunk_tokens=50)
+    loaded.index_document(document, tmp_path / "doc.md")
+
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert [c.heading_path for c in loaded.chunks] == [c.heading_path for c in built.chunks]
+    assert loaded.chunks[0].heading_path == "Install"
+    assert loaded.chunks[-1].heading_path == "Usage"
+    assert {c.heading_path for c in loaded.chunks[1:-1]} == {"Install > Linux"}
+
+
+def test_contexts_honour_top_k(indexer):
+    contexts = indexer.get_contexts_with_chunks(["how to install?", "which license?"], top_k=1)
+
+    assert [context for context, _ in contexts] == ["about install", "about license"]
+    assert all(len(chunks) == 1 for _, chunks in contexts)
+
+
+class FakeTokenizer:
+    """Tokenizer stand-in splitting words into pieces of two characters."""
+
+    def tokenize(self, text):
+        return [word[i:i + 2] for word in text.split() for i in range(0, len(word), 2)]
+
+
+def test_markdown_chunks_fit_the_embedding_model_input(fake_sentence_transformers, monkeypatch, tmp_path):
+    import numpy as np
+
+    monkeypatch.setattr(FakeSentenceTransformer, "tokenizer", FakeTokenizer(), raising=False)
+    monkeypatch.setattr(FakeSentenceTransformer, "encode",
+                        lambda self, texts, convert_to_numpy=True: np.ones((len(texts), 3), dtype=np.float32))
+    document = "# Install\n\n" + "Configure the repository. " * 40
+
+    indexer = rag.RAGIndexer(chunker="markdown", chunk_tokens=50)
+    indexer.index_document(document, tmp_path / "doc.md")
+
+    tokenizer = FakeTokenizer()
+    # The first chunk also carries the heading, on top of the budget
+    assert all(len(tokenizer.tokenize(chunk.content)) <= 50 for chunk in indexer.chunks[1:])
+    # Counting words and punctuation marks instead would make fewer, larger chunks
+    bm25 = rag.RAGIndexer(chunker="markdown", chunk_tokens=50, retriever="bm25")
+    assert len(indexer.chunks) > len(bm25._split(document))
+
+
+@pytest.mark.parametrize("retriever, cached", [("bm25", False), ("dense", True), ("hybrid", True)])
+def test_embedding_cache_is_only_opened_for_dense_retrieval(monkeypatch, tmp_path, retriever, cached):
+    monkeypatch.setattr(rag.RAGIndexer, "index_document", lambda self, content, doc_path: None)
+    checker = make_checker(monkeypatch, use_rag=True, rag_retriever=retriever, cache_dir=tmp_path / "cache")
+
+    checker._index_document("# Doc\n\nSome content.", tmp_path / "doc.md")
+
+    assert (checker.rag_indexer.embedding_cache is not None) == cached
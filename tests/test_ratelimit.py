@@ -0,0 +1,171 @@
+"""Tests for the provider rate limiter."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from doc_check.providers import AsyncOpenAIProvider, OpenAIProvider
+from doc_check.providers.ratelimit import RateLimiter, estimate_tokens, retry_after_seconds
+from doc_check.providers.retry import DeadlineExceeded, deadline_scope
+
+from .fakes import raw_response_api
+
+
+def test_estimate_tokens_counts_prompt_parts_and_output():
+    blocks = [{"type": "text", "text": "x" * 400}, {"type": "text", "text": "y" * 400}]
+
+    assert estimate_tokens("x" * 400, output_tokens=0) == 100
+    assert estimate_tokens("s" * 40, blocks, output_tokens=50) == 10 + 200 + 50
+
+
+def test_token_budget_delays_requests_over_the_limit():
+    limiter = RateLimiter(tokens_per_minute=600)
+
+    assert limiter._reserve(600) == 0
+    # Half the budget refills in 30 seconds
+    assert limiter._reserve(300) == pytest.approx(30, abs=0.5)
+
+
+def test_token_estimate_is_corrected_with_actual_usage():
+    limiter = RateLimiter(tokens_per_minute=1000)
+
+    limiter.acquire(800)
+    limiter.release(800, actual_tokens=100)
+
+    assert limiter._reserve(850) == 0
+
+
+def test_request_budget():
+    limiter = RateLimiter(requests_per_minute=2)
+
+    assert limiter._reserve(0) == 0
+    assert limiter._reserve(0) == 0
+    assert limiter._reserve(0) == pytest.approx(30, abs=0.5)
+
+
+def test_limits_are_learned_from_headers_unless_configured():
+    limiter = RateLimiter(requests_per_minute=100)
+    limiter.acquire(10)
+
+    limiter.release(10, headers={
+        "x-ratelimit-limit-requests": "5000",
+        "x-ratelimit-remaining-requests": "99",
+        "anthropic-ratelimit-tokens-limit": "40000",
+        "anthropic-ratelimit-tokens-remaining": "100",
+    })
+
+    assert limiter.buckets["requests"].capacity == 100
+    assert limiter.buckets["requests"].level <= 99
+    assert limiter.buckets["tokens"].capacity == 40000
+    assert limiter.buckets["tokens"].level <= 100
+
+
+def test_concurrency_is_halved_on_429_and_grows_back():
+    limiter = RateLimiter()
+    for _ in range(8):
+        limiter.acquire(0)
+
+    wait = limiter.release_rate_limited({"retry-after": "0.01"})
+    assert limiter.concurrency_limit == 4
+    assert wait == pytest.approx(0.01, abs=0.01)
+
+    # Other requests of the same burst don't halve it again during the backoff
+    limiter.paused_until += 60
+    limiter.release_rate_limited({})
+    assert limiter.concurrency_limit == 4
+
+    for _ in range(6):
+        limiter.release(0)
+    assert limiter.concurrency_limit > 5
+
+
+def test_retry_after_formats():
+    assert retry_after_seconds({"retry-after-ms": "250"}) == 0.25
+    assert retry_after_seconds({"Retry-After": "3"}) == 3
+    assert retry_after_seconds({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert retry_after_seconds({}) is None
+
+
+class RateLimited(Exception):
+    """SDK-like error for a 429 response."""
+
+    status_code = 429
+    response = SimpleNamespace(status_code=429, headers={"retry-after": "0"})
+
+
+def test_provider_waits_out_rate_limit_responses():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise RateLimited("rate limited")
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15, prompt_tokens_details=None)
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=SimpleNamespace(content="answer"))])
+
+    limiter = RateLimiter()
+    provider = OpenAIProvider(api_key="test-key", rate_limiter=limiter)
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=raw_response_api(create, headers={"x-ratelimit-limit-requests": "500"})
+    )))
+
+    assert provider.ask("document", "question") == "answer"
+    assert len(calls) == 3
+    assert limiter.rate_limited == 2
+    assert limiter.in_flight == 0
+    assert limiter.buckets["requests"].capacity == 500
+    assert provider.api_usage.api_calls == 1
+
+
+def test_other_errors_are_not_retried():
+    limiter = RateLimiter()
+    provider = OpenAIProvider(api_key="test-key", rate_limiter=limiter)
+
+    def create(**kwargs):
+        raise ValueError("bad request")
+
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=raw_response_api(create)
+    )))
+
+    with pytest.raises(RuntimeError, match="bad request"):
+        provider.ask("document", "question")
+    assert limiter.in_flight == 0
+
+
+def test_cancelled_requests_release_their_slot():
+    limiter = RateLimiter()
+    provider = AsyncOpenAIProvider(api_key="test-key", rate_limiter=limiter)
+
+    async def create(**kwargs):
+        await asyncio.sleep(60)
+
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=SimpleNamespace(create=create)
+    )))
+
+    async def ask_with_timeout():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(provider.ask("document", "question"), 0.01)
+
+    for _ in range(3):
+        asyncio.run(ask_with_timeout())
+    assert limiter.in_flight == 0
+
+
+def test_waiting_for_a_slot_is_bounded_by_the_deadline():
+    limiter = RateLimiter()
+    limiter.concurrency_limit = 1
+    limiter.acquire(10)
+
+    start = time.monotonic()
+    with deadline_scope(time.monotonic() + 0.2):
+        with pytest.raises(DeadlineExceeded):
+            limiter.acquire(10)
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(limiter.acquire_async(10))
+
+    assert time.monotonic() - start < 1
+    assert limiter.in_flight == 1
@@ -0,0 +1,188 @@
+"""Tests for retries, timeouts and deadlines."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from doc_check.providers import OllamaProvider, OpenAIProvider
+from doc_check.providers.retry import RetryPolicy, count_retries, deadline_scope, record_retry
+
+from .fakes import (
+    AsyncFakeProvider,
+    FakeProvider,
+    make_checker,
+    raw_response_api,
+    use_async_provider,
+    write_config,
+)
+
+
+class StatusError(Exception):
+    """SDK-like error for an HTTP error response."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers={})
+
+
+def completion():
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15, prompt_tokens_details=None)
+    return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=SimpleNamespace(content="answer"))])
+
+
+def openai_provider(create, **policy):
+    provider = OpenAIProvider(api_key="test-key", retry_policy=RetryPolicy(initial_backoff=0, **policy))
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=raw_response_api(create)
+    )))
+    return provider
+
+
+def test_transient_errors_are_retried_and_counted():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise StatusError(503)
+        return completion()
+
+    provider = openai_provider(create)
+    with count_retries() as retries:
+        assert provider.ask("document", "question") == "answer"
+
+    assert len(calls) == 3
+    assert retries.count == 2
+
+
+def test_retries_are_bounded():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        raise StatusError(529)
+
+    provider = openai_provider(create, max_retries=2)
+    with pytest.raises(RuntimeError, match="529"):
+        provider.ask("document", "question")
+
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        raise StatusError(400)
+
+    provider = openai_provider(create)
+    with pytest.raises(RuntimeError, match="400"):
+        provider.ask("document", "question")
+
+    assert len(calls) == 1
+
+
+def test_request_timeout_is_capped_by_the_deadline():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return completion()
+
+    provider = openai_provider(create, request_timeout=60)
+    provider.ask("document", "question")
+    with deadline_scope(time.monotonic() + 5):
+        provider.ask("document", "question")
+
+    assert calls[0]["timeout"] == 60
+    assert 0 < calls[1]["timeout"] <= 5
+
+
+def test_no_request_is_sent_past_the_deadline():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return completion()
+
+    provider = openai_provider(create)
+    with deadline_scope(time.monotonic() - 1):
+        with pytest.raises(RuntimeError, match="Deadline exceeded"):
+            provider.ask("document", "question")
+
+    assert calls == []
+
+
+def test_backoff_uses_full_jitter_and_honors_retry_after():
+    policy = RetryPolicy(initial_backoff=1, max_backoff=5)
+
+    delays = [policy.backoff(attempt) for attempt in range(10) for _ in range(20)]
+
+    assert all(0 <= delay <= 5 for delay in delays)
+    assert policy.backoff(0, retry_after=7) >= 7
+
+
+def test_ollama_uses_configured_timeout_and_retries_connection_errors(monkeypatch):
+    calls = []
+
+    def post(url, json, timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            raise requests.ConnectionError("connection refused")
+        return SimpleNamespace(
+            headers={},
+            raise_for_status=lambda: None,
+            json=lambda: {"response": "answer", "prompt_eval_count": 1, "eval_count": 1}
+        )
+
+    monkeypatch.setattr(requests, "post", post)
+    provider = OllamaProvider(retry_policy=RetryPolicy(initial_backoff=0, request_timeout=30))
+
+    assert provider.ask("document", "question") == "answer"
+    assert len(calls) == 2
+    assert calls[0][1] == 30
+
+
+def flaky_answer(document_content, question):
+    """Answer recording a retry, like a provider seeing one 503 would."""
+    record_retry()
+    return f"answer to {question}"
+
+
+class HangingAsyncProvider(AsyncFakeProvider):
+    """Async provider stand-in whose second question never answers."""
+
+    async def ask(self, document_content, question):
+        if question.endswith("1"):
+            await asyncio.sleep(60)
+        return await super().ask(document_content, question)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    return write_config(tmp_path, questions=3)
+
+
+def test_question_results_record_retries(monkeypatch, config_file):
+    checker = make_checker(monkeypatch, FakeProvider(answer=flaky_answer), concurrency=2)
+
+    result = checker.check_document(config_file)
+
+    assert [r.retries for r in result.results] == [1, 1, 1]
+
+
+def test_question_timeout_cancels_hanging_requests(monkeypatch, config_file):
+    checker = make_checker(monkeypatch, concurrency=3, question_timeout=0.2)
+    use_async_provider(monkeypatch, checker, HangingAsyncProvider())
+
+    start = time.monotonic()
+    result = asyncio.run(checker.check_document_async(config_file))
+
+    assert time.monotonic() - start < 5
+    assert [r.error for r in result.results] == [None, "Deadline exceeded", None]
+    assert result.passed_questions == 2
@@ -0,0 +1,38 @@
+"""Tests that the CLI starts without loading heavy dependencies."""
+
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "sentence_transformers", "faiss", "numpy", "openai", "anthropic"]
+
+
+def imported_heavy_modules(code):
+    """Run code in a fresh interpreter and return the heavy modules it imported."""
+    script = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    process = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def test_importing_the_cli_loads_no_heavy_dependency():
+    assert imported_heavy_modules("import doc_check.cli") == []
+
+
+def test_validate_loads_no_heavy_dependency(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("file: doc.md\nquestions:\n  - name: q\n    question: What?\n    answerEvaluation: Something\n")
+
+    code = (
+        "from click.testing import CliRunner\n"
+        "from doc_check.cli import cli\n"
+        f"result = CliRunner().invoke(cli, ['validate', {str(config)!r}])\n"
+        "assert result.exit_code == 0, result.output"
+    )
+
+    assert imported_heavy_modules(code) == []
+
+
+def test_provider_sdk_is_loaded_on_first_use():
+    code = "from doc_check.providers import OllamaProvider"
+
+    assert imported_heavy_modules(code) == []
@@ -0,0 +1,72 @@
+"""Tests for the map-reduce summarization of large documents."""
+
+import asyncio
+
+from doc_check import core
+
+from .fakes import AsyncFakeProvider, FakeProvider, make_checker
+
+
+def heading_summary(prompt):
+    """Summary of each section to its heading, and of merges to a marker."""
+    if prompt.startswith("The following are summaries"):
+        return "merged"
+    return next(line for line in prompt.splitlines() if line.startswith("# "))
+
+
+def document(*sections):
+    return "\n\n".join(f"# {title}\n\n" + " ".join([title.lower()] * 30) for title in sections)
+
+
+def summarizing_checker(monkeypatch, tmp_path, **kwargs):
+    monkeypatch.setattr(core, "SUMMARY_SECTION_TOKENS", 40)
+    return make_checker(monkeypatch, summarizer=FakeProvider(summary=heading_summary), summarize="medium", cache_dir=tmp_path, **kwargs)
+
+
+def test_small_documents_are_summarized_in_one_request(monkeypatch, tmp_path):
+    checker = summarizing_checker(monkeypatch, tmp_path)
+
+    assert checker.summarize_document(document("Alpha"), tmp_path / "doc.md") == "# Alpha"
+    assert len(checker.summarizer_provider.prompts) == 1
+
+
+def test_sections_are_summarized_separately_and_merged(monkeypatch, tmp_path):
+    checker = summarizing_checker(monkeypatch, tmp_path, concurrency=3)
+
+    summary = checker.summarize_document(document("Alpha", "Beta", "Gamma"), tmp_path / "doc.md")
+
+    prompts = checker.summarizer_provider.prompts
+    assert summary == "merged"
+    assert len(prompts) == 4
+    assert "# Alpha\n\n# Beta\n\n# Gamma" in prompts[-1]
+
+
+def test_only_changed_sections_are_summarized_again(monkeypatch, tmp_path):
+    checker = summarizing_checker(monkeypatch, tmp_path)
+    checker.summarize_document(document("Alpha", "Beta", "Gamma"), tmp_path / "doc.md")
+    checker.summarizer_provider.prompts.clear()
+
+    checker.summarize_document(document("Alpha", "Delta", "Gamma"), tmp_path / "doc.md")
+
+    prompts = checker.summarizer_provider.prompts
+    assert len(prompts) == 2
+    assert "# Delta" in prompts[0]
+    assert "# Alpha\n\n# Delta\n\n# Gamma" in prompts[1]
+
+
+def test_minimal_summaries_are_joined_without_a_merge(monkeypatch, tmp_path):
+    checker = summarizing_checker(monkeypatch, tmp_path)
+
+    summary = checker.summarize_document(document("Alpha", "Beta"), tmp_path / "doc.md", level="minimal")
+
+    assert summary == "# Alpha\n\n# Beta"
+
+
+def test_async_summarization_maps_and_reduces_the_same_way(monkeypatch, tmp_path):
+    checker = summarizing_checker(monkeypatch, tmp_path, concurrency=2)
+    summarizer = AsyncFakeProvider(summary=heading_summary)
+
+    summary = asyncio.run(checker.summarize_document_async(document("Alpha", "Beta", "Gamma"), tmp_path / "doc.md", summarizer))
+
+    assert summary == "merged"
+    assert len(summarizer.prompts) == 4